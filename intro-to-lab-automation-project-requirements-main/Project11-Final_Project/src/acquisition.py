@@ -0,0 +1,334 @@
+"""
+Serial acquisition for the Project 11 sketch, with no GUI code.
+
+SerialAcquisition owns the port: it connects, negotiates the protocol (binary
+frames or CSV lines, see protocol.py), reads and parses, and hands every
+decoded batch to on_batch. Both the Tk monitor (src.py) and the headless
+daemon (daemon.py) run it in their reader thread.
+
+Batches come in the `schema` given to it (schema.py, SAMPLE_DTYPE by
+default). The sketch's own channels are asked for with `D` while the
+protocol is negotiated and decoded with that `wire` schema, then mapped onto
+`schema` by name; when the two agree that mapping is free.
+
+Connecting and reconnecting:
+  - The port is opened with DTR low where the OS allows it, so a reconnect
+    does not reset a board that kept running. reset_on_connect (or
+    RESET_AFTER_FAILURES attempts that never got valid data) pulses DTR
+    instead, which restarts the sketch through the Uno's auto-reset.
+  - Instead of sleeping 2 s for the bootloader, connect() reads until the
+    first valid sample arrives (a CRC-checked frame or a complete line of
+    integers), whatever mode the sketch is in. Bytes
+    before the first line boundary, e.g. half a line cut by the disconnect,
+    are dropped rather than parsed.
+  - After an error the port is reopened with exponential backoff, from
+    RECONNECT_MIN up to RECONNECT_MAX seconds.
+  - Gaps are found from the sketch's millis() stamps: a step over GAP_FACTOR
+    sample intervals is counted with the samples it is missing, including
+    across a reconnect; a step backwards is a board restart. Counting starts
+    once samples arrive at sample_interval_ms, not at the sketch's default.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import serial
+
+from protocol import (BINARY_ON, BINARY_OFF, BINARY_ACK, ASCII_ACK, DESCRIBE,
+                      RELEASE_CONTROL, FAN_OFF, SCHEMA_PREFIX)
+from schema import DEFAULT_SCHEMA, find_schema, split_schema
+
+# Shared helpers live in intro-to-lab-automation-project-requirements-main/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', 'common'))
+from line_reader import LineReader, parse_int_lines
+
+BAUD_RATE = 115200  # Must match Serial.begin() in src.ino
+SAMPLE_INTERVAL_MS = 100
+READ_TIMEOUT = 0.2        # Seconds a read waits for the first byte
+READY_TIMEOUT = 3.0       # Bootloader + setup() of a freshly reset Uno take ~2 s
+READY_FRAMES = 3          # Consecutive valid frames before a binary layout is trusted
+NEGOTIATE_TIMEOUT = 1.0   # Older sketches never answer B1/B0
+RECONNECT_MIN = 0.02      # First retry after this many seconds...
+RECONNECT_MAX = 0.2       # ...doubling up to this
+RESET_AFTER_FAILURES = 2  # Pulse DTR after this many connects without valid data
+GAP_FACTOR = 1.5          # A millis() step over 1.5 sample intervals is a gap
+
+class SerialAcquisition:
+    def __init__(self, port, on_batch, baud_rate=BAUD_RATE,
+                 sample_interval_ms=SAMPLE_INTERVAL_MS, binary=True, reset_on_connect=False,
+                 schema=DEFAULT_SCHEMA):
+        self.port = port
+        self.on_batch = on_batch
+        self.schema = schema       # What on_batch gets
+        self.wire = DEFAULT_SCHEMA  # What the sketch sends, from its #schema line
+        self.baud_rate = baud_rate
+        self.sample_interval_ms = sample_interval_ms
+        self.binary = binary
+        self.reset_on_connect = reset_on_connect
+        self.ser = None
+        self.parser = None
+        self.reader = None
+        self.running = False
+        self._stop = threading.Event()
+        self._ready_failures = 0
+        self._rate_known = False  # False until samples arrive at our S<ms> rate (again, after a restart)
+        self._down_since = None   # time.monotonic() of the error we are recovering from
+        self._last_t = None
+        self.connects = 0
+        self.gaps = 0
+        self.missing = 0          # Samples missing in the gaps (estimated)
+        self.restarts = 0
+        self.last_outage = None   # Seconds from the last error to the first sample after it
+        self.last_ready = None    # Seconds from opening the port to the first valid sample
+        self.bytes_read = 0
+        self.samples_read = 0
+        self.parse_errors = 0     # Bad CSV lines and CRC errors
+        self.parse_ns = 0         # Time spent decoding (perf_counter_ns)
+
+    def connect(self, reset=None):
+        """Open the port and wait until the sketch is really sending"""
+        reset = self.reset_on_connect if reset is None else reset
+        self.ser = self._open(reset)
+        self.parser = None
+        self.reader = LineReader(self.ser)
+        self.wire = DEFAULT_SCHEMA  # Until the sketch says otherwise
+        opened = time.monotonic()
+        try:
+            binary_now = self._wait_ready()
+            self.last_ready = time.monotonic() - opened
+            self.ser.write(f"S{self.sample_interval_ms}\n".encode())
+            if not binary_now:
+                self._negotiate()
+        except Exception:
+            self.ser.close()
+            raise
+        self.connects += 1
+        mode = 'binary' if self.parser else 'CSV'
+        print(f"Serial connection established ({mode} mode, {len(self.wire)} channels, "
+              f"first sample {self.last_ready * 1000:.0f} ms after opening)")
+
+    def _open(self, reset):
+        ser = serial.Serial(None, self.baud_rate, timeout=READ_TIMEOUT)
+        ser.port = self.port
+        ser.dtr = False  # Applied on open: no auto-reset where the OS allows it
+        ser.open()
+        if reset:
+            # Pulse DTR: the Uno's auto-reset restarts the sketch
+            try:
+                ser.dtr = True
+                time.sleep(0.05)
+                ser.dtr = False
+            except (OSError, serial.SerialException):
+                pass  # No modem lines (e.g. a pty)
+        return ser
+
+    def _wait_ready(self):
+        """Read until the first valid sample; True if it was a binary frame.
+
+        A `#schema` line means a sketch that just booted and talks CSV, so it
+        settles the layout before any frame probe. Otherwise frames are
+        found by sync byte + CRC, in the layout of self.schema (a board
+        still in binary mode from the last connection) or the default one;
+        a window of random bytes passes the CRC-8 about 1 in 256 times, so
+        a layout is only trusted after READY_FRAMES consecutive valid
+        frames, which are then emitted. For CSV, everything before the
+        first newline is dropped and the last complete line must be
+        integers; the lines are kept for _negotiate(), which knows how many
+        to expect.
+        """
+        probes = [(DEFAULT_SCHEMA, DEFAULT_SCHEMA.frame_parser(), [])]
+        if not self.schema.flags_frame:
+            probes.insert(0, (self.schema, self.schema.frame_parser(), []))
+        buf = bytearray()
+        deadline = time.monotonic() + READY_TIMEOUT
+        while time.monotonic() < deadline and not self._stop.is_set():
+            data = self.ser.read(self.ser.in_waiting or 1)
+            if not data:
+                continue
+            buf += data
+            if probes and SCHEMA_PREFIX in buf:
+                announced = find_schema(bytes(buf))
+                if announced:
+                    self.wire = announced
+                    probes = []
+            for schema, probe, held in probes:
+                errors = probe.crc_errors + probe.skipped_bytes
+                frames = probe.feed(data)
+                if probe.crc_errors + probe.skipped_bytes != errors:
+                    held.clear()  # Not consecutive: start counting again
+                    continue
+                if len(frames):
+                    held.append(frames)
+                if sum(map(len, held)) >= READY_FRAMES:
+                    self._ready_failures = 0
+                    self.wire = schema
+                    self.parser = probe
+                    self._emit(np.concatenate(held))
+                    return True
+            start = buf.find(b'\n') + 1  # First line boundary
+            end = buf.rfind(b'\n') + 1
+            if 0 < start < end:
+                last = max(start, buf.rfind(b'\n', 0, end - 1) + 1)
+                line = bytes(buf[last:end])
+                values, _ = parse_int_lines(line, line.count(b',') + 1)
+                if len(values):
+                    self._ready_failures = 0
+                    self.reader.feed(bytes(buf[start:]))
+                    return False
+        self._ready_failures += 1
+        raise serial.SerialException(f"no valid data from {self.port} within {READY_TIMEOUT:g} s")
+
+    def _negotiate(self):
+        """Ask for the schema, then binary frames (or CSV, acknowledged the same
+        way); the CSV samples sent before the acknowledgement are kept"""
+        self.ser.write(DESCRIBE + (BINARY_ON if self.binary else BINARY_OFF))
+        ack = BINARY_ACK if self.binary else ASCII_ACK
+        buf = bytearray()
+        deadline = time.monotonic() + NEGOTIATE_TIMEOUT
+        while time.monotonic() < deadline:
+            buf += self.ser.read(self.ser.in_waiting or 1)
+            idx = buf.find(ack)
+            end = buf.find(b'\n', idx) if idx != -1 else -1
+            if end != -1:
+                self.reader.feed(bytes(buf[:idx]))
+                self._emit(self._parse_lines(self.reader.take_block()))
+                if self.binary:
+                    self.parser = self.wire.frame_parser()
+                    self._emit(self.parser.feed(bytes(buf[end + 1:])))
+                else:
+                    self.reader.feed(bytes(buf[end + 1:]))
+                return
+        # Older firmware: stay on CSV with the default channels
+        self.reader.feed(bytes(buf))
+        self._emit(self._parse_lines(self.reader.take_block()))
+
+    def _parse_lines(self, block):
+        if not block:
+            return np.empty(0, dtype=self.wire.dtype)
+        # The answer to D, or the announcement of a sketch that restarted
+        schema, block = split_schema(block)
+        if schema:
+            self.wire = schema
+        samples, bad = self.wire.parse_lines(block)
+        self.parse_errors += bad
+        return samples
+
+    def read_batch(self):
+        """Read whatever has arrived and return it in the wire schema"""
+        data = self.ser.read(self.ser.in_waiting or 1)
+        self.bytes_read += len(data)
+        t0 = time.perf_counter_ns()
+        if self.parser:
+            # Decode everything that has arrived in one go
+            crc_errors = self.parser.crc_errors
+            batch = self.parser.feed(data)
+            self.parse_errors += self.parser.crc_errors - crc_errors
+        else:
+            # CSV mode: parse all complete lines at once
+            self.reader.feed(data)
+            batch = self._parse_lines(self.reader.take_block())
+        self.parse_ns += time.perf_counter_ns() - t0
+        return batch
+
+    def backlog(self):
+        """Bytes waiting in the OS buffer: grows when the reader falls behind"""
+        return self.ser.in_waiting if self.ser and self.ser.is_open else 0
+
+    def run(self):
+        """Read until stop() is called, reconnecting after errors"""
+        self.running = True
+        self._stop.clear()
+        backoff = RECONNECT_MIN
+        while self.running:
+            try:
+                if not self.ser or not self.ser.is_open:
+                    self.connect(reset=self.reset_on_connect or
+                                 self._ready_failures >= RESET_AFTER_FAILURES)
+                    backoff = RECONNECT_MIN
+                self._emit(self.read_batch())
+            except (serial.SerialException, OSError) as e:
+                if self._down_since is None:
+                    self._down_since = time.monotonic()
+                    print(f"Serial error: {e}; reconnecting")
+                if self.ser:
+                    self.ser.close()
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, RECONNECT_MAX)
+            except Exception as e:
+                print(f"Error in serial reading: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, RECONNECT_MAX)
+
+    def _emit(self, batch):
+        if len(batch):
+            self.samples_read += len(batch)
+            self._check_gaps(batch)
+            self.on_batch(self.schema.convert(batch))
+
+    def _check_gaps(self, batch):
+        """Count gaps and restarts in the millis() stamps"""
+        t = batch['t_ms'].astype(np.int64)
+        if self._down_since is not None:
+            self.last_outage = time.monotonic() - self._down_since
+            self._down_since = None
+            print(f"Recovered after {self.last_outage * 1000:.0f} ms")
+        if self._last_t is not None:
+            steps = np.diff(t, prepend=self._last_t)
+            restarts = int(np.count_nonzero(steps < 0))
+            if restarts:
+                self.restarts += restarts
+                self._rate_known = False  # Back at the sketch's default interval
+                print(f"Board restarted (millis() went from {self._last_t} to {t[np.argmax(steps < 0)]})")
+            elif not self._rate_known:
+                # Until S<ms> takes effect, samples come at the sketch's default interval
+                self._rate_known = bool(np.any(steps <= GAP_FACTOR * self.sample_interval_ms))
+            else:
+                interval = self.sample_interval_ms
+                long_steps = steps[steps > GAP_FACTOR * interval]
+                if len(long_steps):
+                    missing = int(np.sum(np.round(long_steps / interval) - 1))
+                    self.gaps += len(long_steps)
+                    self.missing += missing
+                    print(f"Gap in samples: {int(long_steps.max())} ms, ~{missing} missing")
+        self._last_t = int(t[-1])
+
+    def stats(self):
+        return {'connects': self.connects,
+                'gaps': self.gaps,
+                'missing': self.missing,
+                'restarts': self.restarts,
+                'bytes_read': self.bytes_read,
+                'samples_read': self.samples_read,
+                'parse_errors': self.parse_errors,
+                'last_outage_ms': None if self.last_outage is None else self.last_outage * 1000,
+                'last_ready_ms': None if self.last_ready is None else self.last_ready * 1000}
+
+    def add_metrics(self, metrics):
+        """Register the reader's counters with a metrics.Metrics"""
+        metrics.counter('serial_bytes_total', lambda: self.bytes_read)
+        metrics.counter('serial_samples_total', lambda: self.samples_read)
+        metrics.counter('serial_parse_errors_total', lambda: self.parse_errors)
+        metrics.counter('serial_parse_seconds_total', lambda: self.parse_ns / 1e9)
+        metrics.counter('serial_gaps_total', lambda: self.gaps)
+        metrics.gauge('serial_backlog_bytes', self.backlog)
+
+    def send(self, data):
+        """Write commands to the board, e.g. from ControlEngine in on_batch"""
+        if self.ser and self.ser.is_open:
+            self.ser.write(data)
+
+    def stop(self):
+        self.running = False
+        self._stop.set()
+
+    def close(self):
+        """Stop reading, hand the buzzer back to the sketch, switch the fan off and close the port"""
+        self.stop()
+        if self.ser and self.ser.is_open:
+            self.ser.write(RELEASE_CONTROL + FAN_OFF)
+            time.sleep(0.1)  # Give time for the command to be sent
+            self.ser.close()
+            print("Serial port closed and fan stopped")
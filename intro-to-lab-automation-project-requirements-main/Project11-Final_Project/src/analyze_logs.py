@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Session analytics over servo monitor logs (.csv, .npy or .parquet).
+
+Every file is streamed block by block (log_reader.iter_log_blocks), so memory
+use does not depend on the log size, and files are spread over a process
+pool; a file that cannot be read is reported and left out, the others are
+still analyzed. For each file, and for all of them together:
+
+  - samples above / below the angle thresholds, and how many separate
+    excursions that was (default: the sketch's buzzer limits, >90 and <10)
+  - time with the buzzer and with the fan on
+  - angle histogram
+  - stats per fixed, non-overlapping time window (count, mean, std, min,
+    max); --windows writes them
+  - gaps in the millis() timestamps: how many, the longest, and the number
+    of samples lost in them; board restarts (time going backwards)
+
+Usage:
+    python analyze_logs.py data_log.csv
+    python analyze_logs.py logs/*.csv --jobs 8 --json summary.json
+    python analyze_logs.py logs/*.npy --above 90 100 --below 10 --window 60 --windows windows.csv
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from log_reader import iter_log_blocks
+
+ABOVE_THRESHOLDS = (90,)  # Buzzer on above this angle (src.ino)
+BELOW_THRESHOLDS = (10,)  # ...and below this one
+ANGLE_BINS = np.arange(-40, 135, 5)  # The sketch maps the tilt to -35..125 deg
+WINDOW_MS = 60_000
+GAP_FACTOR = 1.5  # A step longer than this many sample intervals is a gap
+MAX_LISTED_GAPS = 10
+
+WINDOW_DTYPE = np.dtype([
+    ('t_ms', '<i8'),   # window start
+    ('count', '<i8'),
+    ('sum', '<i8'),
+    ('sumsq', '<i8'),
+    ('min', '<i8'),
+    ('max', '<i8'),
+])
+
+class SessionStats:
+    """Streaming, mergeable statistics for one log (or several, after merge())"""
+
+    def __init__(self, interval_ms=None, above=ABOVE_THRESHOLDS, below=BELOW_THRESHOLDS,
+                 window_ms=WINDOW_MS, gap_factor=GAP_FACTOR):
+        self.interval_ms = interval_ms
+        self.above = tuple(above)
+        self.below = tuple(below)
+        self.window_ms = window_ms
+        self.gap_factor = gap_factor
+        self.files = 0
+        self.rows = 0
+        self.covered_ms = 0  # Sum of sample steps, gaps counted as one interval
+        self.buzzer_on_ms = 0
+        self.fan_on_ms = 0
+        self.samples_above = [0] * len(self.above)
+        self.excursions_above = [0] * len(self.above)
+        self.samples_below = [0] * len(self.below)
+        self.excursions_below = [0] * len(self.below)
+        self.histogram = np.zeros(len(ANGLE_BINS) - 1, dtype=np.int64)
+        self.gaps = 0
+        self.gap_ms = 0
+        self.lost_samples = 0
+        self.longest_gaps = []  # (duration_ms, t_ms) of the longest gaps
+        self.restarts = 0
+        self.windows = []  # Per-block window aggregates, combined in finish()
+        self._prev = None  # Last sample of the previous block
+
+    def add(self, block):
+        """Fold one SAMPLE_DTYPE block into the statistics"""
+        if not len(block):
+            return
+        self.rows += len(block)
+        if self._prev is not None:
+            block = np.concatenate([self._prev, block])
+        t = block['t_ms'].astype(np.int64)
+        angle = block['angle'].astype(np.int64)
+        dt = np.diff(t)
+
+        if self.interval_ms is None and (dt > 0).any():
+            self.interval_ms = float(np.median(dt[dt > 0]))
+
+        # Gaps, restarts and time on; during a gap we cannot know the states,
+        # so a gap counts as one sample interval
+        restart = dt < 0
+        self.restarts += int(restart.sum())
+        gap = dt > self.gap_factor * self.interval_ms if self.interval_ms else np.zeros_like(restart)
+        if gap.any():
+            gap_dt = dt[gap]
+            self.gaps += int(gap.sum())
+            self.gap_ms += int(gap_dt.sum())
+            self.lost_samples += int((np.rint(gap_dt / self.interval_ms) - 1).sum())
+            longest = np.argsort(gap_dt)[-MAX_LISTED_GAPS:]
+            self.longest_gaps += [(int(gap_dt[i]), int(t[:-1][gap][i])) for i in longest]
+            self.longest_gaps = sorted(self.longest_gaps, reverse=True)[:MAX_LISTED_GAPS]
+        step = np.where(gap, self.interval_ms or 0, dt)
+        step[restart] = 0
+        self.covered_ms += int(step.sum())
+        self.buzzer_on_ms += int((step * (block['buzzer'][:-1] != 0)).sum())
+        self.fan_on_ms += int((step * (block['fan'][:-1] != 0)).sum())
+
+        # Threshold exceedances; an excursion starts where the angle crosses
+        # the threshold (the sample carried over from the last block only
+        # serves as the "before" value)
+        first = 0 if self._prev is None else 1
+        for i, limit in enumerate(self.above):
+            over = angle > limit
+            self.samples_above[i] += int(over[first:].sum())
+            self.excursions_above[i] += _rising_edges(over, first)
+        for i, limit in enumerate(self.below):
+            under = angle < limit
+            self.samples_below[i] += int(under[first:].sum())
+            self.excursions_below[i] += _rising_edges(under, first)
+
+        own = block[first:]
+        self.histogram += np.histogram(own['angle'], bins=ANGLE_BINS)[0]
+        self.windows.append(_window_aggregates(own, self.window_ms))
+        self._prev = block[-1:].copy()
+
+    def merge(self, other):
+        """Add another file's statistics (window stats stay per file)"""
+        self.files += other.files
+        for name in ('rows', 'covered_ms', 'buzzer_on_ms', 'fan_on_ms',
+                     'gaps', 'gap_ms', 'lost_samples', 'restarts'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for name in ('samples_above', 'excursions_above', 'samples_below', 'excursions_below'):
+            setattr(self, name, [a + b for a, b in zip(getattr(self, name), getattr(other, name))])
+        self.histogram += other.histogram
+        self.longest_gaps = sorted(self.longest_gaps + other.longest_gaps, reverse=True)[:MAX_LISTED_GAPS]
+        if self.interval_ms is None:
+            self.interval_ms = other.interval_ms
+
+    def finish(self):
+        """Combine the per-block window aggregates (a window can span blocks)"""
+        if not self.windows:
+            self.windows = np.empty(0, dtype=WINDOW_DTYPE)
+            return self
+        parts = np.concatenate(self.windows)
+        starts = np.flatnonzero(np.r_[True, parts['t_ms'][1:] != parts['t_ms'][:-1]])
+        out = np.empty(len(starts), dtype=WINDOW_DTYPE)
+        out['t_ms'] = parts['t_ms'][starts]
+        for name in ('count', 'sum', 'sumsq'):
+            out[name] = np.add.reduceat(parts[name], starts)
+        out['min'] = np.minimum.reduceat(parts['min'], starts)
+        out['max'] = np.maximum.reduceat(parts['max'], starts)
+        self.windows = out
+        return self
+
+    def window_table(self):
+        """(t_ms, count, mean, std, min, max) columns of the window stats"""
+        w = self.windows
+        mean = w['sum'] / w['count']
+        std = np.sqrt(np.maximum(w['sumsq'] / w['count'] - mean ** 2, 0))
+        return np.column_stack([w['t_ms'], w['count'], mean, std, w['min'], w['max']])
+
+    def summary(self):
+        pct = lambda ms: 100 * ms / self.covered_ms if self.covered_ms else 0.0
+        expected = self.rows + self.lost_samples
+        return {
+            'files': self.files,
+            'rows': self.rows,
+            'interval_ms': self.interval_ms,
+            'covered_s': self.covered_ms / 1000,
+            'buzzer_on_s': self.buzzer_on_ms / 1000,
+            'buzzer_on_pct': pct(self.buzzer_on_ms),
+            'fan_on_s': self.fan_on_ms / 1000,
+            'fan_on_pct': pct(self.fan_on_ms),
+            'above': {str(limit): {'samples': n, 'excursions': e} for limit, n, e
+                      in zip(self.above, self.samples_above, self.excursions_above)},
+            'below': {str(limit): {'samples': n, 'excursions': e} for limit, n, e
+                      in zip(self.below, self.samples_below, self.excursions_below)},
+            'gaps': self.gaps,
+            'gap_s': self.gap_ms / 1000,
+            'lost_samples': self.lost_samples,
+            'loss_pct': 100 * self.lost_samples / expected if expected else 0.0,
+            'longest_gaps': [{'t_ms': t, 'duration_ms': d} for d, t in self.longest_gaps],
+            'restarts': self.restarts,
+            'histogram': {'edges': ANGLE_BINS.tolist(), 'counts': self.histogram.tolist()},
+        }
+
+def _rising_edges(flags, first):
+    """Number of False->True transitions in flags[first:], counting a True
+    at the very start of the file (first == 0) as one"""
+    edges = int((flags[1:] & ~flags[:-1]).sum())
+    if first == 0 and len(flags) and flags[0]:
+        edges += 1
+    return edges
+
+def _window_aggregates(block, window_ms):
+    """Aggregates of consecutive samples falling in the same time window"""
+    out = np.empty(0, dtype=WINDOW_DTYPE)
+    if not len(block):
+        return out
+    ids = block['t_ms'].astype(np.int64) // window_ms
+    angle = block['angle'].astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    out = np.empty(len(starts), dtype=WINDOW_DTYPE)
+    out['t_ms'] = ids[starts] * window_ms
+    out['count'] = np.diff(np.r_[starts, len(ids)])
+    out['sum'] = np.add.reduceat(angle, starts)
+    out['sumsq'] = np.add.reduceat(angle * angle, starts)
+    out['min'] = np.minimum.reduceat(angle, starts)
+    out['max'] = np.maximum.reduceat(angle, starts)
+    return out
+
+def analyze_file(path, options):
+    """Stream one log and return its finished SessionStats"""
+    stats = SessionStats(**options)
+    stats.files = 1
+    for block in iter_log_blocks(path):
+        stats.add(block)
+    return stats.finish()
+
+def _analyze_worker(path, options):
+    """Worker: (SessionStats, None), or (None, error) for a log that cannot
+    be read, so one bad file does not lose the results of the others"""
+    try:
+        return analyze_file(path, options), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+def format_summary(name, s):
+    limits = [f"angle > {limit}: {v['samples']:,} samples in {v['excursions']:,} excursions"
+              for limit, v in s['above'].items()]
+    limits += [f"angle < {limit}: {v['samples']:,} samples in {v['excursions']:,} excursions"
+               for limit, v in s['below'].items()]
+    interval = f"{s['interval_ms']:g} ms" if s['interval_ms'] else "-"
+    lines = [
+        f"{name}: {s['rows']:,} rows, {s['covered_s'] / 3600:.2f} h, sample interval {interval}",
+        "  " + "; ".join(limits),
+        f"  buzzer on {s['buzzer_on_s'] / 60:.1f} min ({s['buzzer_on_pct']:.1f}%), "
+        f"fan on {s['fan_on_s'] / 60:.1f} min ({s['fan_on_pct']:.1f}%)",
+        f"  gaps: {s['gaps']:,} ({s['gap_s']:.1f} s, ~{s['lost_samples']:,} samples lost, "
+        f"{s['loss_pct']:.3f}%), restarts: {s['restarts']}",
+    ]
+    if s['longest_gaps']:
+        longest = s['longest_gaps'][0]
+        lines[-1] += f", longest {longest['duration_ms'] / 1000:.2f} s at t={longest['t_ms']} ms"
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='+', help='log files (.csv, .npy, .parquet)')
+    parser.add_argument('--above', type=int, nargs='*', default=list(ABOVE_THRESHOLDS))
+    parser.add_argument('--below', type=int, nargs='*', default=list(BELOW_THRESHOLDS))
+    parser.add_argument('--interval', type=float, help='sample interval in ms (default: median step)')
+    parser.add_argument('--gap-factor', type=float, default=GAP_FACTOR)
+    parser.add_argument('--window', type=float, default=WINDOW_MS / 1000, help='stats window (s)')
+    parser.add_argument('--windows', metavar='CSV',
+                        help='write the stats of every (non-overlapping) window of every file')
+    parser.add_argument('--json', help='write all results to this file')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='worker processes')
+    args = parser.parse_args()
+
+    options = dict(interval_ms=args.interval, above=args.above, below=args.below,
+                   window_ms=int(args.window * 1000), gap_factor=args.gap_factor)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=min(args.jobs, len(args.paths))) as pool:
+        outcomes = list(pool.map(_analyze_worker, args.paths, [options] * len(args.paths)))
+    errors = [(path, error) for path, (_, error) in zip(args.paths, outcomes) if error]
+    paths = [path for path, (_, error) in zip(args.paths, outcomes) if not error]
+    results = [stats for stats, error in outcomes if not error]
+
+    total = SessionStats(**options)
+    for path, stats in zip(paths, results):
+        print(format_summary(path, stats.summary()))
+        total.merge(stats)
+    for path, error in errors:
+        print(f"{path}: could not be analyzed ({error})")
+    if len(results) > 1:
+        print(format_summary(f"Total ({total.files} files)", total.summary()))
+    print(f"Analyzed {total.rows:,} rows in {time.perf_counter() - start:.2f} s"
+          + (f", {len(errors)} file(s) failed" if errors else ""))
+
+    if args.windows:
+        with open(args.windows, 'w') as f:
+            f.write("file,t_ms,count,mean,std,min,max\n")
+            for path, stats in zip(paths, results):
+                for row in stats.window_table():
+                    f.write(f"{os.path.basename(path)},{int(row[0])},{int(row[1])},"
+                            f"{row[2]:.3f},{row[3]:.3f},{int(row[4])},{int(row[5])}\n")
+        print(f"Window stats written to {args.windows}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'files': {path: stats.summary() for path, stats in zip(paths, results)},
+                       'errors': dict(errors),
+                       'total': total.summary()}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+if __name__ == '__main__':
+    main()
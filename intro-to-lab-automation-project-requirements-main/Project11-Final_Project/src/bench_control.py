@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Reaction latency of the host-side control rules against a simulated board.
+
+A ServoMonitorSim (common/arduino_sim.py) sweeps the angle like a tilted
+sensor; SerialAcquisition reads it and ControlEngine switches the buzzer
+with thresholds that differ from the sketch's built-in 90/10, so every
+switch has to come from the host. For each sample interval we report the
+per-rule reaction latency (sample that crossed the threshold to the first
+sample showing the buzzer switched), late and unconfirmed switches, and the
+host time spent per batch. Linux/macOS only (needs os.openpty).
+
+Usage:
+    python bench_control.py [--intervals 100 20 5] [--seconds 20]
+"""
+
+import argparse
+import os
+import sys
+import threading
+
+from acquisition import SerialAcquisition
+from control import ControlEngine, ThresholdRule
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', 'common'))
+from arduino_sim import Simulator, ServoMonitorSim
+
+def run(interval_ms, seconds, binary, rule_args):
+    rule = ThresholdRule('bench', 'buzzer', **rule_args)
+    with Simulator([ServoMonitorSim(binary=False)]).start(process=True) as sim:
+        acquisition = SerialAcquisition(sim.devices[0].port, lambda batch: engine.process(batch),
+                                        sample_interval_ms=interval_ms, binary=binary)
+        engine = ControlEngine([rule], acquisition.send)
+        reader = threading.Thread(target=acquisition.run, daemon=True)
+        reader.start()
+        threading.Event().wait(seconds)
+        acquisition.close()
+        reader.join()
+    return engine
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--intervals', type=int, nargs='+', default=[100, 20, 5], help='sample intervals (ms)')
+    parser.add_argument('--seconds', type=float, default=20.0, help='time per interval')
+    parser.add_argument('--csv-protocol', action='store_true', help='CSV lines instead of binary frames')
+    parser.add_argument('--above', type=int, default=70)
+    parser.add_argument('--below', type=int, default=20)
+    parser.add_argument('--hysteresis', type=int, default=2)
+    parser.add_argument('--debounce-ms', type=int, default=0)
+    args = parser.parse_args()
+
+    rule_args = dict(above=args.above, below=args.below, hysteresis=args.hysteresis,
+                     debounce_ms=args.debounce_ms)
+    print(f"{'interval':>8} {'switches':>8} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} "
+          f"{'late':>5} {'unconf':>6} {'host us/batch p50':>18}")
+    for interval_ms in args.intervals:
+        engine = run(interval_ms, args.seconds, not args.csv_protocol, rule_args)
+        rule = engine.rules[0]
+        latency, decision = rule.latency, engine.decision
+        print(f"{interval_ms:>8} {rule.switches:>8} {latency.percentile(50) / 1e6:>7.1f} "
+              f"{latency.percentile(99) / 1e6:>7.1f} {latency.max / 1e6:>7.1f} "
+              f"{rule.late:>5} {rule.unconfirmed:>6} {decision.percentile(50) / 1e3:>18.1f}")
+
+if __name__ == '__main__':
+    main()
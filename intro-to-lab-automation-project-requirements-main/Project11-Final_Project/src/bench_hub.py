@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Scale test for hub.py: many simulated boards, one hub process.
+
+A child process plays N Project 11 sketches on N pseudo terminals (answers
+B1 with BIN OK, then sends binary frames at --rate Hz each). The hub reads
+all of them on its single selectors loop; we report samples/s received
+against samples/s sent, the hub's CPU use and its thread count.
+Linux/macOS only (needs os.openpty).
+
+Usage:
+    python bench_hub.py [--devices 50] [--rate 100] [--seconds 5]
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import select
+import tempfile
+import threading
+import time
+import tty
+
+import hub
+from protocol import BINARY_ON, encode_frame
+
+def simulate_boards(master_fds, rate, seconds, sent):
+    """Child process: every board answers B1 and streams frames"""
+    binary = {fd: False for fd in master_fds}
+    for fd in master_fds:
+        os.set_blocking(fd, False)
+    period = 1.0 / rate
+    start = next_tick = time.monotonic()
+    t_ms = 0
+    count = 0
+    while time.monotonic() - start < seconds:
+        timeout = max(0.0, next_tick - time.monotonic())
+        readable, _, _ = select.select(master_fds, [], [], timeout)
+        for fd in readable:
+            try:
+                if BINARY_ON.strip() in os.read(fd, 1024):
+                    binary[fd] = True
+                    os.write(fd, b"BIN OK\r\n")
+            except OSError:
+                pass
+        if time.monotonic() >= next_tick:
+            next_tick += period
+            t_ms += int(period * 1000)
+            for i, fd in enumerate(master_fds):
+                if binary[fd]:
+                    try:
+                        os.write(fd, encode_frame(t_ms, (t_ms // 10 + i) % 160 - 35, 0, 1))
+                        count += 1
+                    except BlockingIOError:
+                        pass
+    sent.value = count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--devices', type=int, default=50)
+    parser.add_argument('--rate', type=float, default=100.0, help='samples/s per device')
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    hub.RESET_WAIT = 0.1  # ptys do not reset
+    pairs = [os.openpty() for _ in range(args.devices)]
+    for _, slave_fd in pairs:
+        tty.setraw(slave_fd)
+    ports = [os.ttyname(slave_fd) for _, slave_fd in pairs]
+
+    sent = multiprocessing.Value('q', 0)
+    boards = multiprocessing.Process(
+        target=simulate_boards,
+        args=([m for m, _ in pairs], args.rate, args.seconds + 1.0, sent))
+    boards.start()
+
+    log_dir = tempfile.mkdtemp(prefix='bench_hub_')
+    acq = hub.AcquisitionHub(ports, log_base_path=os.path.join(log_dir, 'data_log'),
+                             log_formats=('npy',))
+    threading.Timer(args.seconds + 1.5, acq.stop).start()
+
+    cpu_start = resource.getrusage(resource.RUSAGE_SELF)
+    wall_start = time.perf_counter()
+    acq.run()
+    wall = time.perf_counter() - wall_start
+    cpu_end = resource.getrusage(resource.RUSAGE_SELF)
+    boards.join()
+
+    cpu = (cpu_end.ru_utime - cpu_start.ru_utime) + (cpu_end.ru_stime - cpu_start.ru_stime)
+    received = sum(d['samples'] for d in acq.stats().values())
+    print(f"devices:          {args.devices}")
+    print(f"samples sent:     {sent.value} ({sent.value / args.seconds:,.0f}/s)")
+    print(f"samples received: {received} ({received / args.seconds:,.0f}/s)")
+    print(f"hub CPU:          {100 * cpu / wall:.1f}% of one core")
+    print(f"hub threads:      reader loop + 1 log writer (not one per device)")
+    print(f"logs:             {log_dir}")
+    for m, s in pairs:
+        os.close(m)
+        os.close(s)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Frame-time benchmark for the servo monitor plot.
+
+Compares the old update_plot() path (ax.clear() and rebuild everything each
+frame) with the persistent-artist path (set_data + blit) drawing every
+sample, and with the path src.py uses now: blit plus the min/max pyramid
+(decimation.py), which draws at most 2 points per pixel of the full view.
+Histories go up to 3.6M samples (10 h at 100 Hz); the legacy path is only
+run up to 100k. Runs on the Agg backend, so no display or Arduino is needed.
+
+Usage:
+    python bench_plot.py [--frames 30]
+"""
+
+import argparse
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+from decimation import MinMaxPyramid
+from ring_buffer import SAMPLE_DTYPE, SampleRing
+
+POINT_COUNTS = (100, 10_000, 100_000, 1_000_000, 3_600_000)
+LEGACY_MAX_POINTS = 100_000
+POINTS_PER_PIXEL = 2
+
+def make_data(n, offset=0):
+    """Synthetic samples spaced like the sketch output (~153 ms apart)"""
+    t = (np.arange(n) + offset) * 153
+    angle = (60 + 50 * np.sin(t / 2000.0)).astype(int)
+    return t, angle
+
+def legacy_frame(fig, ax, t, angle):
+    """The original update_plot body followed by a full canvas draw"""
+    ax.clear()
+    ax.plot(list(t), list(angle),
+            color='#2196F3',
+            linewidth=2,
+            marker='o',
+            markersize=4,
+            markerfacecolor='white',
+            markeredgecolor='#2196F3')
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.set_xlabel("Time (ms)", fontsize=10, fontweight='bold')
+    ax.set_ylabel("Angle (degrees)", fontsize=10, fontweight='bold')
+    ax.set_title("Servo Angle Monitor", fontsize=12, fontweight='bold', pad=10)
+    ax.axhline(y=0, color='#FF9800', linestyle='--', alpha=0.5)
+    ax.axhline(y=125, color='#FF9800', linestyle='--', alpha=0.5)
+    ax.set_ylim(-10, 190)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.legend(['Servo Angle'], loc='upper right')
+    fig.canvas.draw()
+
+def setup_blit_axes(ax):
+    """Static styling built once, mirrors setup_axes() in src.py"""
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.set_xlabel("Time (ms)", fontsize=10, fontweight='bold')
+    ax.set_ylabel("Angle (degrees)", fontsize=10, fontweight='bold')
+    ax.set_title("Servo Angle Monitor", fontsize=12, fontweight='bold', pad=10)
+    ax.axhline(y=0, color='#FF9800', linestyle='--', alpha=0.5)
+    ax.axhline(y=125, color='#FF9800', linestyle='--', alpha=0.5)
+    ax.set_ylim(-10, 190)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    line, = ax.plot([], [],
+                    color='#2196F3',
+                    linewidth=2,
+                    marker='o',
+                    markersize=4,
+                    markerfacecolor='white',
+                    markeredgecolor='#2196F3',
+                    label='Servo Angle',
+                    animated=True)
+    ax.legend(loc='upper right')
+    return line
+
+def bench_legacy(n, frames):
+    fig, ax = plt.subplots(figsize=(8, 4), dpi=100)
+    times = []
+    for i in range(frames):
+        t, angle = make_data(n, offset=i)
+        start = time.perf_counter()
+        legacy_frame(fig, ax, t, angle)
+        times.append(time.perf_counter() - start)
+    plt.close(fig)
+    return times
+
+def bench_blit(n, frames):
+    fig, ax = plt.subplots(figsize=(8, 4), dpi=100)
+    line = setup_blit_axes(ax)
+    t, _ = make_data(n)
+    ax.set_xlim(t[0], t[-1] + frames * 153)
+    fig.canvas.draw()
+    background = fig.canvas.copy_from_bbox(ax.bbox)
+    times = []
+    for i in range(frames):
+        t, angle = make_data(n, offset=i)
+        start = time.perf_counter()
+        fig.canvas.restore_region(background)
+        line.set_data(t, angle)
+        ax.draw_artist(line)
+        fig.canvas.blit(ax.bbox)
+        times.append(time.perf_counter() - start)
+    plt.close(fig)
+    return times
+
+def bench_decimated(n, frames):
+    """Whole history in view; every frame appends a batch and re-selects"""
+    fig, ax = plt.subplots(figsize=(8, 4), dpi=100)
+    line = setup_blit_axes(ax)
+    ring = SampleRing(n)
+    pyramid = MinMaxPyramid(ring)
+    t, angle = make_data(n)
+    batch = np.zeros(n, dtype=SAMPLE_DTYPE)
+    batch['t_ms'], batch['angle'] = t, angle
+    ring.extend(batch)
+    pyramid.update()
+    ax.set_xlim(t[0], t[-1] + frames * 153 * 10)
+    fig.canvas.draw()
+    background = fig.canvas.copy_from_bbox(ax.bbox)
+    max_points = int(ax.bbox.width * POINTS_PER_PIXEL)
+    times = []
+    for i in range(frames):
+        t, angle = make_data(10, offset=n + 10 * i)
+        new = np.zeros(10, dtype=SAMPLE_DTYPE)
+        new['t_ms'], new['angle'] = t, angle
+        ring.extend(new)
+        start = time.perf_counter()
+        pyramid.update()
+        x, y, level = pyramid.select(*ax.get_xlim(), max_points)
+        fig.canvas.restore_region(background)
+        line.set_data(x, y)
+        line.set_marker('o' if level == 0 and len(x) <= 500 else 'None')
+        line.set_linewidth(2 if level == 0 else 1)
+        ax.draw_artist(line)
+        fig.canvas.blit(ax.bbox)
+        times.append(time.perf_counter() - start)
+    plt.close(fig)
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=30, help='frames per measurement')
+    args = parser.parse_args()
+
+    print(f"{'points':>9} {'legacy ms':>10} {'blit ms':>10} {'decimated ms':>13}")
+    for n in POINT_COUNTS:
+        legacy = (f"{np.median(bench_legacy(n, args.frames)) * 1e3:>10.2f}"
+                  if n <= LEGACY_MAX_POINTS else f"{'-':>10}")
+        blit = np.median(bench_blit(n, args.frames)) * 1e3
+        decimated = np.median(bench_decimated(n, args.frames)) * 1e3
+        print(f"{n:>9} {legacy} {blit:>10.2f} {decimated:>13.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Disconnect/reconnect test of SerialAcquisition against a simulated board.
+
+A ServoMonitorSim (common/arduino_sim.py) behind a stable symlink is
+unplugged --cycles times for a random 0.2-1 s. Every other time it comes
+back freshly reset (millis from 0, ASCII mode, like a DTR reset), otherwise
+still running in binary mode. For each cycle we measure the recovery time,
+from the port reappearing to the first batch delivered after it, and check
+that the gaps and restarts the acquisition reported match what was
+injected. Linux/macOS only (needs os.openpty).
+
+Usage:
+    python bench_reconnect.py [--cycles 10] [--interval 10] [--target-ms 500]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from acquisition import SerialAcquisition
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', 'common'))
+from arduino_sim import Simulator, ServoMonitorSim
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cycles', type=int, default=10)
+    parser.add_argument('--interval', type=int, default=10, help='sample interval (ms)')
+    parser.add_argument('--target-ms', type=float, default=500.0, help='recovery time to meet')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    link = os.path.join(tempfile.mkdtemp(prefix='bench_reconnect_'), 'ttySIM')
+    device = ServoMonitorSim(link=link)
+    arrivals = []  # (time.monotonic(), first t_ms, last t_ms, count) per batch
+
+    def on_batch(batch):
+        arrivals.append((time.monotonic(), int(batch['t_ms'][0]), int(batch['t_ms'][-1]), len(batch)))
+
+    with Simulator([device]) as sim:
+        acquisition = SerialAcquisition(link, on_batch, sample_interval_ms=args.interval)
+        reader = threading.Thread(target=acquisition.run, daemon=True)
+        reader.start()
+        time.sleep(1.0)
+
+        results = []
+        injected_restarts = 0
+        for cycle in range(args.cycles):
+            seconds = rng.uniform(0.2, 1.0)
+            reset = cycle % 2 == 1
+            injected_restarts += reset
+            device.unplug(seconds, reset=reset)
+            while device.online:
+                time.sleep(0.001)
+            while not device.online:
+                time.sleep(0.001)
+            back = time.monotonic()
+            time.sleep(1.0)
+            after = [a for a in arrivals if a[0] >= back]
+            recovery = (after[0][0] - back) * 1000 if after else float('nan')
+            results.append((cycle, seconds, reset, recovery))
+            print(f"cycle {cycle:2d}: unplugged {seconds * 1000:4.0f} ms, "
+                  f"{'reset' if reset else 'running'}, recovered in {recovery:6.1f} ms")
+
+        acquisition.close()
+        reader.join()
+
+    recoveries = np.array([r[3] for r in results])
+    stats = acquisition.stats()
+    print(f"\nrecovery p50 {np.nanmedian(recoveries):.1f} ms, max {np.nanmax(recoveries):.1f} ms "
+          f"({'within' if np.nanmax(recoveries) < args.target_ms else 'OVER'} {args.target_ms:g} ms)")
+    print(f"restarts reported {stats['restarts']} / injected {injected_restarts}; "
+          f"gaps reported {stats['gaps']} (~{stats['missing']} samples) / "
+          f"injected {args.cycles - injected_restarts}")
+    print(f"samples received {sum(a[3] for a in arrivals)}, connects {stats['connects']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Per-sample decode cost of the schema-driven parsers (schema.py) against the
+number of channels.
+
+For schemas of 4 (the default), 8, 16 ... channels, a synthetic stream is
+cut into chunks the size of one serial read (--chunk bytes) and decoded the
+way SerialAcquisition does:
+
+  csv-lines   the old loop: split every line and int() every field
+  csv-block   Schema.parse_lines: one NumPy parse per block of lines
+  binary      FrameParser for the schema's frames (the default schema uses
+              the original 9-byte frame with its flags byte)
+  convert     Schema.convert of the decoded batch onto the default storage
+              schema (what a host storing fewer channels than the board
+              sends pays per batch)
+
+The numbers are ns per sample. The block parsers make the same few NumPy
+calls whatever the channel count, but those run over every byte, so their
+cost grows with the bytes per sample: on the development machine csv-block
+went from about 300 to 1500 ns and binary from 150 to 340 ns between 4 and
+16 channels (csv-lines: 1850 to 5300 ns). No board needed.
+
+Usage:
+    python bench_schema.py [--channels 4 8 16] [--samples 200000] [--chunk 4096]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from protocol import encode_frame, encode_records
+from schema import Schema, DEFAULT_SCHEMA
+
+def make_schema(channels):
+    """The default channels plus int16 ones up to `channels`"""
+    if channels <= len(DEFAULT_SCHEMA):
+        return DEFAULT_SCHEMA
+    extra = "".join(f",ch{i}:i2" for i in range(len(DEFAULT_SCHEMA), channels))
+    return Schema.parse(str(DEFAULT_SCHEMA) + extra)
+
+def make_records(schema, n):
+    records = np.zeros(n, dtype=schema.dtype)
+    records['t_ms'] = np.arange(n) * 10
+    records['angle'] = (45 + 80 * np.sin(np.arange(n) / 100)).astype(int)
+    records['buzzer'] = records['angle'] > 90
+    for i, name in enumerate(schema.names[len(DEFAULT_SCHEMA):]):
+        records[name] = (1000 * np.sin(np.arange(n) / 50 + i)).astype(int)
+    return records
+
+def encode_csv(records):
+    return "".join(",".join(map(str, row)) + "\r\n" for row in records.tolist()).encode()
+
+def encode_binary(schema, records):
+    if schema.flags_frame:
+        return b"".join(encode_frame(*row) for row in records.tolist())
+    return encode_records(records)
+
+def chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+def decode_csv_lines(schema, parts):
+    """The per-line parse the host scripts used before LineReader/parse_int_lines"""
+    n = 0
+    tail = b''
+    columns = len(schema)
+    for part in parts:
+        lines = (tail + part).split(b'\n')
+        tail = lines.pop()
+        for line in lines:
+            fields = line.strip().split(b',')
+            if len(fields) == columns:
+                [int(f) for f in fields]
+                n += 1
+    return n
+
+def decode_csv_block(schema, parts):
+    n = 0
+    tail = b''
+    for part in parts:
+        data = tail + part
+        cut = data.rfind(b'\n') + 1
+        tail = data[cut:]
+        records, _ = schema.parse_lines(data[:cut])
+        n += len(records)
+    return n
+
+def decode_binary(schema, parts):
+    parser = schema.frame_parser()
+    return sum(len(parser.feed(part)) for part in parts)
+
+def decode_convert(schema, parts):
+    parser = schema.frame_parser()
+    return sum(len(DEFAULT_SCHEMA.convert(parser.feed(part))) for part in parts)
+
+METHODS = [
+    ('csv-lines', 'csv', decode_csv_lines),
+    ('csv-block', 'csv', decode_csv_block),
+    ('binary', 'binary', decode_binary),
+    ('convert', 'binary', decode_convert),
+]
+
+def best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        n = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, n
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--channels', type=int, nargs='+', default=[4, 8, 16])
+    parser.add_argument('--samples', type=int, default=200_000)
+    parser.add_argument('--chunk', type=int, default=4096, help='bytes per simulated serial read')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'channels':>8} {'B/sample csv':>13} {'B/sample bin':>13}   "
+          + "".join(f"{name:>11}" for name, _, _ in METHODS) + "   (ns/sample)")
+    for channels in args.channels:
+        schema = make_schema(channels)
+        records = make_records(schema, args.samples)
+        streams = {'csv': encode_csv(records), 'binary': encode_binary(schema, records)}
+        parts = {kind: chunks(data, args.chunk) for kind, data in streams.items()}
+        cells = []
+        for name, kind, fn in METHODS:
+            elapsed, n = best_of(lambda: fn(schema, parts[kind]), args.repeat)
+            if n != args.samples:
+                print(f"{name}: decoded {n} of {args.samples} samples")
+            cells.append(f"{elapsed / n * 1e9:>11.0f}")
+        print(f"{channels:>8} {len(streams['csv']) / args.samples:>13.1f} "
+              f"{len(streams['binary']) / args.samples:>13.1f}   " + "".join(cells))
+
+if __name__ == '__main__':
+    main()
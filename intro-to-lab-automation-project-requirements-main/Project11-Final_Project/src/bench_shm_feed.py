@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Fan-out benchmark for the shared-memory feed (shm_feed.py).
+
+A writer publishes batches into a SharedSampleRing at a fixed rate while
+1, 2, 4 and 8 reader processes follow it with since(). For each reader count
+we report the writer's cost per batch (it should stay flat, readers never
+touch the writer) and how many samples the readers received or lost.
+
+Usage:
+    python bench_shm_feed.py [--seconds 2] [--batch 100] [--rate 1000]
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from ring_buffer import SAMPLE_DTYPE
+from shm_feed import SharedSampleRing
+
+READER_COUNTS = (1, 2, 4, 8)
+
+def follow(name, stop, received, lost):
+    """Reader process: follow the ring until stop is set"""
+    ring = SharedSampleRing.attach(name)
+    seq = ring.cursor
+    total = missed = 0
+    while not stop.is_set():
+        view, seq, dropped = ring.since(seq)
+        if len(view):
+            view['angle'].sum()  # Touch the data like a consumer would
+            total += len(view)
+            missed += dropped
+        else:
+            time.sleep(0.0005)
+    view, seq, dropped = ring.since(seq)
+    received.value = total + len(view)
+    lost.value = missed + dropped
+    del view
+    ring.close()
+
+def run(readers, seconds, batch_size, rate):
+    name = f"bench_shm_{os.getpid()}_{readers}"
+    ring = SharedSampleRing.create(name, capacity=1_000_000)
+    stop = multiprocessing.Event()
+    counters = [(multiprocessing.Value('q', 0), multiprocessing.Value('q', 0)) for _ in range(readers)]
+    procs = [multiprocessing.Process(target=follow, args=(name, stop, r, l)) for r, l in counters]
+    for p in procs:
+        p.start()
+    time.sleep(0.5)  # Let the readers attach
+
+    batch = np.zeros(batch_size, dtype=SAMPLE_DTYPE)
+    batch['angle'] = np.arange(batch_size) % 160
+    period = 1.0 / rate
+    costs = []
+    start = next_batch = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        t0 = time.perf_counter()
+        ring.extend(batch)
+        costs.append(time.perf_counter() - t0)
+        next_batch += period
+        delay = next_batch - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    stop.set()
+    for p in procs:
+        p.join()
+    published = len(costs) * batch_size
+    received = [r.value for r, _ in counters]
+    lost = [l.value for _, l in counters]
+    ring.close()
+    return np.median(costs) * 1e6, published, min(received), max(lost)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--batch', type=int, default=100, help='samples per batch')
+    parser.add_argument('--rate', type=float, default=1000.0, help='batches per second')
+    args = parser.parse_args()
+
+    print(f"{'readers':>8} {'write us/batch':>15} {'published':>10} {'min received':>13} {'max lost':>9}")
+    for readers in READER_COUNTS:
+        cost, published, received, lost = run(readers, args.seconds, args.batch, args.rate)
+        print(f"{readers:>8} {cost:>15.2f} {published:>10} {received:>13} {lost:>9}")
+
+if __name__ == '__main__':
+    main()
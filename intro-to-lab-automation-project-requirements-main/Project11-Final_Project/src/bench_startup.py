@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: import cost and time to first sample of the host scripts.
+
+Two measurements, both from fresh interpreters run with `python -X importtime`:
+
+  import      `import <module>` of each GUI script, without running it:
+              everything the module loads before main() can start. Scripts
+              whose dependencies are not installed are reported as such.
+  first       src.py (needs a display) and daemon.py against a simulated
+              board (common/arduino_sim.py): time from launch until the
+              script reports its first valid sample ("Serial connection
+              established"), and which top-level imports happened before it.
+
+Each is repeated --runs times and the median is shown. Run it before and
+after a change to catch startup regressions. Linux/macOS only for `first`
+(needs os.openpty).
+
+Usage:
+    python bench_startup.py [--runs 5] [--only import first] [--top 8]
+"""
+
+import argparse
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+DIR = os.path.dirname(os.path.realpath(__file__))
+ROOT = os.path.join(DIR, '..', '..')
+sys.path.insert(0, os.path.join(ROOT, 'common'))
+
+# (label, directory, module)
+IMPORT_TARGETS = [
+    ('Project11 src.py', DIR, 'src'),
+    ('Project11 daemon.py', DIR, 'daemon'),
+    ('Project8 src.py', os.path.join(ROOT, 'Project8-communication-with-the-computer', 'src'), 'src'),
+    ('Project8 proj8.py', os.path.join(ROOT, 'Project8-communication-with-the-computer', 'ptoj8'), 'proj8'),
+    ('Project8.1 src.py', os.path.join(ROOT, 'Project8.1-Firmata_approach'), 'src'),
+    ('Project9 proj9.py', os.path.join(ROOT, 'Project9-Latency', 'src'), 'proj9'),
+]
+READY_MARKER = "Serial connection established"
+FIRST_TIMEOUT = 30.0
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+def top_level_imports(lines, depth=0):
+    """{module: cumulative us} of the imports `depth` levels down in -X importtime output"""
+    modules = {}
+    for line in lines:
+        m = IMPORT_LINE.match(line)
+        if m and len(m.group(3)) == 2 * depth:
+            modules[m.group(4)] = modules.get(m.group(4), 0) + int(m.group(2))
+    return modules
+
+def measure_import(directory, module):
+    """Seconds for `import module` and its direct imports, or (None, error)"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            cwd=directory, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode:
+        error = result.stderr.strip().splitlines()[-1]
+        return None, error
+    return elapsed, top_level_imports(result.stderr.splitlines(), depth=1)
+
+def measure_first_sample(args, port):
+    """Seconds from launch to READY_MARKER, and the imports logged before it"""
+    proc = subprocess.Popen([sys.executable, '-u', '-X', 'importtime', *args, '--port', port],
+                            cwd=DIR, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    start = time.perf_counter()
+    ready = threading.Event()
+    stderr_lines = []  # (arrival time, line); None marks the first sample
+
+    def read_stdout():
+        for line in proc.stdout:
+            if READY_MARKER in line:
+                stderr_lines.append((time.perf_counter(), None))
+                ready.set()
+
+    def read_stderr():
+        for line in proc.stderr:
+            stderr_lines.append((time.perf_counter(), line))
+
+    threads = [threading.Thread(target=read_stdout, daemon=True),
+               threading.Thread(target=read_stderr, daemon=True)]
+    for thread in threads:
+        thread.start()
+    ok = ready.wait(FIRST_TIMEOUT)
+    first = time.perf_counter() - start
+    proc.send_signal(signal.SIGINT)
+    try:
+        proc.wait(10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+    for thread in threads:
+        thread.join(1)
+    if not ok:
+        errors = [line for _, line in stderr_lines if line and not line.startswith('import time')]
+        return None, (errors[-1].strip() if errors else "no sample within the timeout")
+    before = []
+    for _, line in stderr_lines:
+        if line is None:
+            break
+        before.append(line)
+    return first, top_level_imports(before)
+
+def show_imports(modules, top):
+    heaviest = sorted(modules.items(), key=lambda item: -item[1])[:top]
+    return ", ".join(f"{name} {us / 1000:.0f}" for name, us in heaviest)
+
+def run_imports(runs, top):
+    print(f"{'import':<22} {'median ms':>10}   heaviest imports of the module (ms)")
+    for label, directory, module in IMPORT_TARGETS:
+        times, modules = [], None
+        for _ in range(runs):
+            elapsed, modules = measure_import(directory, module)
+            if elapsed is None:
+                break
+            times.append(elapsed)
+        if not times:
+            print(f"{label:<22} {'-':>10}   {modules}")
+            continue
+        print(f"{label:<22} {np.median(times) * 1000:>10.0f}   {show_imports(modules, top)}")
+
+def run_first_sample(runs, top):
+    from arduino_sim import Simulator, ServoMonitorSim
+
+    tmp = tempfile.mkdtemp(prefix='bench_startup_')
+    targets = [('daemon.py', ['daemon.py', '--listen', '127.0.0.1:0',
+                              '--log-base', os.path.join(tmp, 'log')])]
+    if os.environ.get('DISPLAY') or sys.platform in ('win32', 'darwin'):
+        targets.insert(0, ('src.py', ['src.py']))
+    else:
+        print("src.py skipped: no display (set DISPLAY, e.g. under xvfb-run)")
+
+    print(f"{'first sample':<22} {'median ms':>10}   imports before the first sample (ms)")
+    for label, args in targets:
+        times, modules = [], None
+        for _ in range(runs):
+            # A fresh board each run, so every script starts from a reset sketch
+            with Simulator([ServoMonitorSim()]).start(process=True) as sim:
+                elapsed, modules = measure_first_sample(args, sim.devices[0].port)
+            if elapsed is None:
+                break
+            times.append(elapsed)
+        if not times:
+            print(f"{label:<22} {'-':>10}   {modules}")
+            continue
+        print(f"{label:<22} {np.median(times) * 1000:>10.0f}   "
+              f"{sum(modules.values()) / 1000:.0f} total: {show_imports(modules, top)}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--only', nargs='+', choices=('import', 'first'), default=['import', 'first'])
+    parser.add_argument('--top', type=int, default=5, help='heaviest imports listed per script')
+    args = parser.parse_args()
+
+    if 'import' in args.only:
+        run_imports(args.runs, args.top)
+    if 'first' in args.only:
+        if 'import' in args.only:
+            print()
+        run_first_sample(args.runs, args.top)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+"""
+Host-side control rules for the servo monitor.
+
+The buzzer thresholds used to be hard-coded in src.ino's loop(), so changing
+one meant reflashing. ControlEngine evaluates ThresholdRules on every
+decoded batch instead and drives the actuators with short commands over the
+same port (see protocol.py and src.ino):
+
+    Z1 / Z0   buzzer on/off; the sketch's own thresholds stay suspended as
+              long as the host keeps talking (KEEPALIVE_INTERVAL)
+    F1 / F0   fan on/off, same as pressing the button
+    H0        buzzer back to the sketch (also after 2 s without commands)
+
+The fan interlock (no fan while the buzzer sounds) stays on the board.
+
+A rule switches its actuator on while its channel (the angle unless the
+rule names another one of the schema, e.g. "channel": "accel_z", see
+schema.py) is above `above` or below `below`, and off once it is back
+inside by `hysteresis`. With
+`debounce_ms` the condition has to hold that long (board time) before the
+rule switches either way. Rules are read from a JSON list, e.g. rules.json:
+
+    [{"name": "tilt alarm", "actuator": "buzzer", "above": 90, "below": 10,
+      "hysteresis": 3, "debounce_ms": 50, "max_latency_ms": 250}]
+
+Reaction latency is measured per rule with the board's own timestamps: from
+the sample that switched the rule to the first sample that reports the
+actuator in its new state. That covers the way to the host, the decision,
+the command back and the next sample, so it is quantized to the sample
+interval. Reactions slower than max_latency_ms are counted as late.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from protocol import BUZZER_COMMAND, FAN_COMMAND, RELEASE_CONTROL
+
+# Shared helpers live in intro-to-lab-automation-project-requirements-main/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', 'common'))
+from latency_probe import LatencyHistogram
+
+ACTUATORS = {'buzzer': BUZZER_COMMAND, 'fan': FAN_COMMAND}  # SAMPLE_DTYPE flag -> command
+KEEPALIVE_INTERVAL = 0.5  # Resend the states; the sketch takes the buzzer back after 2 s
+CONFIRM_TIMEOUT = 2.0     # Seconds before a switch the board never reported is given up
+MAX_LATENCY_MS = 250
+
+# The thresholds that used to be hard-coded in src.ino
+DEFAULT_RULES = [
+    {'name': 'tilt alarm', 'actuator': 'buzzer', 'above': 90, 'below': 10},
+]
+
+class ThresholdRule:
+    def __init__(self, name, actuator, above=None, below=None, hysteresis=0,
+                 debounce_ms=0, max_latency_ms=MAX_LATENCY_MS, channel='angle'):
+        if actuator not in ACTUATORS:
+            raise ValueError(f"Rule {name!r}: unknown actuator {actuator!r} "
+                             f"(expected one of: {', '.join(ACTUATORS)})")
+        if above is None and below is None:
+            raise ValueError(f"Rule {name!r} needs 'above' and/or 'below'")
+        self.name = name
+        self.actuator = actuator
+        self.channel = channel
+        self.above = above
+        self.below = below
+        self.hysteresis = hysteresis
+        self.debounce_ms = debounce_ms
+        self.max_latency_ms = max_latency_ms
+        self.on = False
+        self.switches = 0
+        self.late = 0
+        self.unconfirmed = 0
+        self.latency = LatencyHistogram()  # Reaction latency in ns
+        self.pending = None  # (state, t_ms of the switching sample, time.monotonic() at send)
+        self._since = None   # Board time the switch condition started holding
+
+    def adopt(self, old):
+        """Carry state and statistics over from the rule this one replaces"""
+        self.on = old.on
+        self.switches, self.late, self.unconfirmed = old.switches, old.late, old.unconfirmed
+        self.latency = old.latency
+        if old.actuator == self.actuator:
+            self.pending = old.pending
+
+    def command(self):
+        return ACTUATORS[self.actuator] + (b'1\n' if self.on else b'0\n')
+
+    def thresholds(self):
+        return [y for y in (self.above, self.below) if y is not None]
+
+    def _outside(self, angle):
+        outside = np.zeros(len(angle), dtype=bool)
+        if self.above is not None:
+            outside |= angle > self.above
+        if self.below is not None:
+            outside |= angle < self.below
+        return outside
+
+    def _inside(self, angle):
+        inside = np.ones(len(angle), dtype=bool)
+        if self.above is not None:
+            inside &= angle <= self.above - self.hysteresis
+        if self.below is not None:
+            inside &= angle >= self.below + self.hysteresis
+        return inside
+
+    def evaluate(self, t, angle):
+        """Run the rule over one batch (t as int64 ms, angle: its channel).
+
+        Returns the index of the sample that made the last switch, or None.
+        Jumps from one candidate run to the next with NumPy instead of
+        stepping through every sample in Python.
+        """
+        outside = self._outside(angle)
+        inside = self._inside(angle)
+        n = len(t)
+        i = 0
+        switched = None
+        while i < n:
+            cond = inside[i:] if self.on else outside[i:]
+            if self._since is None:
+                j = int(np.argmax(cond))
+                if not cond[j]:
+                    break
+                i += j
+                cond = cond[j:]
+                self._since = int(t[i])
+            # The run of samples in which the condition keeps holding
+            k = int(np.argmin(cond))
+            end = n if cond[k] else i + k
+            due = i + int(np.searchsorted(t[i:end], self._since + self.debounce_ms))
+            if due < end:
+                self.on = not self.on
+                self.switches += 1
+                self._since = None
+                switched = due
+                i = due + 1
+            elif end < n:
+                self._since = None  # Interrupted before debounce_ms
+                i = end
+            else:
+                break  # Still holding at the end of the batch
+        return switched
+
+    def confirm(self, batch, t, now):
+        """Look for the first sample that shows the switch sent earlier"""
+        if self.pending is None:
+            return
+        state, t_trigger, sent_at = self.pending
+        shown = (batch[self.actuator] == state) & (t > t_trigger)
+        index = int(np.argmax(shown))
+        if shown[index]:
+            latency_ms = int(t[index]) - t_trigger
+            self.latency.record(latency_ms * 1_000_000)
+            if latency_ms > self.max_latency_ms:
+                self.late += 1
+            self.pending = None
+        elif now - sent_at > CONFIRM_TIMEOUT or int(t[-1]) < t_trigger:
+            # Never showed up (e.g. the fan interlock), or the board restarted
+            self.unconfirmed += 1
+            self.pending = None
+
+    def stats(self):
+        return {'name': self.name,
+                'actuator': self.actuator,
+                'on': self.on,
+                'switches': self.switches,
+                'late': self.late,
+                'unconfirmed': self.unconfirmed,
+                'max_latency_ms': self.max_latency_ms,
+                'reaction_ms': {key: value / 1e6 if key != 'count' else value
+                                for key, value in self.latency.summary().items()}}
+
+class ControlEngine:
+    """Evaluates the rules on each batch and sends the actuator commands.
+
+    Call process() from the thread that reads the port (on_batch), and pass
+    a `send` that writes bytes to that port, e.g. SerialAcquisition.send.
+    set_rules() and release() may come from another thread (the GUI); a
+    lock keeps them from interleaving with process() and its send.
+    """
+
+    def __init__(self, rules, send, channels=None):
+        self.send = send
+        self.channels = channels  # Schema names the batches have, checked against the rules
+        self.rules = []
+        self.decision = LatencyHistogram()  # Host time per batch (rules + send), ns
+        self._last_keepalive = None
+        self._lock = threading.Lock()
+        self.set_rules(rules)
+
+    def set_rules(self, rules):
+        """Switch to new rules, e.g. after editing rules.json; rules with the
+        same name keep their state and statistics"""
+        rules = [rule if isinstance(rule, ThresholdRule) else ThresholdRule(**rule)
+                 for rule in rules]
+        for rule in rules:
+            if self.channels is not None and rule.channel not in self.channels:
+                raise ValueError(f"Rule {rule.name!r}: no channel {rule.channel!r} "
+                                 f"(have: {', '.join(self.channels)})")
+        actuators = [rule.actuator for rule in rules]
+        for actuator in set(actuators):
+            if actuators.count(actuator) > 1:
+                raise ValueError(f"More than one rule drives the {actuator}")
+        with self._lock:
+            old = {rule.name: rule for rule in self.rules}
+            for rule in rules:
+                if rule.name in old:
+                    rule.adopt(old[rule.name])
+            if 'buzzer' not in actuators and any(rule.actuator == 'buzzer' for rule in self.rules):
+                self.send(RELEASE_CONTROL)
+            self.rules = rules
+            self._last_keepalive = None  # Send every state with the next batch
+
+    def process(self, batch):
+        if not len(batch):
+            return
+        start = time.perf_counter_ns()
+        now = time.monotonic()
+        t = batch['t_ms'].astype(np.int64)
+        commands = []
+        with self._lock:
+            for rule in self.rules:
+                rule.confirm(batch, t, now)
+                was_on = rule.on
+                index = rule.evaluate(t, batch[rule.channel])
+                if index is not None and rule.on != was_on:
+                    rule.pending = (int(rule.on), int(t[index]), now)
+                    commands.append(rule.command())
+            if self._last_keepalive is None or now - self._last_keepalive >= KEEPALIVE_INTERVAL:
+                commands = [rule.command() for rule in self.rules]
+                self._last_keepalive = now
+            if commands:
+                self.send(b''.join(commands))
+        self.decision.record(time.perf_counter_ns() - start)
+
+    def release(self):
+        """Hand the buzzer back to the sketch's own thresholds"""
+        with self._lock:
+            self.send(RELEASE_CONTROL)
+
+    def status(self):
+        """One line for the GUI"""
+        parts = []
+        for rule in self.rules:
+            p99 = rule.latency.percentile(99) / 1e6
+            parts.append(f"{rule.name}: {'ON' if rule.on else 'off'}, "
+                         f"p99 {p99:.0f} ms, {rule.late} late" if rule.latency.count
+                         else f"{rule.name}: {'ON' if rule.on else 'off'}")
+        return "   ".join(parts)
+
+    def report(self):
+        lines = []
+        for rule in self.rules:
+            lines.append(f"{rule.name} ({rule.actuator}): {rule.switches} switches, "
+                         f"{rule.late} over {rule.max_latency_ms} ms, {rule.unconfirmed} unconfirmed")
+            lines.append(f"  reaction {rule.latency.format()}")
+        lines.append(f"host time per batch: {self.decision.format(1e3, 'us')}")
+        return "\n".join(lines)
+
+    def stats(self):
+        return {'rules': [rule.stats() for rule in self.rules],
+                'decision_us': {key: value / 1e3 if key != 'count' else value
+                                for key, value in self.decision.summary().items()}}
+
+def load_rules(path=None):
+    """ThresholdRules from a JSON list (see the module docstring), or DEFAULT_RULES"""
+    if path is None:
+        return [ThresholdRule(**rule) for rule in DEFAULT_RULES]
+    with open(path) as f:
+        return [ThresholdRule(**rule) for rule in json.load(f)]
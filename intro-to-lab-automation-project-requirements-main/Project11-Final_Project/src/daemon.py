@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Headless acquisition daemon for the servo monitor.
+
+Reads the Arduino, logs every sample and publishes the stream on a local
+socket, without importing tkinter or matplotlib. It starts quickly and runs
+fine on a server. The GUI becomes an optional client:
+
+    python daemon.py --port /dev/ttyACM0 --formats csv npy
+    python src.py --attach 127.0.0.1:5011
+
+With --shm NAME the samples are also published in a shared-memory ring that
+any number of local processes can map without copying (see shm_feed.py):
+
+    python daemon.py --port /dev/ttyACM0 --shm servo
+    python src.py --shm servo
+
+--schema sets the channels kept, logged and published (schema.py; default:
+the four standard ones); the sketch's channels are matched by name, so
+
+    python daemon.py --schema t_ms:u4,angle:i2,buzzer:u1,fan:u1,accel_x:i2,accel_y:i2,accel_z:i2
+
+also logs the raw accelerometer axes. Feed and shared-memory clients get
+the schema with the samples.
+
+The buzzer thresholds are evaluated here (control.py, rules.json next to
+this script or --rules FILE) and sent to the sketch as commands; edit the
+file and restart the daemon to change them. --local-control leaves them to
+the sketch. Reaction latency per rule is printed on exit.
+
+--metrics FILE rewrites the reader and logger counters (bytes/s, samples/s,
+parse errors, queue depth, write/flush times; see metrics.py) every 5 s,
+as Prometheus text for a .prom file, JSON otherwise. --profile profiles the
+whole run (reader loop included) and prints the top functions on exit.
+
+Stop it with Ctrl+C (or SIGTERM); queued log rows are written out first.
+"""
+
+import argparse
+import os
+import signal
+import sys
+
+from acquisition import SerialAcquisition, BAUD_RATE, SAMPLE_INTERVAL_MS
+from control import ControlEngine, load_rules
+from data_logger import BufferedLogger, make_sink
+from live_feed import FeedServer, parse_address, FEED_HOST, FEED_PORT
+from shm_feed import SharedSampleRing
+from schema import Schema, DEFAULT_SCHEMA
+
+# Shared helpers live in intro-to-lab-automation-project-requirements-main/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', 'common'))
+from metrics import Metrics, MetricsExporter, ProfileCapture
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', default='COM5', help='serial port of the Arduino')
+    parser.add_argument('--baud', type=int, default=BAUD_RATE)
+    parser.add_argument('--interval', type=int, default=SAMPLE_INTERVAL_MS, help='sample interval (ms)')
+    parser.add_argument('--csv-protocol', action='store_true', help='do not ask for binary frames')
+    parser.add_argument('--schema', type=Schema.parse, default=DEFAULT_SCHEMA,
+                        help='channels to keep, name:type,... (default: %(default)s)')
+    parser.add_argument('--formats', nargs='+', default=['csv', 'npy'], choices=('csv', 'npy', 'parquet'))
+    parser.add_argument('--log-base', help='log path prefix (default: data_log next to this script)')
+    parser.add_argument('--listen', default=f"{FEED_HOST}:{FEED_PORT}", help='feed address host:port')
+    parser.add_argument('--shm', metavar='NAME', help='also publish into a shared-memory ring')
+    parser.add_argument('--shm-capacity', type=int, default=1_000_000, help='samples kept in the ring')
+    parser.add_argument('--rules', help='control rules JSON (default: rules.json next to this script)')
+    parser.add_argument('--local-control', action='store_true', help="keep the sketch's built-in thresholds")
+    parser.add_argument('--metrics', metavar='FILE', help='write counters and timings to FILE every 5 s')
+    parser.add_argument('--profile', action='store_true', help='profile the run, saved as profile_<time>.pstats')
+    args = parser.parse_args()
+
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    rules_path = args.rules or os.path.join(dir_path, "rules.json")
+    rules = None if args.local_control else load_rules(
+        rules_path if args.rules or os.path.exists(rules_path) else None)
+
+    log_base_path = args.log_base or os.path.join(dir_path, "data_log")
+    logger = BufferedLogger(make_sink(log_base_path, args.formats, args.schema.dtype)).start()
+    server = FeedServer(*parse_address(args.listen), schema=args.schema).start()
+    shm_ring = SharedSampleRing.create(args.shm, args.shm_capacity, schema=args.schema) if args.shm else None
+
+    engine = None
+
+    def on_batch(batch):
+        if engine:
+            engine.process(batch)
+        logger.log_batch(batch)
+        if shm_ring is not None:
+            shm_ring.extend(batch)
+        server.publish(batch)
+
+    acquisition = SerialAcquisition(args.port, on_batch, baud_rate=args.baud,
+                                    sample_interval_ms=args.interval,
+                                    binary=not args.csv_protocol, schema=args.schema)
+    if rules is not None:
+        engine = ControlEngine(rules, acquisition.send, channels=args.schema.names)
+
+    metrics = Metrics(prefix='servo_daemon_')
+    acquisition.add_metrics(metrics)
+    logger.add_metrics(metrics)
+    exporter = MetricsExporter(metrics, args.metrics).start() if args.metrics else None
+    profiler = ProfileCapture(dir_path) if args.profile else None
+
+    def shutdown(sig, frame):
+        print("\nStopping acquisition...")
+        acquisition.stop()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    try:
+        if profiler:
+            profiler.start()
+        acquisition.run()
+    finally:
+        if profiler:
+            profiler.stop()
+        if engine:
+            print(engine.report())
+        acquisition.close()
+        server.close()
+        if shm_ring is not None:
+            shm_ring.close()
+        logger.close()
+        print(f"Log files closed ({logger.written} rows written, {logger.dropped} dropped)")
+        if exporter:
+            exporter.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,366 @@
+"""
+Background data logger for the servo monitor.
+
+The acquisition thread only does a non-blocking put() into a bounded queue.
+A writer thread drains the queue in batches, hands them to a sink and flushes
+every `batch_rows` rows or every `flush_interval` seconds, whichever comes
+first (optionally followed by os.fsync so a crash or power cut loses at most
+one flush window). If the disk cannot keep up, the queue fills and new rows
+are counted as dropped instead of stalling the serial loop.
+
+Sinks are pluggable: CsvSink keeps the familiar data_log.csv, NpySink writes
+an append-only binary .npy of SAMPLE_DTYPE records that loads back as a
+memory map (see log_reader.py), and ParquetSink writes row groups through
+pyarrow when it is installed. MultiSink fans one stream out to several.
+Every sink takes the record dtype, so logs follow the configured schema
+(schema.py): one CSV column, .npy field or Parquet column per channel.
+"""
+
+import csv
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+
+from ring_buffer import SAMPLE_DTYPE
+
+# Shared helpers live in intro-to-lab-automation-project-requirements-main/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', 'common'))
+from metrics import Timer
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+CSV_HEADER = ["Time (ms)", "Angle (deg)", "Buzzer State", "Fan State"]
+NPY_HEADER_LEN = 256  # At least; fixed per file so the row count can be rewritten in place
+NPY_PREFIX_LEN = 10   # Magic string (6) + version (2) + header length (2)
+NPY_ALIGN = 64        # Data offset alignment of the .npy format
+
+_STOP = object()
+
+def csv_header(dtype):
+    """Column titles: the familiar ones for the SAMPLE_DTYPE fields, names for the rest"""
+    titles = dict(zip(SAMPLE_DTYPE.names, CSV_HEADER))
+    return [titles.get(name, name) for name in np.dtype(dtype).names]
+
+class CsvSink:
+    """Writes rows to a CSV file with a header line"""
+
+    def __init__(self, path, dtype=SAMPLE_DTYPE, header=None):
+        header = header or csv_header(dtype)
+        self.path = path
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(header)
+
+    def write_rows(self, rows):
+        if isinstance(rows, np.ndarray):
+            rows = rows.tolist()
+        self._writer.writerows(rows)
+
+    def flush(self, fsync=False):
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+class NpySink:
+    """Append-only .npy file; the header row count is rewritten on every flush.
+
+    Readers should take the row count from the file size (log_reader does),
+    so rows written after the last flush are still recovered after a crash.
+    """
+
+    def __init__(self, path, dtype=SAMPLE_DTYPE):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.rows = 0
+        # Room for the longest row count, so the header never changes size;
+        # prefix + header is a multiple of NPY_ALIGN like numpy.lib.format's
+        longest = NPY_PREFIX_LEN + len(self._header_dict(2 ** 63)) + 1
+        self._data_offset = max(NPY_HEADER_LEN, -(-longest // NPY_ALIGN) * NPY_ALIGN)
+        self._file = open(path, "wb")
+        self._write_header()
+
+    def _header_dict(self, rows):
+        return repr({
+            'descr': np.lib.format.dtype_to_descr(self.dtype),
+            'fortran_order': False,
+            'shape': (rows,),
+        })
+
+    def _write_header(self):
+        header = self._header_dict(self.rows).ljust(self._data_offset - NPY_PREFIX_LEN - 1) + "\n"
+        self._file.seek(0)
+        self._file.write(np.lib.format.magic(1, 0))
+        self._file.write(struct.pack("<H", len(header)))
+        self._file.write(header.encode("latin1"))
+        self._file.seek(0, os.SEEK_END)
+
+    def write_rows(self, rows):
+        data = np.asarray(rows, dtype=self.dtype)
+        self._file.write(data.tobytes())
+        self.rows += len(data)
+
+    def flush(self, fsync=False):
+        self._write_header()
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+class ParquetSink:
+    """Parquet file written one row group per `row_group_rows` rows (needs pyarrow)"""
+
+    def __init__(self, path, dtype=SAMPLE_DTYPE, row_group_rows=65536):
+        if pq is None:
+            raise ImportError("ParquetSink needs pyarrow (pip install pyarrow)")
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.row_group_rows = row_group_rows
+        self._pending = []
+        self._pending_rows = 0
+        schema = pa.schema([(name, pa.from_numpy_dtype(self.dtype[name]))
+                            for name in self.dtype.names])
+        self._writer = pq.ParquetWriter(path, schema)
+
+    def write_rows(self, rows):
+        data = np.asarray(rows, dtype=self.dtype)
+        self._pending.append(data)
+        self._pending_rows += len(data)
+
+    def _write_row_group(self):
+        data = np.concatenate(self._pending)
+        table = pa.table({name: data[name] for name in self.dtype.names})
+        self._writer.write_table(table)
+        self._pending = []
+        self._pending_rows = 0
+
+    def flush(self, fsync=False):
+        # Small row groups make the file slow to read, so only full ones are
+        # written here; the remainder goes out on close().
+        if self._pending_rows >= self.row_group_rows:
+            self._write_row_group()
+
+    def close(self):
+        if self._writer is None:
+            return
+        if self._pending_rows:
+            self._write_row_group()
+        self._writer.close()
+        self._writer = None
+
+class MultiSink:
+    """Sends every batch to several sinks"""
+
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+
+    def write_rows(self, rows):
+        for sink in self.sinks:
+            sink.write_rows(rows)
+
+    def flush(self, fsync=False):
+        for sink in self.sinks:
+            sink.flush(fsync)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+class DeviceSink:
+    """Routes (device_id, rows) items to one sink per device.
+
+    Used by the acquisition hub so a single writer thread serves every
+    board; the files are opened on first use as <base_path>_<device_id>.<fmt>.
+    """
+
+    def __init__(self, base_path, formats=('csv',), dtype=SAMPLE_DTYPE):
+        self.base_path = base_path
+        self.formats = formats
+        self.dtype = dtype
+        self.sinks = {}
+        self.rows = {}
+
+    def write_rows(self, items):
+        for device_id, rows in items:
+            sink = self.sinks.get(device_id)
+            if sink is None:
+                sink = make_sink(f"{self.base_path}_{device_id}", self.formats, self.dtype)
+                self.sinks[device_id] = sink
+                self.rows[device_id] = 0
+            sink.write_rows(rows)
+            self.rows[device_id] += len(rows)
+
+    def flush(self, fsync=False):
+        for sink in self.sinks.values():
+            sink.flush(fsync)
+
+    def close(self):
+        for sink in self.sinks.values():
+            sink.close()
+
+SINK_TYPES = {
+    'csv': CsvSink,
+    'npy': NpySink,
+    'parquet': ParquetSink,
+}
+
+def make_sink(base_path, formats=('csv',), dtype=SAMPLE_DTYPE):
+    """Open one sink per format at base_path + '.<format>'"""
+    sinks = [SINK_TYPES[fmt](f"{base_path}.{fmt}", dtype) for fmt in formats]
+    return sinks[0] if len(sinks) == 1 else MultiSink(sinks)
+
+class BufferedLogger:
+    """Queue + writer thread in front of a sink"""
+
+    def __init__(self, sink, max_queue=10000, batch_rows=50, flush_interval=1.0, fsync=False):
+        self.sink = sink
+        self.max_queue = max_queue  # Rows, however they are batched
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        self._queue = queue.Queue()
+        self._queued = 0  # Rows in the queue; the limit and stats() count these
+        self._queued_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._closed = False
+
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.write_time = Timer()  # sink.write_rows per batch
+        self.flush_time = Timer()  # sink.flush (+ fsync)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def log(self, row):
+        """Queue one row (or a DeviceSink `(device_id, rows)` item) without
+        blocking; returns False if it was dropped"""
+        return self._put(row, _item_rows(row))
+
+    def log_batch(self, rows):
+        """Queue a structured array as a single item (no per-row overhead)"""
+        return self._put(rows, len(rows))
+
+    def _put(self, item, n):
+        with self._queued_lock:
+            if self._queued + n > self.max_queue:
+                self.dropped += n
+                return False
+            self._queued += n
+        self._queue.put_nowait(item)
+        return True
+
+    def stats(self):
+        return {
+            'queued': self._queued,
+            'written': self.written,
+            'dropped': self.dropped,
+            'flushes': self.flushes,
+        }
+
+    def add_metrics(self, metrics):
+        """Register the writer's counters with a metrics.Metrics"""
+        metrics.counter('log_rows_total', lambda: self.written)
+        metrics.counter('log_dropped_total', lambda: self.dropped)
+        metrics.gauge('log_queue_depth', lambda: self._queued)
+        metrics.timer('log_write_seconds', self.write_time)
+        metrics.timer('log_flush_seconds', self.flush_time)
+
+    def close(self, timeout=5.0):
+        """Write out everything still queued, then close the sink"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        self.sink.close()
+
+    def _run(self):
+        last_flush = time.monotonic()
+        unflushed = 0
+        stopping = False
+
+        while not stopping:
+            batch = []
+            batch_rows = 0
+            try:
+                if unflushed:
+                    wait = max(0.0, last_flush + self.flush_interval - time.monotonic())
+                    item = self._queue.get(timeout=wait)
+                else:
+                    item = self._queue.get()
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                    rows = _item_rows(item)
+                    batch_rows += rows
+                    with self._queued_lock:
+                        self._queued -= rows
+                    if batch_rows >= self.batch_rows:
+                        break
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+
+            try:
+                if batch:
+                    t0 = time.perf_counter_ns()
+                    self._write(batch)
+                    self.write_time.since(t0)
+                    self.written += batch_rows
+                    unflushed += batch_rows
+
+                now = time.monotonic()
+                if unflushed and (stopping or unflushed >= self.batch_rows
+                                  or now - last_flush >= self.flush_interval):
+                    t0 = time.perf_counter_ns()
+                    self.sink.flush(self.fsync)
+                    self.flush_time.since(t0)
+                    self.flushes += 1
+                    unflushed = 0
+                    last_flush = now
+            except Exception as e:
+                print(f"Error writing log: {e}")
+
+    def _write(self, items):
+        """Consecutive single rows go to the sink as one list, arrays as they are"""
+        rows = []
+        for item in items:
+            if isinstance(item, np.ndarray):
+                if rows:
+                    self.sink.write_rows(rows)
+                    rows = []
+                self.sink.write_rows(item)
+            else:
+                rows.append(item)
+        if rows:
+            self.sink.write_rows(rows)
+
+def _item_rows(item):
+    if isinstance(item, np.ndarray):
+        return len(item)
+    if isinstance(item, tuple) and len(item) == 2 and isinstance(item[1], np.ndarray):
+        return len(item[1])  # (device_id, rows) for DeviceSink
+    return 1
@@ -0,0 +1,128 @@
+"""
+Min/max decimation pyramid for plotting long sample histories.
+
+Level 0 is the raw SampleRing. Level k keeps, for every FACTOR**k raw
+samples, the time of the first one and the min/max of one channel (`field`,
+the angle by default) over all of them, in its own (much smaller) ring of
+level_dtype() items. The pyramid follows the raw ring with since(), so it
+works the same on a local ring and on a SharedSampleRing, and each new
+sample is folded into every level once (amortized O(1)).
+
+select(t0, t1, max_points) picks the finest level that shows [t0, t1] in at
+most max_points points. For a summary level each bucket becomes two points
+(min then max at the same x), so the line traces the envelope of the signal
+and no spike is lost however far out you zoom. With max_points about twice
+the axes' width in pixels, a frame costs the same for a minute or a day of
+history.
+
+If the board restarts (millis() goes backwards) the summary levels start
+over, and level 0 only uses samples taken after the restart.
+"""
+
+import bisect
+
+import numpy as np
+
+from ring_buffer import SampleRing
+
+FACTOR = 8               # Raw samples per bucket grows 8x per level
+MIN_LEVEL_BUCKETS = 512  # Add levels until one is at most this small
+
+def level_dtype(value_type):
+    """Level items: t_ms of the first sample in the bucket, and the min/max
+    of the channel in its own type"""
+    return np.dtype([('t_ms', '<u4'), ('min', value_type), ('max', value_type)])
+
+def _reduce(items, factor):
+    """Combine complete groups of `factor` level items"""
+    groups = items[:len(items) - len(items) % factor].reshape(-1, factor)
+    out = np.empty(len(groups), dtype=items.dtype)
+    out['t_ms'] = groups['t_ms'][:, 0]
+    out['min'] = groups['min'].min(axis=1)
+    out['max'] = groups['max'].max(axis=1)
+    return out
+
+class MinMaxPyramid:
+    def __init__(self, ring, factor=FACTOR, field='angle'):
+        self.ring = ring
+        self.factor = factor
+        self.field = field
+        self.dtype = level_dtype(ring.dtype[field])
+        self.levels = []
+        capacity = ring.capacity
+        while capacity > MIN_LEVEL_BUCKETS:
+            capacity //= factor
+            self.levels.append(SampleRing(capacity, dtype=self.dtype))
+        self._tails = [np.empty(0, dtype=self.dtype) for _ in range(len(self.levels))]
+        self._seq = ring.cursor - len(ring)  # Next raw sample to fold in
+        self._start_seq = self._seq          # First raw sample since the last restart
+        self._last_t = None
+
+    def update(self):
+        """Fold the samples written to the ring since the last call into the levels"""
+        new, self._seq, _ = self.ring.since(self._seq)
+        if not len(new):
+            return
+        t = new['t_ms']
+        restarts = np.flatnonzero(np.diff(t.astype(np.int64)) < 0) + 1
+        if self._last_t is not None and int(t[0]) < self._last_t:
+            restarts = np.concatenate([[0], restarts])
+        if len(restarts):
+            # Only keep what came after the last restart
+            new = new[restarts[-1]:]
+            self._start_seq = self._seq - len(new)
+            for level in self.levels:
+                level.clear()
+            self._tails = [tail[:0] for tail in self._tails]
+        self._last_t = int(new['t_ms'][-1])
+
+        items = np.empty(len(new), dtype=self.dtype)
+        items['t_ms'] = new['t_ms']
+        items['min'] = items['max'] = new[self.field]
+        for i, level in enumerate(self.levels):
+            items = np.concatenate([self._tails[i], items])
+            reduced = _reduce(items, self.factor)
+            self._tails[i] = items[len(reduced) * self.factor:]
+            if not len(reduced):
+                break
+            level.extend(reduced)
+            items = reduced
+
+    def raw(self):
+        """Raw samples since the last restart (zero-copy view)"""
+        return self.ring.latest(min(len(self.ring), self.ring.cursor - self._start_seq))
+
+    def time_range(self):
+        view = self.raw()
+        if len(view):
+            return int(view['t_ms'][0]), int(view['t_ms'][-1])
+        return None
+
+    def select(self, t0, t1, max_points):
+        """Points (x, y) showing [t0, t1] and the level they came from"""
+        view = self.raw()
+        lo, hi = self._span(view['t_ms'], t0, t1)
+        if hi - lo <= max_points or not self.levels:
+            return view['t_ms'][lo:hi], view[self.field][lo:hi], 0
+
+        for k, level in enumerate(self.levels, start=1):
+            buckets = level.latest()
+            lo, hi = self._span(buckets['t_ms'], t0, t1)
+            if 2 * (hi - lo) <= max_points or k == len(self.levels):
+                break
+        buckets = buckets[lo:hi]
+        if 2 * len(buckets) > max_points:
+            # Wider than the coarsest level allows: merge buckets on the fly
+            buckets = _reduce(buckets, -(-2 * len(buckets) // max_points))
+        x = np.repeat(buckets['t_ms'], 2)
+        y = np.column_stack([buckets['min'], buckets['max']]).ravel()
+        return x, y, k
+
+    @staticmethod
+    def _span(t, t0, t1):
+        """Index range covering [t0, t1] plus one point either side"""
+        # bisect probes ~log2(n) elements; np.searchsorted would first copy
+        # the strided t_ms field of the whole ring
+        lo = max(bisect.bisect_left(t, t0) - 1, 0)
+        hi = min(bisect.bisect_right(t, t1) + 1, len(t))
+        return lo, hi
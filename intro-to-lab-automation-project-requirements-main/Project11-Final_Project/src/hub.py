@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Multi-device acquisition hub for the Project 11 sketch.
+
+One process reads any number of boards: every port is registered in a single
+selectors loop, so there is no thread per device. Each board gets its own
+SampleRing and log files (data_log_<device>.csv/.npy), all written by one
+shared BufferedLogger thread. The per-device protocol handling is the same as
+SerialAcquisition's: the channels from the sketch's `#schema` answer to `D`
+(schema.py), binary frames if it answers `B1`, CSV lines otherwise,
+negotiated without blocking the other devices. Samples are stored in the
+hub's schema (--schema), the channels of each board mapped onto it by name.
+
+On Windows, where pyserial ports have no file descriptor, the loop polls
+in_waiting of every port instead (POLL_INTERVAL).
+
+Usage:
+    python hub.py --all                      # every port list_ports finds
+    python hub.py --ports COM5 COM6 COM7
+    python hub.py --match Arduino --formats csv npy
+    python hub.py --all --schema t_ms:u4,angle:i2,buzzer:u1,fan:u1,accel_x:i2
+"""
+
+import argparse
+import os
+import selectors
+import signal
+import sys
+import time
+
+import serial
+from serial.tools import list_ports
+
+from ring_buffer import SampleRing
+from data_logger import BufferedLogger, DeviceSink
+from protocol import BINARY_ON, BINARY_ACK, DESCRIBE
+from schema import Schema, DEFAULT_SCHEMA, find_schema, split_schema
+
+# Shared helpers live in intro-to-lab-automation-project-requirements-main/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', 'common'))
+from line_reader import LineReader
+
+# -------------------------------
+# Configuration Parameters
+# -------------------------------
+BAUD_RATE = 115200
+SAMPLE_INTERVAL_MS = 100
+MAX_DATA_POINTS = 100_000  # Per device
+RESET_WAIT = 2.0  # Seconds the board needs after the port opens (DTR reset)
+NEGOTIATE_TIMEOUT = 1.0  # Seconds to wait for "BIN OK" before staying on CSV
+RECONNECT_DELAY = 1.0
+POLL_INTERVAL = 0.005  # Only used where selectors cannot watch the ports
+STATS_INTERVAL = 5.0
+
+def find_ports(match=None):
+    """Serial ports from list_ports.comports(), optionally filtered by a substring"""
+    ports = []
+    for port in list_ports.comports():
+        text = f"{port.device} {port.description} {port.hwid}"
+        if match is None or match.lower() in text.lower():
+            ports.append(port.device)
+    return ports
+
+class Device:
+    """One board: its port, protocol state and sample ring"""
+
+    def __init__(self, device_id, port, hub):
+        self.device_id = device_id
+        self.port = port
+        self.hub = hub
+        self.samples = SampleRing(hub.capacity, dtype=hub.schema.dtype)
+        self.wire = DEFAULT_SCHEMA  # Channels the board sends
+        self.ser = None
+        self.state = 'closed'
+        self.deadline = 0.0
+        self.parser = None
+        self.reader = None
+        self._negotiation = bytearray()
+        self.bytes_read = 0
+        self.errors = 0
+
+    def open(self, now):
+        try:
+            self.ser = serial.Serial(self.port, self.hub.baud_rate, timeout=0)
+        except serial.SerialException as e:
+            print(f"[{self.device_id}] cannot open {self.port}: {e}")
+            self.errors += 1
+            self.state = 'waiting'
+            self.deadline = now + RECONNECT_DELAY
+            return False
+        self.state = 'resetting'
+        self.deadline = now + RESET_WAIT
+        return True
+
+    def close(self):
+        if self.ser is not None:
+            try:
+                self.ser.close()
+            except serial.SerialException:
+                pass
+        self.ser = None
+        self.state = 'closed'
+
+    def tick(self, now):
+        """Advance time-based states; returns True if the port was (re)opened"""
+        if now < self.deadline:
+            return False
+        if self.state == 'waiting':
+            return self.open(now)
+        if self.state == 'resetting':
+            self.reader = LineReader(self.ser)
+            self.parser = None
+            self.wire = DEFAULT_SCHEMA
+            try:
+                self.ser.write(f"S{SAMPLE_INTERVAL_MS}\n".encode())
+                if self.hub.binary:
+                    self.ser.write(DESCRIBE + BINARY_ON)
+                else:
+                    self.ser.write(DESCRIBE)  # The #schema line is picked up with the CSV lines
+            except (serial.SerialException, OSError) as e:
+                # Unplugged during the reset wait: retry this board only
+                print(f"[{self.device_id}] serial error: {e}")
+                self.errors += 1
+                self.hub.disconnect(self)
+                return False
+            if self.hub.binary:
+                self._negotiation = bytearray()
+                self.state = 'negotiating'
+                self.deadline = now + NEGOTIATE_TIMEOUT
+            else:
+                self.state = 'csv'
+        elif self.state == 'negotiating':
+            # No answer: older firmware, stay on CSV lines
+            self.reader.feed(bytes(self._negotiation))
+            self.state = 'csv'
+        return False
+
+    def on_readable(self):
+        try:
+            data = self.ser.read(self.ser.in_waiting or 1)
+        except (serial.SerialException, OSError) as e:
+            print(f"[{self.device_id}] serial error: {e}")
+            self.errors += 1
+            self.hub.disconnect(self)
+            return
+        if not data:
+            return
+        self.bytes_read += len(data)
+
+        if self.state == 'negotiating':
+            self._negotiation += data
+            idx = self._negotiation.find(BINARY_ACK)
+            end = self._negotiation.find(b'\n', idx) if idx != -1 else -1
+            if end == -1:
+                return
+            self.wire = find_schema(bytes(self._negotiation[:idx])) or DEFAULT_SCHEMA
+            self.parser = self.wire.frame_parser()
+            self.state = 'binary'
+            data = bytes(self._negotiation[end + 1:])
+
+        if self.state == 'binary':
+            batch = self.parser.feed(data)
+        elif self.state == 'csv':
+            self.reader.feed(data)
+            block = self.reader.take_block()
+            if not block:
+                return
+            schema, block = split_schema(block)
+            if schema:
+                self.wire = schema
+            batch, _ = self.wire.parse_lines(block)
+        else:
+            return  # Still resetting: ignore boot messages
+
+        if len(batch):
+            batch = self.hub.schema.convert(batch)
+            self.samples.extend(batch)
+            self.hub.logger.log((self.device_id, batch))
+
+    def stats(self):
+        latest = self.samples.latest(1)
+        return {
+            'state': self.state,
+            'samples': self.samples.cursor,
+            'bytes': self.bytes_read,
+            'errors': self.errors,
+            'last_t_ms': int(latest['t_ms'][0]) if len(latest) else None,
+        }
+
+class AcquisitionHub:
+    def __init__(self, ports, log_base_path=None, log_formats=('csv',),
+                 baud_rate=BAUD_RATE, capacity=MAX_DATA_POINTS, binary=True,
+                 schema=DEFAULT_SCHEMA):
+        self.baud_rate = baud_rate
+        self.schema = schema
+        self.capacity = capacity
+        self.binary = binary
+        self.devices = {}
+        for port in ports:
+            device_id = os.path.basename(port)
+            self.devices[device_id] = Device(device_id, port, self)
+
+        if log_base_path is None:
+            dir_path = os.path.dirname(os.path.realpath(__file__))
+            log_base_path = os.path.join(dir_path, "data_log")
+        self.logger = BufferedLogger(DeviceSink(log_base_path, log_formats,
+                                                dtype=schema.dtype)).start()
+
+        self.running = False
+        self._use_selector = os.name == 'posix'
+        self._selector = selectors.DefaultSelector() if self._use_selector else None
+        if self._use_selector:
+            self._wake_r, self._wake_w = os.pipe()
+            self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+
+    def _register(self, device):
+        if self._use_selector:
+            self._selector.register(device.ser.fileno(), selectors.EVENT_READ, device)
+
+    def disconnect(self, device):
+        if self._use_selector and device.ser is not None:
+            self._selector.unregister(device.ser.fileno())
+        device.close()
+        device.state = 'waiting'
+        device.deadline = time.monotonic() + RECONNECT_DELAY
+
+    def run(self, stats_interval=None):
+        """Read all devices until stop() is called"""
+        self.running = True
+        now = time.monotonic()
+        for device in self.devices.values():
+            if device.open(now):
+                self._register(device)
+        next_stats = now + stats_interval if stats_interval else None
+
+        while self.running:
+            now = time.monotonic()
+            for device in self.devices.values():
+                if device.tick(now):
+                    self._register(device)
+
+            timeout = min((d.deadline for d in self.devices.values()
+                           if d.state in ('waiting', 'resetting', 'negotiating')), default=now + 1.0)
+            timeout = min(max(0.0, timeout - now), 1.0)
+
+            if self._use_selector:
+                for key, _ in self._selector.select(timeout):
+                    if key.data is not None:
+                        key.data.on_readable()
+            else:
+                for device in list(self.devices.values()):
+                    if device.ser is not None:
+                        device.on_readable()  # timeout=0, returns at once if idle
+                time.sleep(POLL_INTERVAL)
+
+            if next_stats and now >= next_stats:
+                self.print_stats()
+                next_stats = now + stats_interval
+
+        for device in self.devices.values():
+            device.close()
+        self.logger.close()
+
+    def stop(self):
+        self.running = False
+        if self._use_selector:
+            os.write(self._wake_w, b'x')
+
+    def stats(self):
+        return {device_id: device.stats() for device_id, device in self.devices.items()}
+
+    def print_stats(self):
+        total = 0
+        for device_id, stats in self.stats().items():
+            total += stats['samples']
+            print(f"[{device_id}] {stats['state']:<11} {stats['samples']:>10} samples "
+                  f"{stats['errors']:>3} errors")
+        log = self.logger.stats()
+        print(f"total {total} samples, log queue {log['queued']}, dropped {log['dropped']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--ports', nargs='+', help='serial ports to open')
+    group.add_argument('--all', action='store_true', help='open every port list_ports finds')
+    group.add_argument('--match', help='open ports whose name/description contains this text')
+    parser.add_argument('--formats', nargs='+', default=['csv'], choices=('csv', 'npy', 'parquet'))
+    parser.add_argument('--log-base', help='log path prefix (default: data_log next to this script)')
+    parser.add_argument('--csv-protocol', action='store_true', help='do not ask for binary frames')
+    parser.add_argument('--schema', type=Schema.parse, default=DEFAULT_SCHEMA,
+                        help='channels to store, name:type,... (default: %(default)s)')
+    args = parser.parse_args()
+
+    ports = args.ports or find_ports(args.match)
+    if not ports:
+        sys.exit("No serial ports found")
+    print(f"Opening {len(ports)} ports: {', '.join(ports)}")
+
+    hub = AcquisitionHub(ports, log_base_path=args.log_base, log_formats=args.formats,
+                         binary=not args.csv_protocol, schema=args.schema)
+    signal.signal(signal.SIGINT, lambda sig, frame: hub.stop())
+    hub.run(stats_interval=STATS_INTERVAL)
+
+if __name__ == '__main__':
+    main()
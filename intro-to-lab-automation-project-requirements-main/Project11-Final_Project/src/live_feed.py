@@ -0,0 +1,198 @@
+"""
+Local socket feed of live samples, from the headless daemon to GUI clients.
+
+The stream is the server's `#schema ...` line (schema.py), then just raw
+records of that dtype (8 bytes each for the default channels) over TCP on
+localhost, so a client only has to np.frombuffer() whole records. When a
+client connects it first receives the schema, a `#history <n>` line and the
+server's n most recent samples (a SampleRing), then every new batch as it
+is published. A client that reconnects drops the part of that history it
+already had, up to the last timestamp it received.
+
+Publishing never blocks acquisition: each client has an outbox and the socket
+is non-blocking; a client that falls more than MAX_CLIENT_BACKLOG bytes
+behind is disconnected.
+"""
+
+import socket
+import threading
+import time
+
+import numpy as np
+
+from ring_buffer import SampleRing
+from schema import DEFAULT_SCHEMA, Schema
+
+FEED_HOST = '127.0.0.1'
+FEED_PORT = 5011
+HISTORY_PREFIX = b'#history '
+MAX_CLIENT_BACKLOG = 8 * 1024 * 1024
+
+def parse_address(text, default_port=FEED_PORT):
+    """'host:port', 'host' or ':port' -> (host, port)"""
+    host, _, port = text.partition(':')
+    return host or FEED_HOST, int(port) if port else default_port
+
+class _Client:
+    def __init__(self, sock, addr):
+        self.sock = sock
+        self.addr = addr
+        self.outbox = bytearray()
+
+class FeedServer:
+    def __init__(self, host=FEED_HOST, port=FEED_PORT, history=10000, schema=DEFAULT_SCHEMA):
+        self.host = host
+        self.port = port
+        self.schema = schema
+        self.history = SampleRing(history, dtype=schema.dtype)
+        self._clients = []
+        self._lock = threading.Lock()
+        self._sock = None
+        self._thread = threading.Thread(target=self._accept_loop, name="feed-accept", daemon=True)
+
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen()
+        self._thread.start()
+        print(f"Live feed on {self.host}:{self.port}")
+        return self
+
+    def _accept_loop(self):
+        while True:
+            try:
+                sock, addr = self._sock.accept()
+            except OSError:
+                return  # Server socket closed
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client = _Client(sock, addr)
+            with self._lock:
+                history = self.history.latest()
+                client.outbox += self.schema.line()
+                client.outbox += HISTORY_PREFIX + str(len(history)).encode() + b'\n'
+                client.outbox += history.tobytes()
+                self._clients.append(client)
+                self._send(client)
+            print(f"Feed client connected: {addr[0]}:{addr[1]}")
+
+    def publish(self, batch):
+        """Send a batch (of the server's schema) to every connected client"""
+        data = batch.tobytes()
+        with self._lock:
+            self.history.extend(batch)
+            for client in list(self._clients):
+                client.outbox += data
+                self._send(client)
+
+    def _send(self, client):
+        try:
+            if client.outbox:
+                sent = client.sock.send(client.outbox)
+                del client.outbox[:sent]
+        except BlockingIOError:
+            pass
+        except OSError:
+            self._drop(client, "disconnected")
+            return
+        if len(client.outbox) > MAX_CLIENT_BACKLOG:
+            self._drop(client, "too slow")
+
+    def _drop(self, client, reason):
+        self._clients.remove(client)
+        client.sock.close()
+        print(f"Feed client {client.addr[0]}:{client.addr[1]} {reason}")
+
+    @property
+    def client_count(self):
+        return len(self._clients)
+
+    def close(self):
+        if self._sock:
+            self._sock.close()
+        with self._lock:
+            for client in list(self._clients):
+                self._drop(client, "closed")
+
+class FeedClient:
+    """Receives the feed in a background thread and calls on_batch(samples).
+
+    The samples come in the server's schema, or mapped onto `schema` by name.
+    After a reconnect, the replayed history up to the last t_ms received
+    before is skipped; if that sample is no longer in the history (a long
+    outage), all of it is passed on.
+    """
+
+    def __init__(self, on_batch, host=FEED_HOST, port=FEED_PORT, retry_delay=1.0, schema=None):
+        self.on_batch = on_batch
+        self.schema = schema
+        self.host = host
+        self.port = port
+        self.retry_delay = retry_delay
+        self.running = False
+        self.last_t_ms = None  # Of the last sample passed on
+        self._thread = threading.Thread(target=self._run, name="feed-client", daemon=True)
+
+    def start(self):
+        self.running = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+
+    def _run(self):
+        while self.running:
+            try:
+                with socket.create_connection((self.host, self.port), timeout=self.retry_delay) as sock:
+                    sock.settimeout(0.5)
+                    print(f"Attached to acquisition daemon at {self.host}:{self.port}")
+                    buf = bytearray()
+                    dtype = None  # Known once the #schema line is in
+                    history = None  # Rows of replayed history, once the #history line is in
+                    while self.running:
+                        try:
+                            data = sock.recv(65536)
+                        except socket.timeout:
+                            continue
+                        if not data:
+                            break
+                        buf += data
+                        while history is None and b'\n' in buf:
+                            end = buf.find(b'\n')
+                            line = bytes(buf[:end])
+                            del buf[:end + 1]
+                            if dtype is None:
+                                dtype = Schema.parse(line).dtype
+                            elif line.startswith(HISTORY_PREFIX):
+                                history = int(line[len(HISTORY_PREFIX):])
+                            else:
+                                raise ValueError(f"Expected the history length, got {line[:40]!r}")
+                        if history is None:
+                            continue
+                        if history:
+                            # The replayed history comes in whole, so the overlap is cut at once
+                            if len(buf) < history * dtype.itemsize:
+                                continue
+                            usable = history * dtype.itemsize
+                            batch = self._skip_seen(np.frombuffer(bytes(buf[:usable]), dtype=dtype))
+                            history = 0
+                        else:
+                            usable = len(buf) - len(buf) % dtype.itemsize
+                            batch = np.frombuffer(bytes(buf[:usable]), dtype=dtype)
+                        del buf[:usable]
+                        if len(batch):
+                            self.last_t_ms = int(batch['t_ms'][-1])
+                            self.on_batch(self.schema.convert(batch) if self.schema else batch)
+            except (OSError, ValueError) as e:
+                print(f"Feed connection error: {e}")
+            if self.running:
+                time.sleep(self.retry_delay)
+
+    def _skip_seen(self, history):
+        """The replayed history after the last sample passed on before"""
+        if self.last_t_ms is None:
+            return history
+        seen = np.flatnonzero(history['t_ms'] == self.last_t_ms)
+        return history[seen[-1] + 1:] if len(seen) else history
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Load and convert servo monitor logs.
+
+load_log() returns a structured array for any of the formats the monitor
+writes, with the channels the log was written with (see schema.py):
+  - .npy      memory-mapped, so even a 10M-row session opens instantly
+  - .parquet  read through pyarrow (if installed)
+  - .csv      parsed in large blocks with NumPy instead of row by row
+
+CSV columns are matched by their header: the titles of the four standard
+fields (case-insensitively, by their first word, or by position for older
+titles such as `Angle (degrees)`), channel names for the others (stored as
+int32, CSV does not record the type). Logs always come back with the four
+SAMPLE_DTYPE fields: older ones such as the repo-root data_log.csv only
+have `Time (ms),Angle (degrees),Buzzer`, and the missing fan column is
+filled with 0.
+
+Usage:
+    python log_reader.py convert data_log.csv [more.csv ...] [--format npy]
+    python log_reader.py info data_log.npy
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from ring_buffer import SAMPLE_DTYPE
+from data_logger import make_sink, CSV_HEADER
+from schema import Schema
+
+# Shared helpers live in intro-to-lab-automation-project-requirements-main/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', 'common'))
+from line_reader import parse_int_lines
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+CSV_BLOCK_SIZE = 16 * 1024 * 1024  # Bytes parsed per NumPy call
+BLOCK_ROWS = 1 << 20  # Rows per block when streaming binary logs
+
+def load_log(path):
+    """Load a .npy, .parquet or .csv log as a structured array"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.npy':
+        return load_npy(path)
+    if ext == '.parquet':
+        return load_parquet(path)
+    if ext == '.csv':
+        return load_csv(path)
+    raise ValueError(f"Unknown log format: {path}")
+
+def load_npy(path):
+    """Memory-map an .npy log; the row count comes from the file size so a
+    log whose header was not rewritten before a crash still loads fully"""
+    with open(path, 'rb') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            _, _, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            _, _, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    rows = (os.path.getsize(path) - offset) // dtype.itemsize
+    if rows == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(rows,))
+
+def load_parquet(path):
+    if pq is None:
+        raise ImportError("Reading .parquet logs needs pyarrow (pip install pyarrow)")
+    table = pq.read_table(path, memory_map=True)
+    columns = {name: table.column(name).to_numpy() for name in table.column_names}
+    data = np.zeros(table.num_rows, dtype=[(name, values.dtype) for name, values in columns.items()])
+    for name, values in columns.items():
+        data[name] = values
+    return data
+
+def log_schema(channels):
+    """Schema of [(name, type), ...] plus the SAMPLE_DTYPE fields it lacks,
+    appended so that from_columns() and convert() leave them at 0"""
+    names = [name for name, _ in channels]
+    return Schema(list(channels) + [(name, SAMPLE_DTYPE[name].str[1:])
+                                    for name in SAMPLE_DTYPE.names if name not in names])
+
+def _csv_name(i, title):
+    """Field name for the i-th CSV column title"""
+    key = title.lower()
+    for name, known in zip(SAMPLE_DTYPE.names, CSV_HEADER):
+        # Older titles, e.g. "Buzzer" or "Angle (degrees)", by their first word
+        if key in (name, known.lower()) or key.split(' ')[0] == known.split(' ')[0].lower():
+            return name
+    if i < len(SAMPLE_DTYPE.names) and not title.isidentifier():
+        return SAMPLE_DTYPE.names[i]
+    return title
+
+def csv_schema(header):
+    """Schema for the columns of a CSV log, from its header line"""
+    channels = []
+    for i, title in enumerate(t.strip() for t in header.split(',')):
+        name = _csv_name(i, title)
+        kind = SAMPLE_DTYPE[name].str[1:] if name in SAMPLE_DTYPE.names else 'i4'
+        channels.append((name, kind))
+    return log_schema(channels)
+
+def read_csv_schema(path):
+    with open(path, 'rb') as f:
+        return csv_schema(f.readline().decode('utf-8'))
+
+def iter_csv_blocks(path, block_size=CSV_BLOCK_SIZE):
+    """Yield (n, columns) int64 arrays for consecutive blocks of a CSV log.
+
+    Whole blocks are parsed by parse_int_lines (line_reader.py) in one
+    NumPy call; a block is cut at its last newline and the remainder
+    carried into the next one. Rows without exactly `columns` integers,
+    such as the last row of a log cut short by a crash, are skipped and
+    reported instead of failing the whole file.
+    """
+    bad = 0
+    with open(path, 'rb') as f:
+        header = f.readline().decode('utf-8').strip()
+        columns = len(header.split(','))
+        tail = b''
+        while True:
+            chunk = f.read(block_size)
+            if not chunk:
+                break
+            chunk = tail + chunk
+            cut = chunk.rfind(b'\n') + 1
+            if cut == 0:
+                tail = chunk
+                continue
+            tail = chunk[cut:]
+            values, skipped = parse_int_lines(chunk[:cut], columns)
+            bad += skipped
+            yield values
+        if tail.strip():
+            values, skipped = parse_int_lines(tail + b'\n', columns)
+            bad += skipped
+            yield values
+    if bad:
+        print(f"{path}: skipped {bad} incomplete or malformed row(s)")
+
+def iter_log_blocks(path):
+    """Yield consecutive blocks of any log without loading it all, each with
+    at least the SAMPLE_DTYPE fields (see log_schema)"""
+    if os.path.splitext(path)[1].lower() == '.csv':
+        schema = read_csv_schema(path)
+        for values in iter_csv_blocks(path):
+            yield schema.from_columns(values)
+        return
+    data = load_log(path)  # .npy is memory-mapped, so slicing reads lazily
+    schema = log_schema(Schema.from_dtype(data.dtype).channels)
+    for start in range(0, len(data), BLOCK_ROWS):
+        yield schema.convert(data[start:start + BLOCK_ROWS])
+
+def load_csv(path):
+    """Parse a CSV log into a structured array"""
+    schema = read_csv_schema(path)
+    blocks = list(iter_csv_blocks(path))
+    values = np.concatenate(blocks) if blocks else np.empty((0, len(schema)), dtype=np.int64)
+    return schema.from_columns(values)
+
+def convert(csv_path, fmt='npy'):
+    """Convert a CSV log to a binary log next to it, block by block"""
+    base = os.path.splitext(csv_path)[0]
+    schema = read_csv_schema(csv_path)
+    sink = make_sink(base, (fmt,), schema.dtype)
+    rows = 0
+    try:
+        for values in iter_csv_blocks(csv_path):
+            data = schema.from_columns(values)
+            sink.write_rows(data)
+            rows += len(data)
+    finally:
+        sink.close()
+    return f"{base}.{fmt}", rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    convert_parser = sub.add_parser('convert', help='convert CSV logs to a binary format')
+    convert_parser.add_argument('paths', nargs='+')
+    convert_parser.add_argument('--format', choices=('npy', 'parquet'), default='npy')
+
+    info_parser = sub.add_parser('info', help='print a summary of a log')
+    info_parser.add_argument('paths', nargs='+')
+
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        for path in args.paths:
+            out_path, rows = convert(path, args.format)
+            print(f"{path} -> {out_path} ({rows} rows)")
+    else:
+        for path in args.paths:
+            data = load_log(path)
+            if len(data) == 0:
+                print(f"{path}: empty")
+                continue
+            duration = (int(data['t_ms'][-1]) - int(data['t_ms'][0])) / 1000
+            print(f"{path}: {len(data)} rows, {duration:.1f} s, "
+                  f"angle {data['angle'].min()}..{data['angle'].max()}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""
+Binary framing protocol between src.ino and the servo monitor.
+
+By default the sketch prints one CSV line per sample, `millis,angle,buzzer,fan`
+in the original sketch. After the host sends `B1\n` the sketch answers
+`BIN OK` and switches to fixed-size frames, in the original sketch:
+
+    offset  size  field
+    0       1     sync byte 0xA5
+    1       4     t_ms     (uint32, little endian)
+    5       2     angle    (int16, little endian)
+    7       1     flags    (bit 0 = buzzer, bit 1 = fan)
+    8       1     CRC-8    (poly 0x07, init 0) over bytes 1..7
+
+FrameParser decodes whatever ser.read(ser.in_waiting) returned in one go with
+numpy.frombuffer; the CRC is checked for all frames at once. This CRC (init 0,
+no final XOR) is linear, so a frame's CRC is the XOR of one table entry per
+byte position: one gather and one reduce per read, however long the frame.
+On a bad frame it drops bytes up to the next sync byte and carries on.
+
+The current sketch announces its channels when the host sends `D\n`, as a
+`#schema t_ms:u4,angle:i2,...` line (see schema.py); its lines have one
+value per channel and its frames carry the fields of that schema packed in
+order, buzzer and fan as bytes of their own:
+
+    0xA5 | fields, little endian, no padding | CRC-8 over the fields
+
+A sketch that does not answer `D` uses the 9-byte frame above.
+"""
+
+import struct
+
+import numpy as np
+
+from ring_buffer import SAMPLE_DTYPE
+
+SYNC = 0xA5
+FRAME_FORMAT = '<BIhBB'
+FRAME_SIZE = struct.calcsize(FRAME_FORMAT)
+FRAME_DTYPE = np.dtype([
+    ('sync', 'u1'),
+    ('t_ms', '<u4'),
+    ('angle', '<i2'),
+    ('flags', 'u1'),
+    ('crc', 'u1'),
+])
+
+BINARY_ON = b'B1\n'
+BINARY_OFF = b'B0\n'
+BINARY_ACK = b'BIN OK'
+ASCII_ACK = b'ASCII OK'
+DESCRIBE = b'D\n'          # Ask the sketch for its #schema line
+SCHEMA_PREFIX = b'#schema '
+
+# Actuator commands, accepted in both modes (see control.py)
+BUZZER_COMMAND = b'Z'   # Z1/Z0: buzzer from the host, suspends the sketch's thresholds
+FAN_COMMAND = b'F'      # F1/F0: fan on/off, same as pressing the button
+RELEASE_CONTROL = b'H0\n'  # Buzzer back to the sketch's own thresholds
+FAN_OFF = b'F0\n'
+
+def _make_crc_table(poly=0x07):
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ poly) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table.append(crc)
+    return table
+
+CRC_TABLE = _make_crc_table()
+_CRC_TABLE_NP = np.array(CRC_TABLE, dtype=np.uint8)
+
+def _position_tables(length):
+    """tables[256 * i + b]: CRC of `length` bytes, all 0 except b at position i"""
+    tables = np.empty((length, 256), dtype=np.uint8)
+    tables[-1] = _CRC_TABLE_NP
+    for i in range(length - 2, -1, -1):
+        tables[i] = _CRC_TABLE_NP[tables[i + 1]]  # One more zero byte after b
+    return tables.ravel()
+
+def _crc_rows(rows, tables):
+    """CRC-8 of every row of an (n, length) uint8 array"""
+    offsets = np.arange(0, 256 * rows.shape[1], 256, dtype=np.intp)
+    return np.bitwise_xor.reduce(tables.take(rows + offsets), axis=1)
+
+def crc8(data):
+    crc = 0
+    for byte in data:
+        crc = CRC_TABLE[crc ^ byte]
+    return crc
+
+def encode_frame(t_ms, angle, buzzer, fan):
+    """Build one frame exactly as the sketch sends it"""
+    payload = struct.pack('<IhB', t_ms & 0xFFFFFFFF, angle, (buzzer & 1) | (fan & 1) << 1)
+    return bytes([SYNC]) + payload + bytes([crc8(payload)])
+
+def frame_dtype(dtype):
+    """Frame layout for records of a structured dtype: sync, the fields, CRC"""
+    dtype = np.dtype(dtype)
+    fields = [(name, dtype.fields[name][0].str) for name in dtype.names]
+    return np.dtype([('sync', 'u1'), *fields, ('crc', 'u1')])
+
+def encode_records(records):
+    """Frames for a structured array of records, in the layout of frame_dtype()"""
+    records = np.asarray(records)
+    frames = np.empty(len(records), dtype=frame_dtype(records.dtype))
+    frames['sync'] = SYNC
+    for name in records.dtype.names:
+        frames[name] = records[name]
+    raw = frames.view(np.uint8).reshape(len(records), -1)
+    frames['crc'] = _crc_rows(raw[:, 1:-1], _position_tables(raw.shape[1] - 2))
+    return frames.tobytes()
+
+class FrameParser:
+    """Turns a raw byte stream into batches of samples.
+
+    Without a dtype it decodes the original 9-byte frames into SAMPLE_DTYPE;
+    with one, frames of that dtype's records (frame_dtype()). Either way the
+    work per batch is a few NumPy calls, whatever the number of fields.
+    """
+
+    def __init__(self, dtype=None):
+        self.dtype = SAMPLE_DTYPE if dtype is None else np.dtype(dtype)
+        self.frame_size = FRAME_SIZE if dtype is None else frame_dtype(dtype).itemsize
+        self._decode = self._flags_to_samples if dtype is None else self._unpack
+        self._crc_tables = _position_tables(self.frame_size - 2)
+        self._buf = bytearray()
+        self.frames = 0
+        self.crc_errors = 0
+        self.skipped_bytes = 0
+
+    def feed(self, data):
+        """Add bytes, return every complete valid frame as an array of self.dtype"""
+        self._buf += data
+        buf = self._buf
+        size = self.frame_size
+        pos = 0
+        batches = []
+
+        while len(buf) - pos >= size:
+            n = (len(buf) - pos) // size
+            raw = np.frombuffer(buf, dtype=np.uint8, count=n * size, offset=pos)
+            raw = raw.reshape(n, size)
+            crc = _crc_rows(raw[:, 1:-1], self._crc_tables)
+            ok = (raw[:, 0] == SYNC) & (crc == raw[:, -1])
+
+            good = n if ok.all() else int(np.argmin(ok))
+            if good:
+                batches.append(self._decode(raw[:good]))
+                pos += good * size
+            if good == n:
+                break
+
+            # Bad frame: resync on the next sync byte
+            if raw[good, 0] == SYNC:
+                self.crc_errors += 1
+            nxt = buf.find(SYNC, pos + 1)
+            nxt = len(buf) if nxt == -1 else nxt
+            self.skipped_bytes += nxt - pos
+            pos = nxt
+
+        # All NumPy views into buf must be gone before it can be resized
+        raw = None
+        del buf[:pos]
+
+        if not batches:
+            return np.empty(0, dtype=self.dtype)
+        out = batches[0] if len(batches) == 1 else np.concatenate(batches)
+        self.frames += len(out)
+        return out
+
+    @staticmethod
+    def _flags_to_samples(rows):
+        frames = rows.view(FRAME_DTYPE)[:, 0]
+        samples = np.empty(len(frames), dtype=SAMPLE_DTYPE)
+        samples['t_ms'] = frames['t_ms']
+        samples['angle'] = frames['angle']
+        samples['buzzer'] = frames['flags'] & 1
+        samples['fan'] = (frames['flags'] >> 1) & 1
+        return samples
+
+    def _unpack(self, rows):
+        # Between sync and CRC the frame is the packed record: one copy
+        return rows[:, 1:-1].copy().view(self.dtype)[:, 0]
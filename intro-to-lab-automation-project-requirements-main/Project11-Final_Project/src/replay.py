@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Replay a recorded session through the live pipeline, without the rig.
+
+LogReplay stands in for SerialAcquisition: it streams a log written by the
+monitor (.csv, .npy or .parquet, see log_reader.py) and hands its batches
+(mapped onto `schema` by name if one is given, see schema.py) to on_batch
+on the recorded time axis, so the GUI's handle_batch()
+fills the ring, the plot and the buzzer/fan indicators exactly as it does
+live. The timestamps are passed on unchanged.
+
+  speed=1    recorded `Time (ms)` spacing
+  speed=10   ten times faster; batches are emitted at most every MIN_TICK
+             seconds, so fast replays arrive in bigger batches like a busy
+             port would
+  speed=0    as fast as on_batch takes them, MAX_BATCH samples at a time
+
+Pauses longer than max_gap_ms (a board restart, the logger stopped) are
+shortened, so replaying a day with a break does not sit idle. When the
+consumer falls behind, the replay catches up in bigger batches and reports
+how far behind the schedule it got (max_lag).
+
+In the GUI:
+
+    python src.py --replay data_log.npy --speed 10 [--loop]
+
+Standalone it replays into nothing and prints the achieved rate, which
+shows how fast the reading side alone goes:
+
+    python replay.py data_log.npy --speed 0
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from log_reader import iter_log_blocks
+
+MAX_GAP_MS = 2000  # Longer pauses in the log are shortened to this
+MIN_TICK = 0.01    # Seconds between batches when paced
+MAX_BATCH = 4096   # Samples per batch when unpaced (speed=0)
+
+class LogReplay:
+    def __init__(self, path, on_batch, speed=1.0, loop=False, max_gap_ms=MAX_GAP_MS, schema=None):
+        self.path = path
+        self.on_batch = on_batch
+        self.schema = schema
+        self.speed = speed
+        self.loop = loop
+        self.max_gap_ms = max_gap_ms
+        self.sent = 0
+        self.batches = 0
+        self.max_lag = 0.0  # Seconds behind the recorded schedule
+        self.started = None
+        self.running = False
+        self._stop = threading.Event()
+
+    def run(self):
+        """Replay until the log ends (or forever with loop) or stop() is called"""
+        self.running = True
+        self.started = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                self._play()
+                if not self.loop:
+                    break
+        except Exception as e:
+            print(f"Error replaying {self.path}: {e}")
+        self.running = False
+        print(f"Replay finished: {self.sent} samples in {self.batches} batches, "
+              f"max lag {self.max_lag * 1000:.0f} ms")
+
+    def _play(self):
+        start = time.perf_counter()
+        clock_ms = 0  # Replay time of the previous sample
+        prev_t = None
+        for block in iter_log_blocks(self.path):
+            if self._stop.is_set() or not len(block):
+                return
+            if self.speed <= 0:
+                for i in range(0, len(block), MAX_BATCH):
+                    if self._stop.is_set():
+                        return
+                    self._emit(block[i:i + MAX_BATCH])
+                continue
+
+            # Replay clock: the recorded steps, with restarts (negative steps)
+            # and long gaps squeezed to at most max_gap_ms
+            t = block['t_ms'].astype(np.int64)
+            steps = np.diff(t, prepend=t[0] if prev_t is None else prev_t)
+            clock = clock_ms + np.cumsum(np.clip(steps, 0, self.max_gap_ms))
+            due = start + clock / (1000.0 * self.speed)
+            clock_ms, prev_t = int(clock[-1]), int(t[-1])
+
+            i = 0
+            while i < len(block):
+                now = time.perf_counter()
+                if due[i] > now:
+                    if self._stop.wait(due[i] - now):
+                        return
+                    now = time.perf_counter()
+                # Everything that is due, then sleep at least MIN_TICK
+                j = int(np.searchsorted(due, now, side='right'))
+                self.max_lag = max(self.max_lag, now - due[i])
+                self._emit(block[i:j])
+                i = j
+                if i < len(block) and due[i] < now + MIN_TICK:
+                    if self._stop.wait(now + MIN_TICK - time.perf_counter()):
+                        return
+
+    def _emit(self, batch):
+        batch = np.array(batch)  # Copy out of the memory-mapped log
+        self.on_batch(self.schema.convert(batch) if self.schema else batch)
+        self.sent += len(batch)
+        self.batches += 1
+
+    def rate(self):
+        """Samples per second since the start"""
+        if not self.started:
+            return 0.0
+        return self.sent / max(time.perf_counter() - self.started, 1e-9)
+
+    def status(self):
+        speed = f"{self.speed:g}x" if self.speed > 0 else "max speed"
+        state = "replaying" if self.running else "replayed"
+        return (f"{state} {self.path} at {speed}: {self.sent} samples "
+                f"({self.rate():.0f}/s), max lag {self.max_lag * 1000:.0f} ms")
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        """Same interface as SerialAcquisition"""
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', help='log to replay (.csv, .npy, .parquet)')
+    parser.add_argument('--speed', type=float, default=0.0, help='1 = recorded timing, 0 = as fast as possible')
+    parser.add_argument('--max-gap-ms', type=int, default=MAX_GAP_MS)
+    args = parser.parse_args()
+
+    replay = LogReplay(args.path, lambda batch: None, speed=args.speed, max_gap_ms=args.max_gap_ms)
+    replay.run()
+    print(replay.status())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Preallocated NumPy ring buffer for the servo monitor samples.
+
+One structured array holds (t_ms, angle, buzzer, fan) rows, so the time and
+angle series always come from the same samples. The storage is mirrored
+(every row is written twice, at i and i + size) which means the newest N rows
+are always one contiguous slice: latest() returns a view, never a copy.
+
+Single producer only: the reader thread calls append()/extend(), any number
+of consumers call latest(). No lock is needed because a row is fully written
+before the cursor that publishes it is advanced. A view stays valid until the
+producer has written `headroom` more samples, which is plenty for a plot frame.
+"""
+
+import numpy as np
+
+SAMPLE_DTYPE = np.dtype([
+    ('t_ms', '<u4'),    # millis() since sketch start
+    ('angle', '<i2'),   # degrees
+    ('buzzer', 'u1'),
+    ('fan', 'u1'),
+])
+
+class SampleRing:
+    def __init__(self, capacity, dtype=SAMPLE_DTYPE, headroom=1024):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        # Slots the producer may fill before it touches a published view
+        self._size = capacity + headroom
+        self._data = np.zeros(2 * self._size, dtype=self.dtype)
+        self._cursor = 0  # Total number of samples ever written
+
+    def __len__(self):
+        return min(self._cursor, self.capacity)
+
+    @property
+    def cursor(self):
+        """Total samples written so far (monotonic sequence number)"""
+        return self._cursor
+
+    def append(self, *row):
+        """Write one sample, e.g. append(t_ms, angle, buzzer, fan)"""
+        i = self._cursor % self._size
+        self._data[i] = row
+        self._data[i + self._size] = row
+        self._cursor += 1
+
+    def extend(self, rows):
+        """Write a batch of samples (structured array or sequence of tuples)"""
+        rows = np.asarray(rows, dtype=self.dtype)
+        total = len(rows)
+        if total == 0:
+            return
+        if total > self._size:
+            rows = rows[-self._size:]
+
+        start = (self._cursor + total - len(rows)) % self._size
+        first = min(len(rows), self._size - start)
+        self._write(start, rows[:first])
+        if first < len(rows):
+            self._write(0, rows[first:])
+        self._cursor += total
+
+    def _write(self, start, rows):
+        end = start + len(rows)
+        self._data[start:end] = rows
+        self._data[start + self._size:end + self._size] = rows
+
+    def latest(self, n=None):
+        """Zero-copy view of the newest n samples (default: capacity), oldest first"""
+        cursor = self._cursor
+        count = min(cursor, self.capacity)
+        if n is not None:
+            count = min(count, n)
+        return self._view(cursor, count)
+
+    def since(self, seq):
+        """Samples written after sequence number `seq`, for readers that follow
+        the stream: returns (view, cursor, lost) where cursor is the seq to
+        pass next time and lost counts samples overwritten before we got them"""
+        cursor = self._cursor
+        new = cursor - seq
+        count = min(new, self.capacity)
+        return self._view(cursor, count), cursor, new - count
+
+    def _view(self, cursor, count):
+        end = cursor % self._size + self._size
+        return self._data[end - count:end]
+
+    def clear(self):
+        self._cursor = 0
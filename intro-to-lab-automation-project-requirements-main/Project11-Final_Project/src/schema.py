@@ -0,0 +1,154 @@
+"""
+Declared channel layout of the servo monitor stream.
+
+The parsers used to assume the four fields of SAMPLE_DTYPE. A Schema lists
+the channels instead, as `name:type` pairs in the order the sketch sends
+them:
+
+    t_ms:u4,angle:i2,buzzer:u1,fan:u1,accel_x:i2,accel_y:i2,accel_z:i2
+
+Types are little-endian integers: u1 i1 u2 i2 u4 i4 (scale real values on
+the board, e.g. milli-g). t_ms must come first; `sync` and `crc` are taken
+by the frame layout. The sketch announces its schema as a `#schema ...`
+line when the host sends `D` (see protocol.py); a sketch that does not is
+taken to send DEFAULT_SCHEMA, in the original 9-byte frames with buzzer and
+fan in a flags byte. Announced schemas always use the packed frames.
+
+Everything else follows from the schema: a NumPy dtype for the ring buffer,
+log files and feeds, one vectorized parse per CSV block, and a FrameParser
+for the binary frames. The number of Python calls per batch does not depend
+on the channels, but the NumPy work runs over every byte, so the cost per
+sample grows with its width. bench_schema.py measured about 300, 630 and
+1500 ns per sample for CSV (roughly 20 ns per byte of text, mostly
+np.fromstring) and 150, 200 and 340 ns for binary frames at 4, 8 and 16
+channels; wide schemas are best sent binary.
+
+The host keeps its own storage schema (the SCHEMA setting in src.py,
+--schema for the daemon) and convert() maps the board's channels onto it by
+name: extra channels are dropped, missing ones stay 0.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+from protocol import FrameParser, SCHEMA_PREFIX
+from ring_buffer import SAMPLE_DTYPE
+
+# Shared helpers live in intro-to-lab-automation-project-requirements-main/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', 'common'))
+from line_reader import parse_int_lines
+
+TYPES = ('u1', 'i1', 'u2', 'i2', 'u4', 'i4')
+RESERVED = ('sync', 'crc')
+
+class Schema:
+    def __init__(self, channels, flags_frame=False):
+        """channels: [(name, type), ...], e.g. [('t_ms', 'u4'), ('angle', 'i2')]"""
+        channels = [(str(name), str(kind)) for name, kind in channels]
+        names = [name for name, _ in channels]
+        if not names or names[0] != 't_ms':
+            raise ValueError("A schema starts with the t_ms channel")
+        for name, kind in channels:
+            if not name.isidentifier() or name in RESERVED:
+                raise ValueError(f"Invalid channel name {name!r}")
+            if kind not in TYPES:
+                raise ValueError(f"Channel {name!r}: unknown type {kind!r} "
+                                 f"(expected one of: {', '.join(TYPES)})")
+        if len(set(names)) != len(names):
+            raise ValueError("Channel names must be unique")
+        self.channels = channels
+        self.flags_frame = flags_frame  # Binary frames of the original sketch
+        self.names = tuple(names)
+        self.dtype = np.dtype([(name, '<' + kind) for name, kind in channels])
+
+    @classmethod
+    def parse(cls, text):
+        """From `name:type,...` text, with or without the `#schema ` prefix"""
+        if isinstance(text, bytes):
+            text = text.decode('ascii', 'replace')
+        text = text.strip()
+        if text.startswith(SCHEMA_PREFIX.decode()):
+            text = text[len(SCHEMA_PREFIX):]
+        channels = []
+        for item in text.split(','):
+            name, sep, kind = item.strip().partition(':')
+            if not sep:
+                raise ValueError(f"Schema item {item!r} is not name:type")
+            channels.append((name.strip(), kind.strip()))
+        return cls(channels)
+
+    @classmethod
+    def from_dtype(cls, dtype, flags_frame=False):
+        dtype = np.dtype(dtype)
+        return cls([(name, dtype[name].str[1:]) for name in dtype.names], flags_frame)
+
+    def __str__(self):
+        return ",".join(f"{name}:{kind}" for name, kind in self.channels)
+
+    def __repr__(self):
+        return f"Schema({str(self)!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, Schema) and self.dtype == other.dtype
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __len__(self):
+        return len(self.channels)
+
+    def line(self):
+        """The announcement the sketch prints"""
+        return SCHEMA_PREFIX + str(self).encode() + b'\n'
+
+    def parse_lines(self, block):
+        """A block of CSV lines as (records, bad_lines)"""
+        values, bad = parse_int_lines(block, len(self.names))
+        return self.from_columns(values), bad
+
+    def from_columns(self, values):
+        """Records from an (n, k) array whose columns follow the schema order;
+        channels without a column stay 0"""
+        data = np.zeros(len(values), dtype=self.dtype)
+        for i, name in enumerate(self.names[:values.shape[1]]):
+            data[name] = values[:, i]
+        return data
+
+    def frame_parser(self):
+        return FrameParser(None if self.flags_frame else self.dtype)
+
+    def convert(self, records):
+        """records (any structured dtype) as this schema's dtype, matched by name.
+
+        Returns records itself when the dtypes already agree, so storing a
+        stream that matches the configured schema costs nothing.
+        """
+        if records.dtype == self.dtype:
+            return records
+        out = np.zeros(len(records), dtype=self.dtype)
+        for name in self.names:
+            if name in records.dtype.names:
+                out[name] = records[name]
+        return out
+
+DEFAULT_SCHEMA = Schema.from_dtype(SAMPLE_DTYPE, flags_frame=True)
+
+def find_schema(data):
+    """The Schema announced in a chunk of text, or None"""
+    idx = data.find(SCHEMA_PREFIX)
+    if idx == -1:
+        return None
+    end = data.find(b'\n', idx)
+    if end == -1:
+        return None
+    return Schema.parse(data[idx:end])
+
+def split_schema(block):
+    """(announced Schema or None, block without the #schema lines)"""
+    if SCHEMA_PREFIX not in block:
+        return None, block
+    lines = block.splitlines(True)
+    return find_schema(block), b''.join(line for line in lines
+                                        if not line.startswith(SCHEMA_PREFIX))
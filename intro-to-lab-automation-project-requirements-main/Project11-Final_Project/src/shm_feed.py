@@ -0,0 +1,110 @@
+"""
+Shared-memory live feed: one writer, any number of reader processes.
+
+SharedSampleRing is a SampleRing whose records and write cursor live in a
+multiprocessing.shared_memory block:
+
+    offset 0   uint64 magic
+    offset 8   uint64 capacity
+    offset 16  uint64 headroom
+    offset 24  uint64 cursor (sequence number of the next sample)
+    offset 32  uint64 length of the schema text
+    offset 64  schema text, `t_ms:u4,angle:i2,...` (see schema.py)
+    then       2 * (capacity + headroom) records of that schema (mirrored),
+               from the next multiple of 64 bytes
+
+The acquisition side creates it and calls extend(); readers attach by name
+and either take latest() views for plotting or follow the stream with
+since(seq), in the writer's schema. Readers never write to the block and
+never talk to the writer, so adding one costs the writer nothing.
+
+    daemon.py --shm servo         # publish
+    src.py --shm servo            # plot from it
+    ring = SharedSampleRing.attach('servo')   # e.g. in a notebook
+"""
+
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+
+from ring_buffer import SampleRing
+from schema import DEFAULT_SCHEMA, Schema
+
+SHM_MAGIC = 0x5345525630310002  # "SERV01" + layout version
+HEADER_SIZE = 64
+
+def _data_offset(schema_len):
+    return HEADER_SIZE + -(-schema_len // HEADER_SIZE) * HEADER_SIZE
+
+def _open_shm(name):
+    """Attach without letting this process's resource tracker unlink the block"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    # Older Pythons register every attached block with the resource tracker,
+    # which unlinks it when the reader exits; skip that registration
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+class SharedSampleRing(SampleRing):
+    def __init__(self, shm, owner):
+        self._shm = shm
+        self._owner = owner
+        self._header = np.ndarray(5, dtype=np.uint64, buffer=shm.buf)
+        if self._header[0] != SHM_MAGIC:
+            raise ValueError(f"Shared memory block {shm.name} is not a sample ring "
+                             f"(or one from an older version)")
+        self.capacity = int(self._header[1])
+        schema_len = int(self._header[4])
+        self.schema = Schema.parse(bytes(shm.buf[HEADER_SIZE:HEADER_SIZE + schema_len]))
+        self.dtype = self.schema.dtype
+        self._size = self.capacity + int(self._header[2])
+        self._data = np.ndarray(2 * self._size, dtype=self.dtype,
+                                buffer=shm.buf, offset=_data_offset(schema_len))
+
+    @classmethod
+    def create(cls, name, capacity, headroom=1024, schema=DEFAULT_SCHEMA):
+        text = str(schema).encode()
+        size = _data_offset(len(text)) + 2 * (capacity + headroom) * schema.dtype.itemsize
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        shm.buf[HEADER_SIZE:HEADER_SIZE + len(text)] = text
+        header = np.ndarray(5, dtype=np.uint64, buffer=shm.buf)
+        header[:] = (SHM_MAGIC, capacity, headroom, 0, len(text))
+        del header
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        return cls(_open_shm(name), owner=False)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    # The cursor lives in shared memory; the writer stores it only after the
+    # records it publishes are in place (see SampleRing.append/extend)
+    @property
+    def _cursor(self):
+        return int(self._header[3])
+
+    @_cursor.setter
+    def _cursor(self, value):
+        self._header[3] = value
+
+    def clear(self):
+        if self._owner:
+            self._cursor = 0
+
+    def close(self):
+        """Detach; the creating process also removes the block"""
+        self._header = self._data = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # A caller still holds a view; the mapping goes away at exit
+        if self._owner:
+            self._shm.unlink()
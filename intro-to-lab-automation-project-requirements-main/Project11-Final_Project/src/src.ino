@@ -16,8 +16,48 @@ const int buzzerPin = 5;         // Buzzer output pin
 const int FAN_PIN = 3;           // Fan control pin
 const int buttonPin = 2;         // Button input pin
 
-// Threshold for buzzer activation (in degrees)
-const int thresholdAngle = 100;
+// Built-in buzzer thresholds (in degrees), used until the host takes over
+const int upperAngle = 90;
+const int lowerAngle = 10;
+
+// --- Serial protocol ---
+// ASCII lines by default; the host sends "B1" to switch to binary frames
+// (see protocol.py) and "S<ms>" to change the sample interval. The channels
+// are announced as a "#schema" line after boot and when the host sends "D"
+// (see schema.py); Sample must list the same fields in the same order.
+const byte FRAME_SYNC = 0xA5;
+const char SCHEMA[] = "t_ms:u4,angle:i2,buzzer:u1,fan:u1,accel_x:i2,accel_y:i2,accel_z:i2";
+
+struct __attribute__((packed)) Sample {
+  uint32_t t_ms;     // ms since start
+  int16_t angle;     // degrees
+  uint8_t buzzer;
+  uint8_t fan;
+  int16_t accel_x;   // Raw accelerometer reading, milli-g
+  int16_t accel_y;
+  int16_t accel_z;
+};
+
+bool binaryMode = false;
+unsigned long sampleIntervalMs = 100;
+const unsigned long displayIntervalMs = 200;  // The OLED is slow, refresh it less often
+unsigned long lastSample = 0;
+unsigned long lastDisplay = 0;
+char cmdBuffer[16];
+byte cmdLength = 0;
+
+// --- Host control (control.py) ---
+// "Z1"/"Z0" set the buzzer from the host and suspend the built-in
+// thresholds. "H0", or no command for hostTimeoutMs (host crashed or
+// unplugged), hands the buzzer back to them. "F1"/"F0" switch the fan like
+// the button does. The fan interlock below always stays on the board.
+bool hostControl = false;
+bool hostBuzzer = false;
+unsigned long lastHostCommand = 0;
+const unsigned long hostTimeoutMs = 2000;
+
+bool buzzerOn = false;
+bool fanState = false;  // Toggled by the button or set with F0/F1
 
 // Create a servo object
 Servo servoMotor;
@@ -26,7 +66,7 @@ Servo servoMotor;
 unsigned long startTime;
 
 void setup() {
-  Serial.begin(9600);
+  Serial.begin(115200);
   while (!Serial);  // Wait for serial connection
 
   // Initialize the accelerometer from SensorKit
@@ -56,34 +96,139 @@ void setup() {
   
   // Record the start time
   startTime = millis();
+  announceSchema();
+}
+
+void announceSchema() {
+  Serial.print(F("#schema "));
+  Serial.println(SCHEMA);
+}
+
+// CRC-8, polynomial 0x07, initial value 0
+byte crc8(const byte *data, byte len) {
+  byte crc = 0;
+  while (len--) {
+    crc ^= *data++;
+    for (byte i = 0; i < 8; i++) {
+      crc = (crc & 0x80) ? (crc << 1) ^ 0x07 : (crc << 1);
+    }
+  }
+  return crc;
+}
+
+// Drive the buzzer and the fan; the fan is off while the buzzer sounds
+void applyOutputs(bool buzzer) {
+  if (buzzer != buzzerOn) {
+    if (buzzer) {
+      digitalWrite(buzzerPin, HIGH);
+      tone(buzzerPin, 420); // Play a tone (frequency may need adjustment)
+    } else {
+      digitalWrite(buzzerPin, LOW);
+      noTone(buzzerPin);
+    }
+    buzzerOn = buzzer;
+  }
+  digitalWrite(FAN_PIN, (fanState && !buzzer) ? HIGH : LOW);
+}
+
+void processCommand(const char *cmd) {
+  lastHostCommand = millis();
+  if (cmd[0] == 'Z') {
+    // Switch right away instead of at the next sample
+    hostControl = true;
+    hostBuzzer = (cmd[1] == '1');
+    applyOutputs(hostBuzzer);
+  } else if (cmd[0] == 'H') {
+    hostControl = (cmd[1] == '1');
+  } else if (cmd[0] == 'F') {
+    fanState = (cmd[1] == '1');
+    applyOutputs(buzzerOn);
+  } else if (cmd[0] == 'B') {
+    binaryMode = (cmd[1] == '1');
+    Serial.println(binaryMode ? "BIN OK" : "ASCII OK");
+  } else if (cmd[0] == 'D') {
+    announceSchema();
+  } else if (cmd[0] == 'S') {
+    long interval = atol(cmd + 1);
+    if (interval >= 5) {
+      sampleIntervalMs = interval;
+    }
+  }
+}
+
+// Collect command characters without blocking the sampling loop
+void handleCommands() {
+  while (Serial.available() > 0) {
+    char c = Serial.read();
+    if (c == '\n' || c == '\r') {
+      if (cmdLength > 0) {
+        cmdBuffer[cmdLength] = '\0';
+        processCommand(cmdBuffer);
+        cmdLength = 0;
+      }
+    } else if (cmdLength < sizeof(cmdBuffer) - 1) {
+      cmdBuffer[cmdLength++] = c;
+    }
+  }
+}
+
+void sendSample(const Sample &s) {
+  if (binaryMode) {
+    // Sync byte, the packed Sample (AVR is little endian, same as the host), CRC
+    byte frame[sizeof(Sample) + 2];
+    frame[0] = FRAME_SYNC;
+    memcpy(frame + 1, &s, sizeof(Sample));
+    frame[sizeof(Sample) + 1] = crc8(frame + 1, sizeof(Sample));
+    Serial.write(frame, sizeof(frame));
+  } else {
+    // Format: one value per SCHEMA channel, comma separated
+    Serial.print(s.t_ms);
+    Serial.print(",");
+    Serial.print(s.angle);
+    Serial.print(",");
+    Serial.print(s.buzzer);
+    Serial.print(",");
+    Serial.print(s.fan);
+    Serial.print(",");
+    Serial.print(s.accel_x);
+    Serial.print(",");
+    Serial.print(s.accel_y);
+    Serial.print(",");
+    Serial.println(s.accel_z);
+  }
 }
 
 void loop() {
+  handleCommands();
+
+  unsigned long now = millis();
+  if (now - lastSample < sampleIntervalMs) {
+    return;
+  }
+  lastSample = now;
+
   // --- Read the accelerometer sensor using SensorKit ---
   // For this example, we use the X-axis.
   // If the accelerometer returns values from -1.0 to 1.0,
   // then mapping (x + 1.0) * 80.0 - 45.0 will convert it to a range of -35 to 125 degrees.
   float xReading = Accelerometer.readX();
+  float yReading = Accelerometer.readY();
+  float zReading = Accelerometer.readZ();
   int angle = (int)((xReading + 1.0) * 80.0 - 45.0);  // Adjust to range -35 to 125, making 45 degrees the new 0
   // --- Update the servo motor ---
   servoMotor.write(angle);
   
   // --- Determine the buzzer state ---
-  // Turn the buzzer ON if the angle exceeds 90 degrees or is below 10 degrees
-  int buzzerState = 0;
-  if (angle > 90 || angle < 10) {
-    digitalWrite(buzzerPin, HIGH);
-    tone(buzzerPin, 420); // Play a tone (frequency may need adjustment)
-    buzzerState = 1;
-  } else {
-    digitalWrite(buzzerPin, LOW);
-    noTone(buzzerPin);
-    buzzerState = 0;
+  // The host decides while it keeps sending commands; otherwise turn the
+  // buzzer ON if the angle exceeds upperAngle or is below lowerAngle
+  if (hostControl && now - lastHostCommand > hostTimeoutMs) {
+    hostControl = false;
   }
+  bool buzzer = hostControl ? hostBuzzer : (angle > upperAngle || angle < lowerAngle);
+  int buzzerState = buzzer ? 1 : 0;
   
   // --- Check the button to control the fan ---
   // With the internal pull-up enabled, the button reads LOW when pressed.
-  static bool fanState = false; // Store the fan state
   static bool lastButtonState = HIGH;
   int buttonState = digitalRead(buttonPin);
   if (buttonState == LOW && lastButtonState == HIGH) {
@@ -92,39 +237,38 @@ void loop() {
   }
   lastButtonState = buttonState;
   
-  // --- Control the fan based on the buzzer state and button state ---
-  if (buzzerState == 1) {
-    digitalWrite(FAN_PIN, LOW); // Turn off the fan if the buzzer is on
-  } else {
-    digitalWrite(FAN_PIN, fanState ? HIGH : LOW); // Control the fan based on the button state
-  }
+  // --- Control the buzzer, and the fan based on the buzzer state and button state ---
+  applyOutputs(buzzer);
   
+  int fanOn = digitalRead(FAN_PIN) == HIGH ? 1 : 0;
+
   // --- Update the OLED display ---
-  display.clearDisplay();
-  display.setTextSize(2);
-  display.setTextColor(SSD1306_WHITE);
-  display.setCursor(0, 0);
-  display.print("Angle:");
-  display.println(angle);
-  
-  display.print("Buz:");
-  display.println(buzzerState == 1 ? "ON" : "OFF");
-    
-  display.print("Fan:");
-  display.println(digitalRead(FAN_PIN) == HIGH ? "ON" : "OFF");
-    
-  display.display();
-  
-  // --- Log data via Serial in CSV format ---
-  // Format: [Time_since_start (ms)],[Angle],[BuzzerState],[FanState]
-  unsigned long currentTime = millis() - startTime;
-  Serial.print(currentTime);
-  Serial.print(",");
-  Serial.print(angle);
-  Serial.print(",");
-  Serial.print(buzzerState);
-  Serial.print(",");
-  Serial.println(digitalRead(FAN_PIN) == HIGH ? 1 : 0);
-  
-  delay(100); // Wait 100 ms before the next iteration
+  if (now - lastDisplay >= displayIntervalMs) {
+    lastDisplay = now;
+    display.clearDisplay();
+    display.setTextSize(2);
+    display.setTextColor(SSD1306_WHITE);
+    display.setCursor(0, 0);
+    display.print("Angle:");
+    display.println(angle);
+
+    display.print("Buz:");
+    display.println(buzzerState == 1 ? "ON" : "OFF");
+
+    display.print("Fan:");
+    display.println(fanOn ? "ON" : "OFF");
+
+    display.display();
+  }
+
+  // --- Log data via Serial (CSV line or binary frame) ---
+  Sample s;
+  s.t_ms = millis() - startTime;
+  s.angle = angle;
+  s.buzzer = buzzerState;
+  s.fan = fanOn;
+  s.accel_x = (int16_t)(xReading * 1000.0);
+  s.accel_y = (int16_t)(yReading * 1000.0);
+  s.accel_z = (int16_t)(zReading * 1000.0);
+  sendSample(s);
 }
@@ -1,158 +1,363 @@
 import tkinter as tk
 from tkinter import ttk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import serial
 import threading
-import csv
-import time
-from collections import deque
+import argparse
 import os
 import signal
-from matplotlib.animation import FuncAnimation
+import sys
+import time
+from ring_buffer import SampleRing
+from decimation import MinMaxPyramid
+from data_logger import BufferedLogger, make_sink
+from acquisition import SerialAcquisition
+from control import ControlEngine, load_rules
+from schema import Schema
+# matplotlib (about a second to import) is loaded in create_gui(), after the
+# serial reader has started; live_feed, replay and shm_feed only in the mode
+# that needs them (see main())
+
+# Shared helpers live in intro-to-lab-automation-project-requirements-main/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', 'common'))
+from gui_dispatch import TkDispatcher
+from metrics import Metrics, MetricsExporter, ProfileCapture
 
 # -------------------------------
 # Configuration Parameters
 # -------------------------------
 SERIAL_PORT = 'COM5'
-BAUD_RATE = 9600
-MAX_DATA_POINTS = 100
+BAUD_RATE = 115200  # Must match Serial.begin() in src.ino
+USE_BINARY_PROTOCOL = True  # Ask the sketch for binary frames, fall back to CSV lines
+SAMPLE_INTERVAL_MS = 100  # Sent to the sketch on connect ("S<ms>")
+# Channels kept, logged and offered to the plot and the rules (schema.py). The
+# sketch's own channels are mapped onto these by name: extra ones are dropped,
+# missing ones stay 0. Keep buzzer and fan, the indicators read them.
+SCHEMA = "t_ms:u4,angle:i2,buzzer:u1,fan:u1,accel_x:i2,accel_y:i2,accel_z:i2"
+PLOT_CHANNELS = ('angle',)  # One line each, e.g. ('accel_x', 'accel_y', 'accel_z')
+Y_LIMITS = (-10, 190)  # None: fit the visible data whenever the view re-scrolls
+MAX_DATA_POINTS = 100  # Samples shown in the live (scrolling) view
+HISTORY_POINTS = 2_000_000  # Kept for zoom/scroll: ~5.5 h at 100 Hz (2x the record size per sample)
+POINTS_PER_PIXEL = 2  # Plot at most this many points per pixel of axes width
+MARKER_MAX_POINTS = 500  # Draw sample markers only when this few raw points are visible
+ZOOM_STEP = 1.25  # Mouse wheel zoom factor
 UPDATE_INTERVAL = 100  # Update plot every 100ms
+USE_BLIT = True  # Only redraw the data line between frames
+X_HEADROOM = 0.25  # Extra x-range (fraction of visible span) before re-scrolling
+LOG_QUEUE_SIZE = 10000  # Rows buffered for the writer thread before dropping
+LOG_BATCH_ROWS = 50  # Flush after this many rows...
+LOG_FLUSH_INTERVAL = 1.0  # ...or after this many seconds
+LOG_FSYNC = False  # fsync on every flush (safer on power loss, slower)
+LOG_FORMATS = ('csv', 'npy')  # Any of 'csv', 'npy', 'parquet' (needs pyarrow)
+USE_HOST_CONTROL = True  # Evaluate the buzzer thresholds here (control.py) instead of in the sketch
+RULES_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "rules.json")
+SHOW_METRICS = False  # Show the performance panel at startup (the "Stats" checkbox)
+METRICS_PATH = None  # e.g. "metrics.prom" (Prometheus text) or "metrics.json", rewritten every 5 s
 
 # -------------------------------
-# Data Storage and CSV Setup
+# Data Storage
 # -------------------------------
-time_data = deque(maxlen=MAX_DATA_POINTS)
-angle_data = deque(maxlen=MAX_DATA_POINTS)
+schema = Schema.parse(SCHEMA)
+samples = None  # SampleRing(HISTORY_POINTS) of schema records, allocated in main()
+plot_channels = []  # The PLOT_CHANNELS the samples have
+pyramids = []  # One MinMaxPyramid over samples per plotted channel, built in main()
+lines = []  # Their Line2D artists
 buzzer_state = 0
 fan_state = 0
+rules = []  # ThresholdRules from RULES_PATH, also drawn as threshold lines
+threshold_lines = []
+follow_live = True  # False once the user zooms or pans away from the live view
+auto_xlim = None  # Last x-limits set by update_plot(), to notice user navigation
 
-# Set up CSV file
-dir_path = os.path.dirname(os.path.realpath(__file__))
-csv_file_path = os.path.join(dir_path, "data_log.csv")
-csv_file = open(csv_file_path, "w", newline="")
-csv_writer = csv.writer(csv_file)
-csv_writer.writerow(["Time (ms)", "Angle (deg)", "Buzzer State", "Fan State"])
+# Hot-path counters and timers (metrics.py); the reader and the logger
+# register theirs in main()
+metrics = Metrics(prefix='servo_monitor_')
+batch_time = metrics.timer('batch_handle_seconds')  # handle_batch(), reader thread
+plot_update_time = metrics.timer('plot_update_seconds')  # update_plot(), incl. re-scroll redraws
+plot_draw_time = metrics.timer('plot_draw_seconds')  # Rendering the data line
+metrics.gauge('samples_buffered', lambda: len(samples) if samples is not None else 0)
+metrics_snapshot = None  # Last snapshot shown in the panel, for rates
 
 # Global variables
-ser = None
-running = True
+# Set in main(): either a local serial acquisition + logger, or a feed client
+# attached to daemon.py (which then does the logging), or a shared-memory ring
+# published by daemon.py --shm, or a LogReplay of a recorded session (which
+# then stands in for the acquisition)
+acquisition = None
+replay = None
+engine = None  # ControlEngine, only when we own the port and USE_HOST_CONTROL
+logger = None
+feed_client = None
+shared_ring = None
 plot_pause = False
+dispatcher = None  # TkDispatcher: the only way reader threads reach the widgets
+metrics_exporter = None
+profiler = None
+
+def start_logger():
+    """Open the log files (data_log.csv, data_log.npy, ...) and the writer thread"""
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    log_base_path = os.path.join(dir_path, "data_log")
+    return BufferedLogger(make_sink(log_base_path, LOG_FORMATS, schema.dtype),
+                          max_queue=LOG_QUEUE_SIZE,
+                          batch_rows=LOG_BATCH_ROWS,
+                          flush_interval=LOG_FLUSH_INTERVAL,
+                          fsync=LOG_FSYNC).start()
 
 def cleanup():
     """Comprehensive cleanup function"""
-    global running, ser, csv_file
     print("Performing cleanup...")
-    running = False
+
+    if engine:
+        print(engine.report())
+    if profiler and profiler.running:
+        profiler.stop()
+    if dispatcher:
+        dispatcher.stop()
+    if feed_client:
+        feed_client.stop()
+    if shared_ring is not None:
+        shared_ring.close()
     
-    # Stop the fan
+    # Hand the buzzer back to the sketch and stop the fan
     try:
-        if ser and ser.is_open:
-            ser.write(b'F0')
-            time.sleep(0.1)  # Give time for the command to be sent
-            ser.close()
-            print("Serial port closed and fan stopped")
+        if acquisition:
+            acquisition.close()
     except Exception as e:
         print(f"Error during serial cleanup: {e}")
 
-    # Close CSV file
+    # Write out queued rows and close CSV file
     try:
-        if not csv_file.closed:
-            csv_file.close()
-            print("CSV file closed")
+        if logger:
+            logger.close()
+            print(f"Log files closed ({logger.written} rows written, {logger.dropped} dropped)")
     except Exception as e:
-        print(f"Error closing CSV file: {e}")
+        print(f"Error closing log files: {e}")
+
+    if metrics_exporter:
+        metrics_exporter.stop()
 
 def read_serial():
-    """Enhanced serial reading function with better error handling"""
-    global buzzer_state, fan_state, running, ser
-    
-    while running:
-        try:
-            if not ser or not ser.is_open:
-                ser = serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=1)
-                time.sleep(2)
-                print("Serial connection established")
-                
-            line = ser.readline().decode('utf-8').strip()
-            if line:
-                parts = line.split(',')
-                if len(parts) == 4:
-                    t_val = int(parts[0])
-                    angle_val = int(parts[1])
-                    buzzer_val = int(parts[2])
-                    fan_val = int(parts[3])
-                    
-                    time_data.append(t_val)
-                    angle_data.append(angle_val)
-                    buzzer_state = buzzer_val
-                    fan_state = fan_val
-                    
-                    csv_writer.writerow([t_val, angle_val, buzzer_val, fan_val])
-                    
-                    # Update GUI elements
-                    root.after(0, update_led)
-                    root.after(0, update_fan)
-                    
-        except serial.SerialException as e:
-            print(f"Serial error: {e}")
-            time.sleep(1)  # Wait before retrying
-        except Exception as e:
-            print(f"Error in serial reading: {e}")
-            time.sleep(1)
+    """Reader thread: run the serial acquisition (or replay) until cleanup() stops it"""
+    acquisition.run()
+
+def handle_batch(batch):
+    """Store, log and display a batch of decoded samples"""
+    if len(batch) == 0:
+        return
+    t0 = time.perf_counter_ns()
+
+    # Rules first, so commands go out before anything else is done
+    if engine:
+        engine.process(batch)
+    samples.extend(batch)
+    if logger:
+        logger.log_batch(batch)
+    set_states(int(batch['buzzer'][-1]), int(batch['fan'][-1]))
+    batch_time.since(t0)
+
+def set_states(buzzer, fan):
+    """Record the latest buzzer/fan states and refresh the indicators"""
+    global buzzer_state, fan_state
+    buzzer_state = buzzer
+    fan_state = fan
+
+    # Called from the reader thread: post, and let the Tk thread apply the
+    # latest states on its next drain (unchanged states are skipped). The
+    # first samples can arrive before the window exists.
+    if dispatcher:
+        dispatcher.post('buzzer', update_led, buzzer)
+        dispatcher.post('fan', update_fan, fan)
 
 def update_plot(frame):
-    """Improved plot update function with better styling"""
-    if not plot_pause and len(time_data) > 0:
-        ax.clear()
-        
-        # Plot with improved styling
-        ax.plot(list(time_data), list(angle_data), 
-                color='#2196F3', 
-                linewidth=2, 
-                marker='o',
-                markersize=4,
-                markerfacecolor='white',
-                markeredgecolor='#2196F3')
-        
-        # Customize grid
-        ax.grid(True, linestyle='--', alpha=0.7)
-        
-        # Customize labels and title
-        ax.set_xlabel("Time (ms)", fontsize=10, fontweight='bold')
-        ax.set_ylabel("Angle (degrees)", fontsize=10, fontweight='bold')
-        ax.set_title("Servo Angle Monitor", fontsize=12, fontweight='bold', pad=10)
-        
-        # Add range indicators
-        ax.axhline(y=0, color='#FF9800', linestyle='--', alpha=0.5)
-        ax.axhline(y=125, color='#FF9800', linestyle='--', alpha=0.5)
-        
-        # Set y-axis limits with some padding
-        ax.set_ylim(-10, 190)
-        
-        # Customize appearance
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        
-        # Add legend
-        ax.legend(['Servo Angle'], loc='upper right')
-
-def update_led():
+    """Push the samples in view into the persistent line artists.
+
+    The axes are styled once in create_gui(); here we only swap the data
+    of the line of each plotted channel. In the live view the x-axis is
+    re-scrolled (one full redraw) only when the newest sample runs past the
+    right edge; all other frames are a cheap blit. After the user zooms or
+    pans (toolbar or mouse wheel), the current x-limits are shown instead
+    until "Live" is pressed. Either way the pyramids supply at most
+    POINTS_PER_PIXEL points per pixel and line, raw samples when zoomed in
+    and min/max envelopes when zoomed out.
+    """
+    global follow_live, auto_xlim
+
+    if plot_pause or len(samples) == 0:
+        return tuple(lines)
+    t0 = time.perf_counter_ns()
+
+    for pyramid in pyramids:
+        pyramid.update()
+
+    if shared_ring is not None:
+        # Nobody calls handle_batch() in this mode, read the states here
+        newest = samples.latest(1)
+        set_states(int(newest['buzzer'][-1]), int(newest['fan'][-1]))
+
+    if follow_live and auto_xlim is not None and ax.get_xlim() != auto_xlim:
+        follow_live = False  # Zoomed or panned with the toolbar
+
+    if follow_live:
+        view = pyramids[0].raw()[-MAX_DATA_POINTS:]
+        t_first, t_last = int(view['t_ms'][0]), int(view['t_ms'][-1])
+        x_min, x_max = ax.get_xlim()
+        if auto_xlim is None or t_last > x_max or t_last < x_min:
+            span = max(t_last - t_first, 1000)
+            ax.set_xlim(t_first, t_last + span * X_HEADROOM)
+            auto_xlim = ax.get_xlim()
+            if Y_LIMITS is None:
+                low = min(int(view[name].min()) for name in plot_channels)
+                high = max(int(view[name].max()) for name in plot_channels)
+                margin = max((high - low) * 0.1, 1)
+                ax.set_ylim(low - margin, high + margin)
+            if USE_BLIT:
+                # Re-render the static background (ticks, labels) for the new
+                # limits; FuncAnimation then caches it for the following blits.
+                canvas.draw()
+    else:
+        t_first, t_last = ax.get_xlim()
+
+    max_points = int(ax.bbox.width * POINTS_PER_PIXEL)
+    for pyramid, line in zip(pyramids, lines):
+        x, y, level = pyramid.select(t_first, t_last, max_points)
+        line.set_data(x, y)
+        line.set_marker('o' if level == 0 and len(x) <= MARKER_MAX_POINTS else 'None')
+        # A wide line over a dense min/max zigzag is several times slower to rasterize
+        line.set_linewidth(2 if level == 0 else 1)
+
+    plot_update_time.since(t0)
+    return tuple(lines)
+
+def on_scroll(event):
+    """Mouse wheel zooms the time axis around the cursor"""
+    global follow_live
+    if event.inaxes is not ax or event.xdata is None:
+        return
+    scale = 1 / ZOOM_STEP if event.button == 'up' else ZOOM_STEP
+    x_min, x_max = ax.get_xlim()
+    ax.set_xlim(event.xdata - (event.xdata - x_min) * scale,
+                event.xdata + (x_max - event.xdata) * scale)
+    follow_live = False
+    canvas.draw_idle()
+
+def go_live():
+    """Return to the scrolling view of the newest samples"""
+    global follow_live, auto_xlim
+    follow_live = True
+    auto_xlim = None  # Forces a re-scroll on the next frame
+
+def setup_axes(ax):
+    """Build the static parts of the plot once and return the data lines"""
+    ax.grid(True, linestyle='--', alpha=0.7)
+
+    ax.set_xlabel("Time (ms)", fontsize=10, fontweight='bold')
+    ylabel = "Angle (degrees)" if plot_channels == ['angle'] else ", ".join(plot_channels)
+    ax.set_ylabel(ylabel, fontsize=10, fontweight='bold')
+    ax.set_title("Servo Angle Monitor", fontsize=12, fontweight='bold', pad=10)
+
+    # Threshold lines come from the rules, see draw_thresholds()
+    ax.set_ylim(*(Y_LIMITS or (-10, 190)))
+    ax.set_xlim(0, 1000)
+
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+
+    colors = ['#2196F3', '#E91E63', '#4CAF50', '#9C27B0', '#795548', '#607D8B']
+    new_lines = []
+    for i, name in enumerate(plot_channels):
+        color = colors[i % len(colors)]
+        line, = ax.plot([], [],
+                        color=color,
+                        linewidth=2,
+                        marker='o',
+                        markersize=4,
+                        markerfacecolor='white',
+                        markeredgecolor=color,
+                        label='Servo Angle' if name == 'angle' else name,
+                        animated=USE_BLIT)
+        new_lines.append(line)
+    ax.legend(loc='upper right')
+    return new_lines
+
+def draw_thresholds():
+    """One dashed line per threshold of the rules on plotted channels"""
+    for threshold_line in threshold_lines:
+        threshold_line.remove()
+    threshold_lines[:] = [ax.axhline(y=y, color='#FF9800', linestyle='--', alpha=0.5)
+                          for rule in rules if rule.channel in plot_channels
+                          for y in rule.thresholds()]
+
+def reload_rules():
+    """Re-read RULES_PATH, so thresholds change without reflashing or restarting"""
+    global rules
+    try:
+        new_rules = load_rules(RULES_PATH)
+        if engine:
+            engine.set_rules(new_rules)
+    except Exception as e:
+        print(f"Error loading {RULES_PATH}: {e}")
+        return
+    rules = new_rules
+    draw_thresholds()
+    canvas.draw()
+    print(f"Loaded {len(rules)} rule(s) from {RULES_PATH}")
+
+def update_led(state):
     """Update buzzer LED indicator"""
     try:
-        color = "red" if buzzer_state == 1 else "green"
+        color = "red" if state == 1 else "green"
         led_label.config(bg=color)
     except tk.TclError:
         pass
 
-def update_fan():
+def update_fan(state):
     """Update fan LED indicator"""
     try:
-        color = "green" if fan_state == 1 else "red"
+        color = "green" if state == 1 else "red"
         fan_led_label.config(bg=color)
     except tk.TclError:
         pass
 
+def update_log_status():
+    """Show the logger backlog so we can tell if the disk keeps up"""
+    try:
+        if logger:
+            stats = logger.stats()
+            log_status_label.config(
+                text=f"Log: {stats['written']} written, {stats['queued']} queued, {stats['dropped']} dropped")
+        elif shared_ring is not None:
+            log_status_label.config(text=f"Shared memory feed '{shared_ring.name}'")
+        elif replay:
+            log_status_label.config(text=replay.status())
+        else:
+            log_status_label.config(text=f"Attached to daemon at {feed_client.host}:{feed_client.port}")
+        if engine:
+            control_status_label.config(text=engine.status())
+        update_metrics_panel()
+    except tk.TclError:
+        return
+    root.after(1000, update_log_status)
+
+def update_metrics_panel():
+    """Counters, rates and timings of the hot paths, while the panel is shown"""
+    global metrics_snapshot
+    if not show_metrics.get():
+        metrics_snapshot = None
+        return
+    metrics_snapshot = metrics.snapshot(metrics_snapshot)
+    metrics_label.config(text=metrics.format(metrics_snapshot))
+
+def toggle_metrics_panel():
+    if show_metrics.get():
+        metrics_frame.pack(fill=tk.X, after=control_status_label)
+        update_metrics_panel()
+    else:
+        metrics_frame.pack_forget()
+
+def toggle_profile():
+    """Start or stop a profile capture (saved next to this script)"""
+    profiler.toggle()
+    profile_button.config(text="Stop profile" if profiler.running else "Profile")
+
 def toggle_plot():
     """Toggle plot updates"""
     global plot_pause
@@ -160,7 +365,8 @@ def toggle_plot():
 
 def on_closing():
     """Enhanced cleanup routine for window closing"""
-    if tk.messagebox.askokcancel("Quit", "Do you want to quit?"):
+    from tkinter import messagebox
+    if messagebox.askokcancel("Quit", "Do you want to quit?"):
         cleanup()
         root.quit()
         root.destroy()
@@ -173,9 +379,17 @@ def signal_handler(sig, frame):
 
 def create_gui():
     """Create the main GUI with improved styling"""
-    global root, led_label, fan_led_label, ax, canvas
+    # A bare Figure on the Tk canvas: pyplot's figure manager and backend
+    # selection are not needed (and not imported)
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+    global root, led_label, fan_led_label, log_status_label, control_status_label, ax, canvas, dispatcher
+    global metrics_frame, metrics_label, show_metrics, profile_button
     
     root = tk.Tk()
+    dispatcher = TkDispatcher(root).start()
+    metrics.counter('gui_posts_total', lambda: dispatcher.posted)
+    metrics.counter('gui_updates_total', lambda: dispatcher.applied)
     root.title("Servo Angle Monitor")
     root.geometry("800x600")
     
@@ -200,42 +414,144 @@ def create_gui():
     ttk.Label(fan_frame, text="Fan:").pack(side=tk.LEFT, padx=(0, 5))
     fan_led_label = tk.Label(fan_frame, width=2, height=1, bg="red", relief="sunken")
     fan_led_label.pack(side=tk.LEFT)
+
+    # Logger backlog
+    log_status_label = ttk.Label(status_frame, text="Log: -")
+    log_status_label.pack(side=tk.RIGHT, padx=10)
+
+    # Control rules and their reaction latency
+    control_status_label = ttk.Label(main_frame, text="")
+    control_status_label.pack(fill=tk.X)
+
+    # Performance panel, shown with the "Stats" checkbox
+    metrics_frame = ttk.LabelFrame(main_frame, text="Performance", padding="5")
+    metrics_label = ttk.Label(metrics_frame, text="", font="TkFixedFont", justify=tk.LEFT)
+    metrics_label.pack(anchor=tk.W)
+    show_metrics = tk.BooleanVar(value=SHOW_METRICS)
     
     # Plot frame
     plot_frame = ttk.Frame(main_frame)
     plot_frame.pack(fill=tk.BOTH, expand=True)
     
     # Create matplotlib figure
-    fig, ax = plt.subplots(figsize=(8, 4), dpi=100)
+    fig = Figure(figsize=(8, 4), dpi=100)
+    ax = fig.add_subplot()
+    lines[:] = setup_axes(ax)
+    # The per-frame render cost when blitting (update_plot only sets the data)
+    for line in lines:
+        line.draw = plot_draw_time.wrap(line.draw)
+    draw_thresholds()
     canvas = FigureCanvasTkAgg(fig, master=plot_frame)
     canvas.draw()
+    # Toolbar zoom/pan plus the mouse wheel browse the whole history
+    NavigationToolbar2Tk(canvas, plot_frame).update()
     canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    canvas.mpl_connect('scroll_event', on_scroll)
     
     # Control buttons
     button_frame = ttk.Frame(main_frame)
     button_frame.pack(fill=tk.X, pady=(10, 0))
     
     ttk.Button(button_frame, text="Pause/Resume", command=toggle_plot).pack(side=tk.LEFT, padx=5)
+    ttk.Button(button_frame, text="Live", command=go_live).pack(side=tk.LEFT, padx=5)
+    ttk.Button(button_frame, text="Reload rules", command=reload_rules).pack(side=tk.LEFT, padx=5)
+    profile_button = ttk.Button(button_frame, text="Profile", command=toggle_profile)
+    profile_button.pack(side=tk.RIGHT, padx=5)
+    ttk.Checkbutton(button_frame, text="Stats", variable=show_metrics,
+                    command=toggle_metrics_panel).pack(side=tk.RIGHT, padx=5)
+    toggle_metrics_panel()
     
     return fig, ax
 
 def main():
     """Main application function"""
-    global root, fig, ax
+    global root, fig, ax, samples, acquisition, replay, engine, logger, feed_client, shared_ring, rules
+    global metrics_exporter, profiler
+
+    parser = argparse.ArgumentParser(description="Servo angle monitor")
+    parser.add_argument('--port', default=SERIAL_PORT, help='serial port of the Arduino')
+    parser.add_argument('--attach', metavar='HOST:PORT',
+                        help='show the live feed of a running daemon.py instead of opening the port')
+    parser.add_argument('--shm', metavar='NAME',
+                        help='plot straight from the shared-memory ring of daemon.py --shm NAME')
+    parser.add_argument('--replay', metavar='LOG',
+                        help='play a recorded log (.csv, .npy, .parquet) instead of opening the port')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='replay speed: 1 = recorded timing, 10 = ten times faster, 0 = as fast as possible')
+    parser.add_argument('--loop', action='store_true', help='start the replay over when it ends')
+    parser.add_argument('--metrics', metavar='FILE', default=METRICS_PATH,
+                        help='write counters and timings to FILE every 5 s (.prom: Prometheus text, else JSON)')
+    args = parser.parse_args()
     
     # Set up signal handler
     signal.signal(signal.SIGINT, signal_handler)
-    
+
+    rules = load_rules(RULES_PATH if os.path.exists(RULES_PATH) else None)
+    profiler = ProfileCapture(os.path.dirname(os.path.realpath(__file__)))
+
+    # Start the data source first: the port opens and the board gets ready
+    # while matplotlib loads and the window is built
+    if args.shm:
+        # Zero-copy: update_plot() reads the daemon's ring directly
+        from shm_feed import SharedSampleRing
+        shared_ring = samples = SharedSampleRing.attach(args.shm)
+    elif args.replay:
+        # Same pipeline as live, minus the port, the rules and the log files
+        from replay import LogReplay
+        samples = SampleRing(HISTORY_POINTS, dtype=schema.dtype)
+        acquisition = replay = LogReplay(args.replay, handle_batch, speed=args.speed,
+                                         loop=args.loop, schema=schema)
+        metrics.counter('replay_samples_total', lambda: replay.sent)
+        metrics.gauge('replay_max_lag_seconds', lambda: replay.max_lag)
+        threading.Thread(target=read_serial, daemon=True).start()
+    elif args.attach:
+        # The daemon owns the port and the log files; we only display
+        from live_feed import FeedClient, parse_address
+        samples = SampleRing(HISTORY_POINTS, dtype=schema.dtype)
+        host, port = parse_address(args.attach)
+        feed_client = FeedClient(handle_batch, host, port, schema=schema).start()
+    else:
+        samples = SampleRing(HISTORY_POINTS, dtype=schema.dtype)
+        logger = start_logger()
+        acquisition = SerialAcquisition(args.port, handle_batch,
+                                        baud_rate=BAUD_RATE,
+                                        sample_interval_ms=SAMPLE_INTERVAL_MS,
+                                        binary=USE_BINARY_PROTOCOL,
+                                        schema=schema)
+        acquisition.add_metrics(metrics)
+        logger.add_metrics(metrics)
+        if USE_HOST_CONTROL:
+            engine = ControlEngine(rules, acquisition.send, channels=schema.names)
+
+        # Start serial reading thread
+        serial_thread = threading.Thread(target=read_serial, daemon=True)
+        serial_thread.start()
+
+    # Level-of-detail summaries of whichever ring holds the samples (the
+    # daemon's schema with --shm), one per plotted channel
+    plot_channels[:] = [name for name in PLOT_CHANNELS if name in samples.dtype.names]
+    if not plot_channels:
+        plot_channels.append('angle')
+        print(f"None of {', '.join(PLOT_CHANNELS)} in the samples, plotting the angle")
+    pyramids[:] = [MinMaxPyramid(samples, field=name) for name in plot_channels]
+
     # Create GUI
-    fig, ax = create_gui()
-    
+    try:
+        fig, ax = create_gui()
+    except Exception:
+        cleanup()  # The reader and the log files are already open
+        raise
+
     # Set up animation
-    ani = FuncAnimation(fig, update_plot, interval=UPDATE_INTERVAL, cache_frame_data=False)
-    
-    # Start serial reading thread
-    serial_thread = threading.Thread(target=read_serial, daemon=True)
-    serial_thread.start()
+    from matplotlib.animation import FuncAnimation
+    ani = FuncAnimation(fig, update_plot, interval=UPDATE_INTERVAL,
+                        blit=USE_BLIT, cache_frame_data=False)
+
+    if args.metrics:
+        metrics_exporter = MetricsExporter(metrics, args.metrics).start()
     
+    update_log_status()
+
     # Set up window close handler
     root.protocol("WM_DELETE_WINDOW", on_closing)
     
@@ -257,4 +573,62 @@ python intro-to-lab-automation-project-requirements-main/Project11-Final_Project
 
 
 This updated code now keeps track of the fan state info sent from the ino code.
+
+The buzzer thresholds are evaluated here, not in the sketch (control.py,
+USE_HOST_CONTROL). Edit rules.json (thresholds, hysteresis, debounce) and
+press "Reload rules" to apply it without reflashing. The status line shows
+each rule's reaction latency; the full report is printed on exit. To
+measure it against the simulated board, run:
+
+python intro-to-lab-automation-project-requirements-main/Project11-Final_Project/src/bench_control.py
+
+To keep acquisition running without the GUI, start the headless daemon and
+attach the GUI to it (any number of times):
+
+python intro-to-lab-automation-project-requirements-main/Project11-Final_Project/src/daemon.py --port COM5
+python intro-to-lab-automation-project-requirements-main/Project11-Final_Project/src/src.py --attach 127.0.0.1:5011
+
+Samples are logged to data_log.csv and data_log.npy (see LOG_FORMATS). To load
+a log, or convert old CSV logs to .npy, use log_reader.py:
+
+python intro-to-lab-automation-project-requirements-main/Project11-Final_Project/src/log_reader.py convert data_log.csv
+
+Threshold counts, buzzer/fan on-time, histograms, window stats and gaps over
+any number of logs (streamed, one process per file):
+
+python intro-to-lab-automation-project-requirements-main/Project11-Final_Project/src/analyze_logs.py logs/*.csv --json summary.json
+
+To debug the GUI without the rig, replay a recorded session through the same
+pipeline at its recorded pace, faster, or as fast as possible (a repeatable
+load for timing the redraws):
+
+python intro-to-lab-automation-project-requirements-main/Project11-Final_Project/src/src.py --replay data_log.csv --speed 10
+
+The plot keeps a single Line2D and blits it (USE_BLIT). The last
+HISTORY_POINTS samples stay in memory: zoom out with the toolbar or the mouse
+wheel to browse the whole session, and press "Live" to follow new samples
+again. Long ranges are drawn from min/max summaries (decimation.py), so frame
+time stays flat however much is in view. To compare frame times against the
+old ax.clear() redraw, run:
+
+python intro-to-lab-automation-project-requirements-main/Project11-Final_Project/src/bench_plot.py
+
+To see whether reading, parsing, logging or drawing is the bottleneck, tick
+"Stats": bytes/s, samples/s, parse errors, queue depths and the p50/p99 and
+busy share of each step (metrics.py). --metrics metrics.prom (or .json) writes
+the same every 5 s; "Profile" records a .pstats profile until pressed again.
+
+Channels: the sketch announces what it sends ("#schema t_ms:u4,angle:i2,...",
+schema.py). SCHEMA sets what is kept and logged (the sketch's channels are
+matched by name) and PLOT_CHANNELS what is drawn, e.g. the raw accelerometer
+axes with Y_LIMITS = None. Rules can watch any channel ("channel" in
+rules.json). Parse cost per sample for 4 to 16 channels is measured by:
+
+python intro-to-lab-automation-project-requirements-main/Project11-Final_Project/src/bench_schema.py
+
+Startup: matplotlib (about a second) is only imported once the serial reader
+is running, so the board is being read while the window is built. Import
+cost and time to first sample are tracked by:
+
+python intro-to-lab-automation-project-requirements-main/Project11-Final_Project/src/bench_startup.py
 """
@@ -0,0 +1,53 @@
+"""
+Older logs still load through log_reader: the repo-root data_log.csv was
+written before the fan column and with `Time (ms),Angle (degrees),Buzzer`
+titles.
+
+    python -m pytest test_log_reader.py
+"""
+
+import os
+
+import numpy as np
+
+from analyze_logs import analyze_file
+from log_reader import csv_schema, iter_log_blocks, load_log, convert
+from ring_buffer import SAMPLE_DTYPE
+
+ROOT_LOG = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', '..', 'data_log.csv')
+
+def test_legacy_titles():
+    assert csv_schema("Time (ms),Angle (degrees),Buzzer").names == SAMPLE_DTYPE.names
+    assert csv_schema("Time (ms),Angle (deg),Buzzer State,Fan State").names == SAMPLE_DTYPE.names
+    assert csv_schema("t_ms,angle,accel_x").names == ('t_ms', 'angle', 'accel_x', 'buzzer', 'fan')
+
+def test_root_data_log():
+    data = load_log(ROOT_LOG)
+    assert data.dtype == SAMPLE_DTYPE
+    assert len(data) == 192
+    assert (data['t_ms'][:2] == [52, 205]).all()
+    assert (data['angle'][:2] == [89, 91]).all()
+    assert data['buzzer'].any()
+    assert not data['fan'].any()
+    blocks = list(iter_log_blocks(ROOT_LOG))
+    assert all(block.dtype == SAMPLE_DTYPE for block in blocks)
+
+    stats = analyze_file(ROOT_LOG, {})
+    assert stats.rows == 192 and stats.buzzer_on_ms > 0 and stats.fan_on_ms == 0
+
+def test_root_data_log_convert(tmp_path):
+    csv_path = tmp_path / 'data_log.csv'
+    csv_path.write_bytes(open(ROOT_LOG, 'rb').read())
+    out_path, rows = convert(str(csv_path))
+    data = load_log(out_path)
+    assert rows == 192 and data.dtype == SAMPLE_DTYPE
+    assert np.array_equal(data, load_log(ROOT_LOG))
+
+def test_truncated_last_row(tmp_path):
+    # What a crash mid-write leaves behind: the last row cut short
+    path = tmp_path / 'cut.csv'
+    path.write_bytes(b"Time (ms),Angle (deg),Buzzer State,Fan State\n1,2,3,4\n5,6,7")
+    data = load_log(str(path))
+    assert len(data) == 1 and data['angle'][0] == 2
+    _, rows = convert(str(path))
+    assert rows == 1
@@ -2,40 +2,69 @@
 """
 Project 8: Two-way communication between computer and Arduino
 This script creates a GUI to control an Arduino's LED duration and monitor its state.
+The Probe button measures command round-trip latency (see common/latency_probe.py).
 """
 
 import PySimpleGUI as sg
 import serial
-import threading
-import queue
 import time
+import os
+import sys
 
-def read_serial(ser, output_queue):
+# Shared helpers live in intro-to-lab-automation-project-requirements-main/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', 'common'))
+from serial_events import SerialWatcher
+# latency_probe (and NumPy with it) is imported when a probe starts
+
+STATE_MESSAGES = {
+    '0': "Device State: LED is off",
+    '1': "Device State: Button and LED are on",
+    '2': "Device State: Button is off, LED on"
+}
+
+def read_serial(ser, window, line_filter=None):
     """
-    Continuously reads data from the serial port in a separate thread.
-    
+    Starts a background watcher that posts serial lines to the GUI as events.
+
+    The watcher thread sleeps until bytes arrive, then calls
+    window.write_event_value, so the main loop receives a '-SERIAL-' event
+    immediately instead of polling a queue.
+
     Args:
         ser (serial.Serial): Serial port connection
-        output_queue (queue.Queue): Thread-safe queue for serial data
+        window (sg.Window): Window that receives the '-SERIAL-' events
+        line_filter (callable): Optional, runs on the watcher thread and
+            returns the lines to post (used by the latency probe)
+
+    Returns:
+        SerialWatcher: call .stop() before closing the port
     """
-    while True:
-        try:
-            if ser.in_waiting:
-                # Read and decode data
-                line = ser.readline().decode('utf-8').strip()
-                
-                # Only queue state messages (0, 1, 2)
-                if line.isdigit() and line in ['0', '1', '2']:
-                    output_queue.put(line)
-                # Print acknowledgment messages to console
-                elif line.startswith("I received:"):
-                    print(f"Arduino {line}")
-                    
-        except Exception as e:
-            error_msg = f"Serial read error: {e}"
-            output_queue.put(error_msg)
-            break
-        time.sleep(0.1)
+    def on_lines(lines):
+        if line_filter:
+            lines = line_filter(lines)
+        if lines:
+            window.write_event_value('-SERIAL-', lines)
+
+    return SerialWatcher(
+        ser,
+        on_lines=on_lines,
+        on_error=lambda e: window.write_event_value('-SERIAL-ERROR-', e)
+    ).start()
+
+def handle_serial_lines(lines, window):
+    """
+    Shows state messages (0, 1, 2) in the GUI and prints acknowledgements.
+    
+    Args:
+        lines (list[str]): Complete lines received from the Arduino
+        window (sg.Window): Main window
+    """
+    for line in lines:
+        if line in STATE_MESSAGES:
+            window['-OUTPUT-'].update(f"{STATE_MESSAGES[line]}\n", append=True)
+        # Print acknowledgment messages to console
+        elif line.startswith("I received:"):
+            print(f"Arduino {line}")
 
 def main():
     # Serial Configuration
@@ -47,13 +76,15 @@ def main():
     layout = [
         [sg.Text("LED Duration (milliseconds):", size=(20, 1)),
          sg.Input(key='-INPUT-', size=(10, 1), default_text='1000')],
-        [sg.Button("Send"), sg.Button("Exit")],
+        [sg.Button("Send"), sg.Button("Probe"), sg.Button("Exit")],
+        [sg.Text("", key='-LATENCY-', size=(60, 1))],
         [sg.Text("Device Status:", size=(10, 1))],
         [sg.Multiline(size=(50, 10), key='-OUTPUT-', autoscroll=True, disabled=True)]
     ]
 
     # Create Window
-    window = sg.Window("Arduino LED Controller", layout)
+    # finalize=True: the watcher thread posts events before the first read()
+    window = sg.Window("Arduino LED Controller", layout, finalize=True)
 
     try:
         # Initialize Serial Connection
@@ -67,22 +98,25 @@ def main():
         sg.popup_error(f"Failed to open {SERIAL_PORT}: {e}")
         return
 
-    # Create and start serial reading thread
-    serial_queue = queue.Queue()
-    serial_thread = threading.Thread(
-        target=read_serial,
-        args=(ser, serial_queue),
-        daemon=True
-    )
-    serial_thread.start()
+    # Start the event-driven serial reader; while a latency probe runs it
+    # takes its replies straight from the watcher thread
+    probe = None
+    watcher = read_serial(ser, window,
+                          line_filter=lambda lines: probe.on_lines(lines) if probe else lines)
 
-    # Main Event Loop
+    # Main Event Loop (blocks until a click or serial data arrives)
     while True:
-        event, values = window.read(timeout=100)
+        event, values = window.read()
 
         if event in (sg.WIN_CLOSED, "Exit"):
             break
 
+        if event == '-SERIAL-':
+            handle_serial_lines(values['-SERIAL-'], window)
+
+        if event == '-SERIAL-ERROR-':
+            window['-OUTPUT-'].update(f"Serial read error: {values['-SERIAL-ERROR-']}\n", append=True)
+
         if event == "Send":
             try:
                 # Validate input
@@ -100,18 +134,33 @@ def main():
             except Exception as e:
                 window['-OUTPUT-'].update(f"Send error: {e}\n", append=True)
 
-        # Process any received serial data
-        while not serial_queue.empty():
-            response = serial_queue.get()
-            state_messages = {
-                '0': "Device State: LED is off",
-                '1': "Device State: Button and LED are on",
-                '2': "Device State: Button is off, LED on"
-            }
-            message = state_messages.get(response, f"Unknown state: {response}")
-            window['-OUTPUT-'].update(f"{message}\n", append=True)
+        if event == "Probe" and not probe:
+            # Pipelined, sequence-numbered round trips with live percentiles
+            from latency_probe import LatencyProbe
+            probe = LatencyProbe(
+                ser, count=500, in_flight=4,
+                on_update=lambda p: window.write_event_value('-PROBE-', p.status()),
+                on_done=lambda p: window.write_event_value('-PROBE-DONE-', p)
+            ).start()
+
+        if event == '-PROBE-':
+            window['-LATENCY-'].update(values['-PROBE-'])
+
+        if event == '-PROBE-DONE-':
+            window['-LATENCY-'].update(probe.status())
+            path = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                f"latency_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+            probe.histogram.save(path)
+            window['-OUTPUT-'].update(f"Latency histogram saved to {path}\n", append=True)
+            probe = None
+            # The probe overwrote the LED duration on the board
+            if values['-INPUT-'].isdigit():
+                ser.write(f"{values['-INPUT-']}\n".encode('utf-8'))
 
     # Cleanup
+    if probe:
+        probe.stop()
+    watcher.stop()
     ser.close()
     window.close()
 
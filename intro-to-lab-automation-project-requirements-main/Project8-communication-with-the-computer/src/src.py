@@ -1,26 +1,40 @@
 import PySimpleGUI as sg
 import serial
-import threading
 import time
+import os
+import sys
 from serial.tools import list_ports
 
+# Shared helpers live in intro-to-lab-automation-project-requirements-main/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', 'common'))
+from serial_events import SerialWatcher
+# latency_probe (and NumPy with it) is imported when a probe starts
+
 class ArduinoController:
-    def __init__(self):
+    def __init__(self, title='Arduino LED Controller'):
         self.serial_port = None
-        self.is_running = False
-        self.read_thread = None
+        self.watcher = None
+        self.probe = None
         
-        layout = [
+        # finalize=True so subclasses can attach widgets (e.g. a matplotlib
+        # canvas) right after construction
+        self.window = sg.Window(title, self.build_layout(), finalize=True)
+
+    def build_layout(self):
+        """Window layout; subclasses extend the returned list"""
+        return [
             [sg.Text('Select Port:'), sg.Combo(self.get_serial_ports(), key='-PORT-'),
              sg.Button('Connect')],
             [sg.Text('LED Duration (ms):'), sg.Input(key='-DURATION-', default_text='90'),
              sg.Button('Send')],
+            [sg.Text('Probe commands:'), sg.Input(key='-PROBE-COUNT-', default_text='500', size=(6, 1)),
+             sg.Text('In flight:'), sg.Input(key='-IN-FLIGHT-', default_text='4', size=(3, 1)),
+             sg.Button('Probe')],
+            [sg.Text('', key='-LATENCY-', size=(60, 1))],
             [sg.Multiline(size=(50, 10), key='-OUTPUT-', disabled=True)],
             [sg.Button('Exit')]
         ]
         
-        self.window = sg.Window('Arduino LED Controller', layout)
-        
     def get_serial_ports(self):
         return [port.device for port in list_ports.comports()]
         
@@ -46,17 +60,45 @@ class ArduinoController:
         except serial.SerialException as e:
             self.update_output(f"Error sending data: {str(e)}")
             
-    def read_serial(self):
-        while self.is_running:
-            try:
-                if self.serial_port and self.serial_port.in_waiting:
-                    response = self.serial_port.readline().decode().strip()
-                    if response:
-                        self.process_response(response)
-            except serial.SerialException as e:
-                self.update_output(f"Error reading data: {str(e)}")
-                break
-            time.sleep(0.1)
+    def start_reading(self):
+        # The watcher thread wakes up as soon as bytes arrive and posts the
+        # lines as GUI events; all widget updates stay on the GUI thread
+        self.watcher = SerialWatcher(
+            self.serial_port,
+            on_lines=self.on_serial_lines,
+            on_error=lambda e: self.window.write_event_value('-SERIAL-ERROR-', e),
+        ).start()
+
+    def on_serial_lines(self, lines):
+        # Runs on the watcher thread: probe replies are timestamped and
+        # consumed here, everything else goes to the GUI
+        if self.probe:
+            lines = self.probe.on_lines(lines)
+        if lines:
+            self.window.write_event_value('-SERIAL-', lines)
+
+    def start_probe(self, count, in_flight):
+        """Measure command round trips; the results arrive as GUI events"""
+        from latency_probe import LatencyProbe
+        self.probe = LatencyProbe(
+            self.serial_port, count, in_flight,
+            on_update=lambda probe: self.window.write_event_value('-PROBE-', probe.status()),
+            on_done=lambda probe: self.window.write_event_value('-PROBE-DONE-', probe),
+        ).start()
+        self.update_output(f"Latency probe: {count} commands, {in_flight} in flight")
+
+    def finish_probe(self, probe, duration):
+        self.probe = None
+        self.window['-LATENCY-'].update(probe.status())
+        path = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                            f"latency_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+        probe.histogram.save(path)
+        self.update_output(f"Latency histogram saved to {path}")
+        # The probe overwrote the LED duration on the board
+        try:
+            self.send_duration(int(duration))
+        except ValueError:
+            pass
             
     def process_response(self, response):
         # Handle numeric responses (echoed values) separately
@@ -80,22 +122,31 @@ class ArduinoController:
         self.window['-OUTPUT-'].print(f"{time.strftime('%H:%M:%S')}: {message}")
         
     def run(self):
-        self.is_running = True
-        
         while True:
-            event, values = self.window.read(timeout=100)
+            # No timeout: the loop only wakes up for clicks and serial data
+            event, values = self.window.read()
             
             if event in (None, 'Exit'):
                 break
+
+            elif event == '-SERIAL-':
+                for response in values['-SERIAL-']:
+                    self.process_response(response)
+
+            elif event == '-SERIAL-ERROR-':
+                self.update_output(f"Error reading data: {values['-SERIAL-ERROR-']}")
                 
             elif event == 'Connect':
                 port = values['-PORT-']
                 if port:
+                    if self.probe:
+                        self.probe.stop()
+                    if self.watcher:
+                        self.watcher.stop()
+                        self.serial_port.close()
                     if self.connect_serial(port):
                         self.update_output(f"Connected to {port}")
-                        self.read_thread = threading.Thread(target=self.read_serial)
-                        self.read_thread.daemon = True
-                        self.read_thread.start()
+                        self.start_reading()
                 else:
                     self.update_output("Please select a port")
                     
@@ -108,8 +159,28 @@ class ArduinoController:
                         self.update_output("Duration must be positive")
                 except ValueError:
                     self.update_output("Please enter a valid number")
+
+            elif event == 'Probe':
+                if not (self.serial_port and self.serial_port.is_open):
+                    self.update_output("Not connected to Arduino")
+                elif self.probe:
+                    self.update_output("Latency probe already running")
+                else:
+                    try:
+                        self.start_probe(int(values['-PROBE-COUNT-']), int(values['-IN-FLIGHT-']))
+                    except ValueError:
+                        self.update_output("Please enter valid probe settings")
+
+            elif event == '-PROBE-':
+                self.window['-LATENCY-'].update(values['-PROBE-'])
+
+            elif event == '-PROBE-DONE-':
+                self.finish_probe(values['-PROBE-DONE-'], values['-DURATION-'])
                     
-        self.is_running = False
+        if self.probe:
+            self.probe.stop()
+        if self.watcher:
+            self.watcher.stop()
         if self.serial_port:
             self.serial_port.close()
         self.window.close()
@@ -2,53 +2,135 @@
 import tkinter as tk
 from tkinter import ttk
 import threading
+import time
 from pymata4 import pymata4
+import os
 import sys
 
+# Shared helpers live in intro-to-lab-automation-project-requirements-main/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'common'))
+from gui_dispatch import TkDispatcher
+from latency_probe import LatencyHistogram
+from pin_cache import PinStateCache
+from scheduler import Scheduler
+
 class ArduinoGUI:
     def __init__(self, com_port="COM5"):
         self.DEFAULT_LED_TIME = 0.3
         self.BUTTON_PIN = 2
         self.LED_PIN = 4
+        self.GUI_INTERVAL_MS = 20  # Pin changes reach the labels within this
+        self.PULSE_TONE_HZ = 20000  # Board-timed pulses drive the LED with tone(): a 50% square wave
+
+        # LED pulses: host-timed ones are switched off by one scheduler thread
+        # (no thread per press); board-timed ones by the board's tone timer
+        self.scheduler = Scheduler("led-pulse").start()
+        self.pulse_on_board = False
+        self.pulse_lock = threading.Lock()  # led_off_call/pulse_start_ns: callback vs scheduler thread
+        self.led_off_call = None
+        self.pulse_start_ns = None  # Start of the host-timed pulse that owns the LED
+        self.pulse_errors = LatencyHistogram()  # Host-timed: actual minus intended width
+        self.board_pulses = 0
+
+        # Last known pin values, from pymata4's callbacks and our own writes;
+        # the labels change only when a value does, nothing is polled
+        self.pins = PinStateCache(on_change=self.on_pin_change)
+        self.latency = LatencyHistogram()  # Pin change -> label updated
         
         try:
             self.board = pymata4.Pymata4(com_port=com_port)
-            self.setup_board()
         except Exception as e:
             sys.exit(f"Failed to connect to Arduino: {e}")
-            
+
+        # GUI first: the callbacks post to its dispatcher
         self.setup_gui()
-        self.led_timer = None
+        try:
+            self.setup_board()
+        except Exception as e:
+            sys.exit(f"Failed to set up the pins: {e}")
         
     def setup_board(self):
         self.board.set_pin_mode_digital_input(self.BUTTON_PIN, callback=self.button_press_callback)
         self.board.set_pin_mode_digital_output(self.LED_PIN)
         
     def button_press_callback(self, data):
-        if len(data) >= 2:
-            value = data[2] if len(data) > 2 else data[1]
+        # pymata4 passes [pin_type, pin, value, timestamp]
+        value = data[2] if len(data) > 2 else data[1]
+        self.pins.update(self.BUTTON_PIN, value)
         if value == 1:  # Button pressed
             self.add_log_message("Button pressed")
+            if self.pulse_on_board:
+                self.board_pulse()
+            else:
+                self.host_pulse()
+
+    def host_pulse(self):
+        """LED on now and off DEFAULT_LED_TIME later; a press during a pulse extends it"""
+        with self.pulse_lock:
+            if self.led_off_call and self.scheduler.reschedule(self.led_off_call, self.DEFAULT_LED_TIME):
+                return
             self.turn_on_light()
-            
-            # Cancel existing timer if any
-            if self.led_timer:
-                self.led_timer.cancel()
-                
-            # Start new timer
-            self.led_timer = threading.Timer(self.DEFAULT_LED_TIME, self.turn_off_light)
-            self.led_timer.start()
+            start_ns = time.perf_counter_ns()
+            self.pulse_start_ns = start_ns
+            self.led_off_call = self.scheduler.call_later(self.DEFAULT_LED_TIME, self.end_host_pulse, start_ns)
+
+    def end_host_pulse(self, start_ns):
+        """Scheduler thread: LED off, and how far the width was off target"""
+        with self.pulse_lock:
+            if self.pulse_start_ns != start_ns:
+                return  # A newer pulse started after this call fired, it owns the LED
+            self.turn_off_light()
+            width_ns = time.perf_counter_ns() - start_ns
+            target_ns = self.led_off_call.due * 1e9 - start_ns
+            self.pulse_start_ns = None
+        self.pulse_errors.record(width_ns - target_ns)
+        self.dispatcher.post('pulse', self.show_pulse_stats, self.pulse_errors.count)
+
+    def board_pulse(self):
+        """Let the board time the pulse: tone(pin, freq, duration) ends on its own timer"""
+        duration_ms = int(self.DEFAULT_LED_TIME * 1000)
+        try:
+            self.board.play_tone(self.LED_PIN, self.PULSE_TONE_HZ, duration_ms)
+        except Exception as e:
+            self.add_log_message(f"Error starting board pulse: {e}")
+            return
+        self.board_pulses += 1
+        self.add_log_message(f"Board-timed pulse of {duration_ms} ms")
+        # The board does not report the end, show the LED on for the duration
+        self.pins.update(self.LED_PIN, 1)
+        with self.pulse_lock:
+            if not (self.led_off_call and self.scheduler.reschedule(self.led_off_call, self.DEFAULT_LED_TIME)):
+                self.pulse_start_ns = None
+                self.led_off_call = self.scheduler.call_later(self.DEFAULT_LED_TIME, self.pins.update, self.LED_PIN, 0)
+        self.dispatcher.post('pulse', self.show_pulse_stats, self.board_pulses)
+
+    def set_pulse_mode(self):
+        """Tk thread: switch the LED pin between host-timed and board-timed pulses"""
+        self.pulse_on_board = self.board_timed_var.get()
+        try:
+            if self.pulse_on_board:
+                self.board.set_pin_mode_tone(self.LED_PIN)
+            else:
+                self.board.set_pin_mode_digital_output(self.LED_PIN)
+        except Exception as e:
+            self.add_log_message(f"Error switching pulse mode: {e}")
+        self.add_log_message(f"{'Board' if self.pulse_on_board else 'Host'}-timed pulses")
+
+    def write_led(self, value):
+        # We know what we wrote, no need to read the pin back
+        self.board.digital_write(self.LED_PIN, value)
+        self.pins.update(self.LED_PIN, value)
 
     def turn_on_light(self):
         try:
-            self.board.digital_write(self.LED_PIN, 1)
+            self.write_led(1)
             self.add_log_message("LED turned on")
         except Exception as e:
             self.add_log_message(f"Error turning on LED: {e}")
 
     def turn_off_light(self):
         try:
-            self.board.digital_write(self.LED_PIN, 0)
+            self.write_led(0)
             self.add_log_message("LED turned off")
         except Exception as e:
             self.add_log_message(f"Error turning off LED: {e}")
@@ -87,28 +169,51 @@ class ArduinoGUI:
         self.log_text = tk.Text(self.root, height=10, width=50)
         self.log_text.grid(column=0, row=4, columnspan=2, padx=10, pady=10)
 
-        self.update_gui()
+        self.latency_label = ttk.Label(self.root, text="Change to screen: -")
+        self.latency_label.grid(column=0, row=5, columnspan=2, padx=10, pady=(0, 10))
 
-    def add_log_message(self, message):
-        self.log_text.insert(tk.END, f"{message}\n")
-        self.log_text.see(tk.END)
+        # Host-timed vs board-timed pulses, and the host-timed width error
+        self.board_timed_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.root, text="Board-timed pulse", variable=self.board_timed_var,
+                        command=self.set_pulse_mode).grid(column=1, row=1, padx=10, pady=10)
+        self.pulse_label = ttk.Label(self.root, text="Pulse width error: -")
+        self.pulse_label.grid(column=0, row=6, columnspan=2, padx=10, pady=(0, 10))
 
-    def update_gui(self):
-        try:
-            button_state = "Pressed" if self.board.digital_read(self.BUTTON_PIN)[0] == 1 else "Released"
-            led_state = "On" if self.board.digital_read(self.LED_PIN)[0] == 1 else "Off"
-            
-            self.button_state_label.config(text=f"Button State: {button_state}")
-            self.led_state_label.config(text=f"LED State: {led_state}")
-            
-        except Exception as e:
-            self.add_log_message(f"Error updating GUI: {e}")
-            
-        self.root.after(100, self.update_gui)
+        # Messages and pin changes come from pymata4's callback thread and
+        # the LED timer too; the dispatcher applies them from the Tk thread
+        self.dispatcher = TkDispatcher(self.root, interval_ms=self.GUI_INTERVAL_MS).start()
+
+    def add_log_message(self, message):
+        """Safe to call from any thread"""
+        self.dispatcher.log(self.log_text, message)
+
+    def on_pin_change(self, pin, value, t_ns):
+        """Called by the cache in whichever thread saw the change"""
+        self.dispatcher.post(('pin', pin), self.show_pin, pin, value, t_ns)
+
+    def show_pin(self, pin, value, t_ns):
+        """Tk thread: update the pin's label and the change-to-screen latency"""
+        if pin == self.BUTTON_PIN:
+            self.button_state_label.config(text=f"Button State: {'Pressed' if value == 1 else 'Released'}")
+        elif pin == self.LED_PIN:
+            self.led_state_label.config(text=f"LED State: {'On' if value == 1 else 'Off'}")
+        self.latency.record(time.perf_counter_ns() - t_ns)
+        self.latency_label.config(text=f"Change to screen: {self.latency.format()}")
+
+    def pulse_stats(self):
+        host = (f"host-timed width error {self.pulse_errors.format()}" if self.pulse_errors.count
+                else "no host-timed pulses")
+        return f"Pulses: {host}; {self.board_pulses} board-timed (measure those on the scope)"
+
+    def show_pulse_stats(self, count):
+        self.pulse_label.config(text=self.pulse_stats())
 
     def on_closing(self):
-        if self.led_timer:
-            self.led_timer.cancel()
+        self.dispatcher.stop()
+        if self.latency.count:
+            print(f"Change to screen: {self.latency.format()}")
+        print(self.pulse_stats())
+        self.scheduler.stop()
         self.board.shutdown()
         self.root.destroy()
 
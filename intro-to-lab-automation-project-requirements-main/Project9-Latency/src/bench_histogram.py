@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Per-measurement cost of the reaction-time histogram at large sample counts.
+
+  rebuild      the usual approach: append to a list, rewrite the whole CSV
+               (DataFrame.to_csv, or np.savetxt without pandas), ax.clear(),
+               ax.hist() over every sample, full canvas redraw
+  incremental  proj9.py: ReactionHistogram.add (one bin), ReactionLog.append
+               (one line), Rectangle.set_height + draw_artist of that bar
+
+Runs on the Agg backend, so no display or Arduino is needed. The blit to
+the Tk window that proj9.py does after draw_artist is not included.
+
+Usage:
+    python bench_histogram.py [--samples 1000000] [--updates 1000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import numpy as np
+
+from reaction_histogram import ReactionHistogram, ReactionLog
+
+def reaction_times(n, seed=0):
+    """Plausible reaction times: log-normal around 250 ms"""
+    return np.random.default_rng(seed).lognormal(np.log(250), 0.3, n).astype(int)
+
+def bench_rebuild(values, new_values, path):
+    try:
+        import pandas as pd
+        save = lambda data: pd.DataFrame({'reaction_ms': data}).to_csv(path, index=False)
+    except ImportError:
+        save = lambda data: np.savetxt(path, data, fmt='%d', header='reaction_ms', comments='')
+    data = list(values)
+    fig = Figure()
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    h = ReactionHistogram()
+    times = []
+    for value in new_values:
+        start = time.perf_counter()
+        data.append(value)
+        save(data)
+        ax.clear()
+        ax.hist(data, bins=h.edges)
+        canvas.draw()
+        times.append(time.perf_counter() - start)
+    return times
+
+def bench_incremental(values, new_values, path):
+    h = ReactionHistogram()
+    h.add_many(values)
+    log = ReactionLog(path)
+    fig = Figure()
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    bars = ax.bar(h.edges[:-1], h.counts, width=h.bin_width, align='edge')
+    ax.set_ylim(0, h.counts.max() * 1.25)
+    canvas.draw()
+    times = []
+    for value in new_values:
+        start = time.perf_counter()
+        index = h.add(value)
+        log.append(value)
+        bars[index].set_height(h.counts[index])
+        ax.draw_artist(bars[index])
+        times.append(time.perf_counter() - start)
+    log.close()
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', type=int, default=1_000_000, help='measurements already collected')
+    parser.add_argument('--updates', type=int, default=1000, help='new measurements to time')
+    parser.add_argument('--rebuild-updates', type=int, default=3, help='updates for the slow path')
+    args = parser.parse_args()
+
+    values = reaction_times(args.samples)
+    new_values = reaction_times(args.updates, seed=1)
+    out_dir = tempfile.mkdtemp(prefix='bench_histogram_')
+
+    print(f"{args.samples:,} samples already collected")
+    print(f"{'method':>12} {'median ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    for name, bench, updates in (('rebuild', bench_rebuild, new_values[:args.rebuild_updates]),
+                                 ('incremental', bench_incremental, new_values)):
+        times = np.array(bench(values, updates, os.path.join(out_dir, f"{name}.csv"))) * 1e3
+        print(f"{name:>12} {np.median(times):>10.3f} {np.percentile(times, 99):>10.3f} {times.max():>10.3f}")
+
+if __name__ == '__main__':
+    main()
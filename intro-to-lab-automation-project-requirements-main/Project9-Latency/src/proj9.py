@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Project 9: live histogram of reaction times.
+
+Built on the Project 8 ArduinoController (connect, send, event-driven serial
+reading). Every number line the Arduino sends is one reaction time in ms:
+it is counted into a fixed-bin NumPy histogram, appended to
+reaction_times.csv, and only the bar it landed in is redrawn
+(Rectangle.set_height + blit). The cost per measurement does not grow with
+the number of measurements; see bench_histogram.py.
+
+Previous measurements in reaction_times.csv are loaded at startup, so the
+histogram continues across sessions.
+"""
+
+import os
+import sys
+
+import PySimpleGUI as sg
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from reaction_histogram import ReactionHistogram, ReactionLog
+
+# The controller comes from Project 8
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                '..', '..', 'Project8-communication-with-the-computer', 'src'))
+from src import ArduinoController
+
+# ---- Configuration Parameters ----
+LOG_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "reaction_times.csv")
+Y_HEADROOM = 1.25  # Rescale the y axis only when a bar outgrows it
+
+class ReactionTimeGUI(ArduinoController):
+    def __init__(self, log_path=LOG_PATH):
+        self.histogram = ReactionHistogram()
+        self.histogram.add_many(ReactionLog.load_values(log_path))
+        self.log = ReactionLog(log_path)
+        super().__init__('Reaction Time Histogram')
+        self.setup_plot()
+        self.update_stats()
+
+    def build_layout(self):
+        layout = super().build_layout()
+        # Above the Exit button
+        layout.insert(-1, [sg.Text('', key='-STATS-', size=(50, 1))])
+        layout.insert(-1, [sg.Canvas(key='-CANVAS-')])
+        return layout
+
+    def setup_plot(self):
+        self.figure = Figure(figsize=(6, 3.5))
+        self.ax = self.figure.add_subplot()
+        h = self.histogram
+        self.bars = self.ax.bar(h.edges[:-1], h.counts, width=h.bin_width, align='edge',
+                                color='tab:blue', edgecolor='white')
+        self.ax.set_xlim(h.edges[0], h.edges[-1])
+        self.ax.set_xlabel('Reaction time (ms)')
+        self.ax.set_ylabel('Count')
+        self.figure.tight_layout()
+        self.canvas = FigureCanvasTkAgg(self.figure, self.window['-CANVAS-'].TKCanvas)
+        self.canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.rescale()
+
+    def rescale(self):
+        """Full redraw with room above the tallest bar"""
+        self.ax.set_ylim(0, max(int(self.histogram.counts.max() * Y_HEADROOM), 5))
+        self.canvas.draw()
+
+    def process_response(self, response):
+        # Numbers are reaction times; anything else is a status message
+        try:
+            reaction_ms = int(response)
+        except ValueError:
+            super().process_response(response)
+            return
+        self.add_reaction(reaction_ms)
+
+    def add_reaction(self, reaction_ms):
+        index = self.histogram.add(reaction_ms)
+        self.log.append(reaction_ms)
+        bar = self.bars[index]
+        bar.set_height(self.histogram.counts[index])
+        if bar.get_height() > self.ax.get_ylim()[1]:
+            self.rescale()
+        else:
+            # Bars only grow, so drawing the changed one over the last frame
+            # is enough; nothing else needs repainting
+            self.ax.draw_artist(bar)
+            self.canvas.blit(bar.get_window_extent().padded(1))
+        self.update_stats()
+
+    def update_stats(self):
+        h = self.histogram
+        self.window['-STATS-'].update(
+            f"n = {h.count}   mean = {h.mean:.1f} ms   std = {h.std:.1f} ms" if h.count
+            else "Waiting for reaction times...")
+
+    def run(self):
+        try:
+            super().run()
+        finally:
+            self.log.close()
+
+if __name__ == '__main__':
+    ReactionTimeGUI().run()
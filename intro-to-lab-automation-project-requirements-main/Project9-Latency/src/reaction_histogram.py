@@ -0,0 +1,106 @@
+"""
+Reaction-time histogram and log for Project 9, with no GUI code.
+
+ReactionHistogram keeps fixed-width bin counts in a NumPy array, so adding a
+measurement touches one bin (O(1)) however many have been collected, and the
+GUI only has to redraw that one bar. Running count/mean/std are kept with
+Welford's update for the same reason.
+
+ReactionLog appends each measurement to the CSV as it arrives instead of
+rebuilding and rewriting a DataFrame; load it back with pandas:
+
+    df = ReactionLog.load('reaction_times.csv')
+"""
+
+import math
+import os
+import time
+
+import numpy as np
+
+MIN_REACTION_MS = 0
+MAX_REACTION_MS = 1000
+BIN_WIDTH_MS = 10
+
+class ReactionHistogram:
+    def __init__(self, low=MIN_REACTION_MS, high=MAX_REACTION_MS, bin_width=BIN_WIDTH_MS):
+        self.low = low
+        self.bin_width = bin_width
+        self.nbins = int(math.ceil((high - low) / bin_width))
+        self.edges = low + bin_width * np.arange(self.nbins + 1)
+        self.counts = np.zeros(self.nbins, dtype=np.int64)
+        self.count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def bin_index(self, value):
+        """Bin of a value; out-of-range values go to the first/last bin"""
+        return min(max(int((value - self.low) // self.bin_width), 0), self.nbins - 1)
+
+    def add(self, value):
+        """Count one measurement and return the index of the bin it went to"""
+        index = self.bin_index(value)
+        self.counts[index] += 1
+        self.count += 1
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+        return index
+
+    def add_many(self, values):
+        """Vectorized add, e.g. to reload a previous session"""
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return
+        index = np.clip((values - self.low) // self.bin_width, 0, self.nbins - 1).astype(np.intp)
+        self.counts += np.bincount(index, minlength=self.nbins)
+        # Chan et al. parallel combination of the running mean/variance
+        n, mean, m2 = len(values), values.mean(), values.var() * len(values)
+        total = self.count + n
+        delta = mean - self._mean
+        self._m2 += m2 + delta * delta * self.count * n / total
+        self._mean += delta * n / total
+        self.count = total
+
+    @property
+    def mean(self):
+        return self._mean if self.count else float('nan')
+
+    @property
+    def std(self):
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else float('nan')
+
+    def clear(self):
+        self.counts[:] = 0
+        self.count = 0
+        self._mean = self._m2 = 0.0
+
+class ReactionLog:
+    """Appends `timestamp,reaction_ms` rows to a CSV file"""
+
+    HEADER = "timestamp,reaction_ms\n"
+
+    def __init__(self, path):
+        self.path = path
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, 'a', buffering=1)  # Line buffered
+        if new_file:
+            self.file.write(self.HEADER)
+
+    def append(self, reaction_ms):
+        self.file.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')},{reaction_ms}\n")
+
+    def close(self):
+        self.file.close()
+
+    @staticmethod
+    def load(path):
+        import pandas as pd
+        return pd.read_csv(path)
+
+    @staticmethod
+    def load_values(path):
+        """Just the reaction times, without pandas"""
+        if not os.path.exists(path):
+            return np.empty(0)
+        return np.loadtxt(path, delimiter=',', skiprows=1, usecols=1, ndmin=1)
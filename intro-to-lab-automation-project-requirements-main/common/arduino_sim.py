@@ -0,0 +1,412 @@
+"""
+Simulated Arduinos on pseudo terminals, for running the host scripts without
+hardware (Linux/macOS only, needs os.openpty).
+
+Each device owns a pty; host code opens `device.port` with pyserial exactly
+like a real board. One Simulator thread (or child process, so the host's CPU
+numbers stay clean) services any number of devices with select().
+
+ServoMonitorSim   Project 11 src.ino: `millis,angle,buzzer,fan` lines at a
+                  configurable rate, binary frames after `B1`, `S<ms>`
+                  sample interval, `F0`/`F1` fan, `Z0`/`Z1` host buzzer
+                  control (reverts after HOST_TIMEOUT_MS without commands).
+                  With extra_channels=N it sends N more int16 channels
+                  (accel_x/y/z like the current sketch, then ch7, ch8, ...)
+                  and answers `D` with its `#schema` line; without, it is
+                  the older 4-field sketch that ignores `D`
+LedControllerSim  Project 8 sketches: `I received: N` echo for every number
+                  and the state codes 0/1/2 every report interval
+
+    sim = Simulator([ServoMonitorSim(rate=1000)])
+    sim.start()
+    ser = serial.Serial(sim.devices[0].port, 115200)
+    ...
+    sim.stop()
+
+Devices never block on a slow host: output beyond MAX_BACKLOG bytes is
+dropped and counted per sample, like a stalled USB link would lose it.
+
+To test reconnects, give a device a `link` path (a symlink to the current
+pty, which the host opens) and call device.unplug(seconds, reset): the pty
+goes away (reads fail like a pulled cable), and comes back under the same
+link after `seconds`, either still running or freshly reset (millis from 0,
+ASCII mode, like a DTR reset). Thread mode only.
+"""
+
+import math
+import multiprocessing
+import os
+import select
+import struct
+import threading
+import time
+import tty
+
+MAX_BACKLOG = 64 * 1024
+FREE_RUN_BURST = 256  # Samples per millis() tick when free-running
+
+FRAME_SYNC = 0xA5
+HOST_TIMEOUT_MS = 2000  # hostTimeoutMs in src.ino
+EXTRA_CHANNEL_NAMES = ('accel_x', 'accel_y', 'accel_z')  # After fan, as in src.ino's SCHEMA
+
+def _crc8_table(poly=0x07):
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ poly) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table.append(crc)
+    return table
+
+_CRC_TABLE = _crc8_table()
+
+def _crc8(data):
+    """CRC-8 (poly 0x07), same as crc8() in src.ino"""
+    crc = 0
+    for byte in data:
+        crc = _CRC_TABLE[crc ^ byte]
+    return crc
+
+class PtyDevice:
+    """Base class: a pty plus input line splitting and an output backlog"""
+
+    def __init__(self, boot_message=None, link=None):
+        self.link = link  # Stable path for the host, survives unplug/replug
+        self._open_pty()
+        self.boot_message = boot_message
+        self.online = True
+        self.replug_at = None
+        self.unplugs = 0
+        self._unplug = None  # (seconds, reset) requested by unplug()
+        self._replug_reset = False
+        self.start_time = None
+        self._in = bytearray()
+        self._out = bytearray()
+        self.bytes_sent = 0
+        self.messages_sent = 0
+        self.messages_dropped = 0
+
+    def _open_pty(self):
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        os.set_blocking(self.master_fd, False)
+        self.port = os.ttyname(self.slave_fd)
+        if self.link:
+            tmp = f"{self.link}.tmp"
+            os.symlink(self.port, tmp)
+            os.replace(tmp, self.link)
+            self.port = self.link
+
+    def unplug(self, seconds, reset=False):
+        """Disconnect for `seconds` (from any thread; done by the Simulator loop)"""
+        self._unplug = (seconds, reset)
+
+    def check_plug(self, now):
+        """Simulator loop: carry out unplug() and plug back in when it is time"""
+        if self._unplug and self.online:
+            seconds, self._replug_reset = self._unplug
+            self._unplug = None
+            self.close()
+            self.online = False
+            self.replug_at = now + seconds
+            self.unplugs += 1
+            self._in.clear()
+            self._out.clear()
+        elif not self.online and now >= self.replug_at:
+            self._open_pty()
+            self.online = True
+            self.replug_at = None
+            self.replugged(now, self._replug_reset)
+
+    def replugged(self, now, reset):
+        if reset:
+            self.begin(now)
+
+    def millis(self):
+        return int((time.monotonic() - self.start_time) * 1000)
+
+    def begin(self, now):
+        self.start_time = now
+        if self.boot_message:
+            self.send(f"{self.boot_message}\r\n".encode())
+
+    def send(self, data, count=1):
+        """Queue `count` messages; dropped (and counted) if the host is not reading"""
+        if len(self._out) > MAX_BACKLOG:
+            self.messages_dropped += count
+            return False
+        self._out += data
+        self.messages_sent += count
+        return True
+
+    @property
+    def has_output(self):
+        return bool(self._out)
+
+    def flush(self):
+        try:
+            written = os.write(self.master_fd, self._out)
+        except BlockingIOError:
+            return
+        except OSError:
+            self._out.clear()  # Host side closed
+            return
+        del self._out[:written]
+        self.bytes_sent += written
+
+    def receive(self, now):
+        try:
+            data = os.read(self.master_fd, 4096)
+        except (BlockingIOError, OSError):
+            return
+        self._in += data
+        while True:
+            end = self._in.find(b'\n')
+            if end == -1:
+                break
+            line = bytes(self._in[:end]).strip()
+            del self._in[:end + 1]
+            if line:
+                self.on_line(line.decode('ascii', errors='replace'), now)
+
+    def on_line(self, line, now):
+        pass
+
+    def tick(self, now):
+        """Produce due output; return the time of the next event (or None)"""
+        return None
+
+    def stats(self):
+        return {
+            'port': self.port,
+            'messages_sent': self.messages_sent,
+            'messages_dropped': self.messages_dropped,
+            'bytes_sent': self.bytes_sent,
+            'start_time': self.start_time,
+        }
+
+    def close(self):
+        for fd in (self.master_fd, self.slave_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        if self.link and os.path.islink(self.link):
+            os.unlink(self.link)
+
+class ServoMonitorSim(PtyDevice):
+    """Project 11 sketch: accelerometer angle, buzzer and fan"""
+
+    def __init__(self, rate=10.0, binary=False, lock_rate=False, boot_message=None, link=None,
+                 extra_channels=0):
+        super().__init__(boot_message, link)
+        self.extra_channels = extra_channels
+        names = [EXTRA_CHANNEL_NAMES[i] if i < len(EXTRA_CHANNEL_NAMES) else f"ch{i + 5}"
+                 for i in range(extra_channels)]
+        self.schema = "t_ms:u4,angle:i2,buzzer:u1,fan:u1" + "".join(f",{name}:i2" for name in names)
+        self._frame_format = '<IhBB' + 'h' * extra_channels
+        self.period = 1.0 / rate if rate else 0.0  # 0: as fast as the host reads
+        self.lock_rate = lock_rate  # Ignore S<ms>, e.g. for throughput runs
+        self.binary = binary
+        self._boot_state = (self.period, binary)
+        self.fan_button = False
+        self.host_control = False
+        self.host_buzzer = 0
+        self.last_command_ms = 0
+        self.samples_sent = 0
+        self.samples_dropped = 0
+        self._next_sample = 0.0
+
+    def begin(self, now):
+        super().begin(now)
+        self._next_sample = now
+
+    def replugged(self, now, reset):
+        if reset:
+            self.period, self.binary = self._boot_state
+            self.host_control = False
+            self.fan_button = False
+        else:
+            self._next_sample = now  # Nothing was sent while unplugged
+        super().replugged(now, reset)
+
+    def on_line(self, line, now):
+        self.last_command_ms = self.millis()
+        if line[0] == 'Z':
+            self.host_control = True
+            self.host_buzzer = 1 if line[1:2] == '1' else 0
+        elif line[0] == 'H':
+            self.host_control = line[1:2] == '1'
+        elif line[0] == 'B':
+            self.binary = line[1:2] == '1'
+            self.send(b"BIN OK\r\n" if self.binary else b"ASCII OK\r\n")
+        elif line[0] == 'S' and line[1:].isdigit() and not self.lock_rate:
+            self.period = max(int(line[1:]), 5) / 1000  # Same floor as src.ino
+        elif line[0] == 'F':
+            self.fan_button = line[1:2] == '1'
+        elif line[0] == 'D' and self.extra_channels:
+            self.send(f"#schema {self.schema}\r\n".encode())
+
+    def sample(self, t_ms):
+        angle = int(45 + 80 * math.sin(t_ms / 1000.0))
+        if self.host_control and t_ms - self.last_command_ms > HOST_TIMEOUT_MS:
+            self.host_control = False
+        if self.host_control:
+            buzzer = self.host_buzzer
+        else:
+            buzzer = 1 if angle > 90 or angle < 10 else 0
+        fan = 1 if self.fan_button and not buzzer else 0
+        # Milli-g style readings, one phase per extra channel
+        extra = [int(1000 * math.sin(t_ms / 1000.0 + i)) for i in range(self.extra_channels)]
+        return (angle, buzzer, fan, *extra)
+
+    def encode(self, t_ms, angle, buzzer, fan, *extra):
+        if self.binary and self.extra_channels:
+            payload = struct.pack(self._frame_format, t_ms & 0xFFFFFFFF, angle, buzzer, fan, *extra)
+            return bytes([FRAME_SYNC]) + payload + bytes([_crc8(payload)])
+        if self.binary:
+            payload = struct.pack('<IhB', t_ms & 0xFFFFFFFF, angle, buzzer | fan << 1)
+            return bytes([FRAME_SYNC]) + payload + bytes([_crc8(payload)])
+        if extra:
+            return (",".join(map(str, (t_ms, angle, buzzer, fan, *extra))) + "\r\n").encode()
+        return f"{t_ms},{angle},{buzzer},{fan}\r\n".encode()
+
+    def send_sample(self, t_ms, count=1):
+        if self.send(self.encode(t_ms, *self.sample(t_ms)) * count, count):
+            self.samples_sent += count
+        else:
+            self.samples_dropped += count
+
+    def tick(self, now):
+        if self.period == 0.0:
+            # Free-running: keep the pty topped up, many samples per millisecond
+            while len(self._out) < MAX_BACKLOG // 2:
+                self.send_sample(self.millis(), FREE_RUN_BURST)
+            return now + 0.001
+        burst = 0
+        while self._next_sample <= now and burst < 1000:
+            self.send_sample(round((self._next_sample - self.start_time) * 1000))
+            self._next_sample += self.period
+            burst += 1
+        if self._next_sample <= now:
+            self._next_sample = now  # Too far behind: skip instead of bursting
+        return self._next_sample
+
+    def stats(self):
+        stats = super().stats()
+        stats.update(samples_sent=self.samples_sent, samples_dropped=self.samples_dropped)
+        return stats
+
+class LedControllerSim(PtyDevice):
+    """Project 8 sketches: number in, `I received: N` out, state codes 0/1/2"""
+
+    def __init__(self, report_interval=0.1, boot_message=None):
+        super().__init__(boot_message)
+        self.report_interval = report_interval  # None: echo only (src.ino)
+        self.duration_ms = 1000
+        self.led_until = 0.0
+        self.button_until = 0.0
+        self._next_report = 0.0
+
+    def begin(self, now):
+        super().begin(now)
+        self._next_report = now
+
+    def on_line(self, line, now):
+        if line.lstrip('-').isdigit():
+            self.duration_ms = int(line)
+            self.send(f"I received: {self.duration_ms}\r\n".encode())
+
+    def press_button(self, hold=0.05):
+        """Simulate a button press that lights the LED for duration_ms"""
+        now = time.monotonic()
+        self.button_until = now + hold
+        self.led_until = now + (self.duration_ms + 1) / 1000
+
+    def state(self, now):
+        if now >= self.led_until:
+            return b'0'
+        return b'1' if now < self.button_until else b'2'
+
+    def tick(self, now):
+        if self.report_interval is None:
+            return None
+        if self.report_interval == 0:
+            while len(self._out) < MAX_BACKLOG // 2:
+                self.send((self.state(now) + b'\r\n') * FREE_RUN_BURST, FREE_RUN_BURST)
+            return now + 0.001
+        if now >= self._next_report:
+            self.send(self.state(now) + b'\r\n')
+            self._next_report = max(self._next_report + self.report_interval, now)
+        return self._next_report
+
+class Simulator:
+    """Runs the devices' event loop in a thread, or in a child process"""
+
+    def __init__(self, devices):
+        self.devices = list(devices)
+        self._stop = None
+        self._worker = None
+        self._results = None
+
+    def start(self, process=False):
+        if process:
+            self._stop = multiprocessing.Event()
+            self._results = multiprocessing.Queue()
+            self._worker = multiprocessing.Process(target=self._run_child, daemon=True)
+        else:
+            self._stop = threading.Event()
+            self._worker = threading.Thread(target=self.run, name="arduino-sim", daemon=True)
+        self._worker.start()
+        return self
+
+    def stop(self):
+        """Stop the loop and return the per-device stats"""
+        self._stop.set()
+        if self._results is not None:
+            stats = self._results.get()
+            self._worker.join()
+        else:
+            self._worker.join()
+            stats = [device.stats() for device in self.devices]
+        return stats
+
+    def close(self):
+        for device in self.devices:
+            device.close()
+
+    def __enter__(self):
+        return self if self._worker else self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        self.close()
+
+    def _run_child(self):
+        self.run()
+        self._results.put([device.stats() for device in self.devices])
+
+    def run(self):
+        now = time.monotonic()
+        for device in self.devices:
+            device.begin(now)
+
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for device in self.devices:
+                device.check_plug(now)
+            online = [device for device in self.devices if device.online]
+            by_fd = {device.master_fd: device for device in online}
+            deadlines = [d for d in (device.tick(now) for device in online) if d is not None]
+            deadlines += [device.replug_at for device in self.devices if not device.online]
+            timeout = min(max(0.0, min(deadlines, default=now + 0.05) - time.monotonic()), 0.05)
+            writers = [device.master_fd for device in online if device.has_output]
+            readable, writable, _ = select.select(list(by_fd), writers, [], timeout)
+            now = time.monotonic()
+            for fd in readable:
+                by_fd[fd].receive(now)
+            for fd in writable:
+                by_fd[fd].flush()
+        for device in self.devices:
+            if device.online:
+                device.flush()  # Hand over what the boards already sent
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark: per-line readline() readers vs. LineReader.
+
+A simulated Project 11 board (arduino_sim.ServoMonitorSim) writes
+`millis,angle,buzzer,fan` lines as fast as the reader takes them, so the
+numbers show how many lines per second each reader can parse. Linux/macOS
+only (needs os.openpty). bench_suite.py covers the full host readers.
+
+Readers:
+  readline   ser.readline() + split + int() per line (Project 11 before)
+  readline+sleep  in_waiting check, readline(), time.sleep(0.1) (Project 8)
+  bulk       LineReader.read_block() + parse_int_lines()
+
+Usage:
+    python bench_line_reader.py [--seconds 3]
+"""
+
+import argparse
+import time
+
+import serial
+
+from arduino_sim import ServoMonitorSim, Simulator
+from line_reader import LineReader, parse_int_lines
+
+def read_readline(ser, deadline):
+    lines = 0
+    while time.perf_counter() < deadline:
+        line = ser.readline().decode('utf-8').strip()
+        if line:
+            parts = line.split(',')
+            if len(parts) == 4:
+                [int(p) for p in parts]
+                lines += 1
+    return lines
+
+def read_readline_sleep(ser, deadline):
+    lines = 0
+    while time.perf_counter() < deadline:
+        if ser.in_waiting:
+            line = ser.readline().decode('utf-8').strip()
+            if line:
+                lines += 1
+        time.sleep(0.1)
+    return lines
+
+def read_bulk(ser, deadline):
+    reader = LineReader(ser)
+    lines = 0
+    while time.perf_counter() < deadline:
+        block = reader.read_block()
+        if block:
+            values, _ = parse_int_lines(block, 4)
+            lines += len(values)
+    return lines
+
+READERS = {
+    'readline': read_readline,
+    'readline+sleep': read_readline_sleep,
+    'bulk': read_bulk,
+}
+
+def run(name, seconds):
+    with Simulator([ServoMonitorSim(rate=0)]).start(process=True) as sim:
+        ser = serial.Serial(sim.devices[0].port, 115200, timeout=0.1)
+        try:
+            start = time.perf_counter()
+            lines = READERS[name](ser, start + seconds)
+            elapsed = time.perf_counter() - start
+        finally:
+            ser.close()
+    return lines / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=3.0, help='duration per reader')
+    args = parser.parse_args()
+
+    print(f"{'reader':>16} {'lines/s':>12}")
+    for name in READERS:
+        print(f"{name:>16} {run(name, args.seconds):>12,.0f}")
+
+if __name__ == '__main__':
+    main()
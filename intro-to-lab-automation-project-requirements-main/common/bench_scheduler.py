@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Firing jitter of threading.Timer (one thread per event) against Scheduler
+(one heap-driven thread), for the LED-off timer of the Firmata GUI.
+
+Events are started at --rate per second, each due --delay seconds later,
+like button presses each scheduling turn_off_light. Reported: how late the
+callbacks ran (p50/p99/max), and the most threads alive at once. With
+--load a pure-Python busy thread competes for the GIL, as a GUI redraw
+would. No board needed.
+
+Usage:
+    python bench_scheduler.py [--events 2000] [--rate 200] [--delay 0.03] [--load]
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from scheduler import Scheduler
+
+def busy(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+def run(kind, events, rate, delay):
+    late = []
+    done = threading.Event()
+    peak_threads = threading.active_count()
+
+    def fire(due):
+        late.append(time.perf_counter() - due)
+        if len(late) == events:
+            done.set()
+
+    scheduler = Scheduler().start() if kind == 'scheduler' else None
+    for i in range(events):
+        due = time.perf_counter() + delay
+        if scheduler:
+            scheduler.call_later(delay, fire, due)
+        else:
+            threading.Timer(delay, fire, (due,)).start()
+        peak_threads = max(peak_threads, threading.active_count())
+        time.sleep(1.0 / rate)
+    done.wait(delay + 5)
+    if scheduler:
+        scheduler.stop()
+    return np.array(late) * 1e3, peak_threads
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=2000)
+    parser.add_argument('--rate', type=float, default=200.0, help='events started per second')
+    parser.add_argument('--delay', type=float, default=0.03, help='seconds until each event is due')
+    parser.add_argument('--load', action='store_true', help='run a busy Python thread meanwhile')
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    if args.load:
+        threading.Thread(target=busy, args=(stop,), daemon=True).start()
+    print(f"{'method':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'threads':>8}")
+    for kind in ('timer', 'scheduler'):
+        late, threads = run(kind, args.events, args.rate, args.delay)
+        print(f"{kind:>10} {np.median(late):>8.3f} {np.percentile(late, 99):>8.3f} "
+              f"{late.max():>8.3f} {threads:>8}")
+    stop.set()
+
+if __name__ == '__main__':
+    main()
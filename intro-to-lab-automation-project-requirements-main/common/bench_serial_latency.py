@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Round-trip latency of the Project 8 host loop: polling vs. event-driven.
+
+A simulated Project 8 sketch (arduino_sim.LedControllerSim) answers every
+`<duration>\\n` command with `I received: <duration>`. For each command we
+measure the time from write() until the reply reaches the "GUI loop":
+
+  polling   reader thread: in_waiting + readline() + sleep(0.1) into a queue;
+            GUI loop: window.read(timeout=100), then drain the queue
+  events    SerialWatcher posts the lines (window.write_event_value);
+            GUI loop blocks until the event arrives
+
+PySimpleGUI is not needed, its event queue is modelled with queue.Queue.
+Linux/macOS only (needs os.openpty).
+
+Usage:
+    python bench_serial_latency.py [--trials 30]
+"""
+
+import argparse
+import queue
+import statistics
+import threading
+import time
+
+import serial
+
+from arduino_sim import LedControllerSim, Simulator
+from serial_events import SerialWatcher
+
+def polling_pipeline(ser, stop):
+    """The old reader thread + timeout-polled GUI loop"""
+    serial_queue = queue.Queue()
+
+    def read_serial():
+        while not stop.is_set():
+            if ser.in_waiting:
+                line = ser.readline().decode('utf-8').strip()
+                if line:
+                    serial_queue.put(line)
+            time.sleep(0.1)
+
+    threading.Thread(target=read_serial, daemon=True).start()
+
+    def wait_for_reply(expected):
+        while True:
+            time.sleep(0.1)  # window.read(timeout=100) with no GUI events
+            while not serial_queue.empty():
+                if serial_queue.get() == expected:
+                    return
+
+    return wait_for_reply, lambda: None
+
+def event_pipeline(ser, stop):
+    """SerialWatcher posting events to a blocking GUI loop"""
+    events = queue.Queue()
+    watcher = SerialWatcher(ser, on_lines=events.put).start()
+
+    def wait_for_reply(expected):
+        while True:
+            if expected in events.get():
+                return
+
+    return wait_for_reply, watcher.stop
+
+PIPELINES = {
+    'polling': polling_pipeline,
+    'events': event_pipeline,
+}
+
+def run(name, trials):
+    sim = Simulator([LedControllerSim(report_interval=None)]).start()
+    ser = serial.Serial(sim.devices[0].port, 9600, timeout=1)
+    stop = threading.Event()
+    wait_for_reply, close = PIPELINES[name](ser, stop)
+
+    latencies = []
+    try:
+        for i in range(trials):
+            duration = 100 + i
+            start = time.perf_counter()
+            ser.write(f"{duration}\n".encode())
+            wait_for_reply(f"I received: {duration}")
+            latencies.append((time.perf_counter() - start) * 1e3)
+    finally:
+        stop.set()
+        close()
+        ser.close()
+        sim.stop()
+        sim.close()
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--trials', type=int, default=30, help='round trips per pipeline')
+    args = parser.parse_args()
+
+    print(f"{'pipeline':>10} {'median ms':>10} {'max ms':>10}")
+    for name in PIPELINES:
+        latencies = run(name, args.trials)
+        print(f"{name:>10} {statistics.median(latencies):>10.2f} {max(latencies):>10.2f}")
+
+if __name__ == '__main__':
+    main()
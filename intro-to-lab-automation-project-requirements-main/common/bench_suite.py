@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of every host reader against simulated Arduinos.
+
+The boards are arduino_sim devices running in a child process, so the CPU
+time measured here belongs to the host reader alone. For each reader:
+
+  max samples/s   the simulator free-runs (no rate limit) and we count what
+                  the reader parses per second
+  CPU us/sample   host process CPU time (user + system) per parsed sample
+  latency         at a fixed rate (--rate), arrival time minus the time the
+                  board stamped the sample (millis, so ~1 ms resolution);
+                  for Project 8 the `<duration>` -> `I received:` round trip
+  lost            samples/lines sent but never parsed (dropped by a full
+                  link, malformed, or still queued when the run ended)
+
+Readers:
+  p11-readline    Project 11 before: readline() + split + int() per line
+  p11-csv         SerialAcquisition in CSV mode (LineReader + parse_int_lines)
+  p11-binary      SerialAcquisition with binary frames (FrameParser)
+  p8-polling      Project 8 before: in_waiting + readline() + sleep(0.1)
+  p8-watcher      SerialWatcher (Project 8 scripts)
+
+Usage:
+    python bench_suite.py [--seconds 3] [--rate 1000] [--only p11-csv p8-watcher]
+                          [--json results.json]
+
+Compare two --json files from before/after a change to catch regressions.
+Linux/macOS only (needs os.openpty). Each SerialAcquisition run waits for the
+first valid sample (SerialAcquisition.connect) before measuring.
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import threading
+import time
+
+import numpy as np
+import serial
+
+from arduino_sim import LedControllerSim, ServoMonitorSim, Simulator
+from serial_events import SerialWatcher
+
+# The Project 11 host code lives in its own folder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                '..', 'Project11-Final_Project', 'src'))
+from acquisition import SerialAcquisition, BAUD_RATE
+
+DRAIN_TIME = 0.5  # Let the reader catch up after the board stops
+
+def cpu_time():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if len(values) else float('nan')
+
+# ---- Project 11 readers: open(port, record) -> (poll, close) ----
+
+def p11_readline(port, record):
+    ser = serial.Serial(port, BAUD_RATE, timeout=0.1)
+
+    def poll():
+        line = ser.readline().decode('utf-8', errors='replace').strip()
+        if line:
+            data = line.split(',')
+            if len(data) == 4:
+                try:
+                    t_ms, angle, buzzer, fan = (int(x) for x in data)
+                    record([t_ms])
+                except ValueError:
+                    pass
+
+    return poll, ser.close
+
+def p11_acquisition(port, record, binary):
+    acquisition = SerialAcquisition(port, lambda batch: record(batch['t_ms']), binary=binary)
+    acquisition.connect()
+
+    def poll():
+        acquisition._emit(acquisition.read_batch())
+
+    return poll, acquisition.ser.close
+
+class Recorder:
+    """Collects (arrival time, board timestamps) from a reader thread"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, t_ms):
+        self.batches.append((time.monotonic(), np.asarray(t_ms, dtype=np.float64)))
+
+    def count(self, until=None):
+        return sum(len(t) for arrival, t in self.batches if until is None or arrival < until)
+
+    def latencies_ms(self, board_start, since):
+        """Latency of the samples the board took after `since`"""
+        latencies = [(arrival - board_start) * 1e3 - t_ms for arrival, t_ms in self.batches]
+        if not latencies:
+            return np.empty(0)
+        board_ms = np.concatenate([t_ms for _, t_ms in self.batches])
+        return np.concatenate(latencies)[board_ms >= (since - board_start) * 1e3]
+
+def run_p11(open_reader, rate, seconds):
+    """Run one reader against one board; rate 0 lets the board free-run"""
+    device = ServoMonitorSim(rate=rate, lock_rate=True)
+    sim = Simulator([device]).start(process=True)
+    recorder = Recorder()
+    poll, close = open_reader(device.port, recorder)  # Includes any reset wait / negotiation
+    stop = threading.Event()
+
+    def loop():
+        while not stop.is_set():
+            poll()
+
+    try:
+        thread = threading.Thread(target=loop, daemon=True)
+        cpu_start, start = cpu_time(), time.monotonic()
+        thread.start()
+        time.sleep(seconds)
+        end, cpu = time.monotonic(), cpu_time() - cpu_start
+        board = sim.stop()[0]
+        time.sleep(DRAIN_TIME)
+        stop.set()
+        thread.join()
+    finally:
+        close()
+        sim.close()
+    return {'recorder': recorder, 'board': board, 'start': start, 'end': end, 'cpu': cpu}
+
+def bench_p11(name, open_reader, rate, seconds):
+    run = run_p11(open_reader, 0, seconds)
+    parsed = run['recorder'].count(run['end'])
+    result = {
+        'reader': name,
+        'max_samples_per_s': parsed / (run['end'] - run['start']),
+        'cpu_us_per_sample': run['cpu'] / parsed * 1e6 if parsed else float('nan'),
+    }
+
+    run = run_p11(open_reader, rate, seconds)
+    recorder, board = run['recorder'], run['board']
+    latencies = recorder.latencies_ms(board['start_time'], run['start'])
+    # Samples the board sent before the first one we parsed went to the
+    # reset wait / protocol negotiation, not to the reader under test
+    first_t_ms = recorder.batches[0][1].min() if recorder.batches else 0
+    sent = board['samples_sent'] + board['samples_dropped'] - round(first_t_ms * rate / 1000)
+    result.update(
+        latency_p50_ms=percentile(latencies, 50),
+        latency_p99_ms=percentile(latencies, 99),
+        latency_max_ms=float(latencies.max()) if len(latencies) else float('nan'),
+        sent=sent,
+        lost=max(sent - recorder.count(), 0),
+    )
+    return result
+
+# ---- Project 8 readers: start(ser, on_line) -> stop ----
+
+def p8_polling(ser, on_line):
+    stop = threading.Event()
+
+    def read_serial():
+        while not stop.is_set():
+            if ser.in_waiting:
+                line = ser.readline().decode('utf-8').strip()
+                if line:
+                    on_line(line)
+            time.sleep(0.1)
+
+    threading.Thread(target=read_serial, daemon=True).start()
+    return stop.set
+
+def p8_watcher(ser, on_line):
+    def on_lines(lines):
+        for line in lines:
+            on_line(line)
+    return SerialWatcher(ser, on_lines=on_lines).start().stop
+
+def run_p8(start_reader, report_interval, seconds, trials=0):
+    device = LedControllerSim(report_interval=report_interval)
+    sim = Simulator([device]).start(process=True)
+    ser = serial.Serial(device.port, 9600, timeout=1)
+    received = []
+    replies = {}
+
+    def on_line(line):
+        if line.startswith('I received:'):
+            replies[line] = time.perf_counter()
+        elif line in ('0', '1', '2'):
+            received.append(time.monotonic())
+
+    stop_reader = start_reader(ser, on_line)
+    latencies = []
+    try:
+        cpu_start, start = cpu_time(), time.monotonic()
+        for i in range(trials):
+            expected = f"I received: {100 + i}"
+            sent_at = time.perf_counter()
+            ser.write(f"{100 + i}\n".encode())
+            while expected not in replies and time.perf_counter() - sent_at < 5:
+                time.sleep(0.0005)
+            if expected in replies:
+                latencies.append((replies[expected] - sent_at) * 1e3)
+        time.sleep(max(seconds - (time.monotonic() - start), 0))
+        end, cpu = time.monotonic(), cpu_time() - cpu_start
+        stats = sim.stop()[0]
+        time.sleep(DRAIN_TIME)
+    finally:
+        stop_reader()
+        ser.close()
+        sim.close()
+    states_sent = stats['messages_sent'] + stats['messages_dropped'] - trials
+    in_window = sum(1 for t in received if t < end)
+    return in_window, len(received), states_sent, latencies, cpu, end - start
+
+def bench_p8(name, start_reader, rate, seconds, trials):
+    parsed, _, _, _, cpu, elapsed = run_p8(start_reader, 0, seconds)
+    result = {
+        'reader': name,
+        'max_samples_per_s': parsed / elapsed,
+        'cpu_us_per_sample': cpu / parsed * 1e6 if parsed else float('nan'),
+    }
+    _, received, sent, latencies, _, _ = run_p8(start_reader, 1.0 / rate, seconds, trials)
+    result.update(
+        latency_p50_ms=percentile(latencies, 50),
+        latency_p99_ms=percentile(latencies, 99),
+        latency_max_ms=max(latencies, default=float('nan')),
+        sent=sent,
+        lost=max(sent - received, 0) + trials - len(latencies),
+    )
+    return result
+
+BENCHMARKS = {
+    'p11-readline': lambda a: bench_p11('p11-readline', p11_readline, a.rate, a.seconds),
+    'p11-csv': lambda a: bench_p11('p11-csv', lambda port, record: p11_acquisition(port, record, False),
+                                   a.rate, a.seconds),
+    'p11-binary': lambda a: bench_p11('p11-binary', lambda port, record: p11_acquisition(port, record, True),
+                                      a.rate, a.seconds),
+    'p8-polling': lambda a: bench_p8('p8-polling', p8_polling, a.p8_rate, a.seconds, a.trials),
+    'p8-watcher': lambda a: bench_p8('p8-watcher', p8_watcher, a.p8_rate, a.seconds, a.trials),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=3.0, help='duration of each run')
+    parser.add_argument('--rate', type=float, default=1000, help='Project 11 samples/s for the latency run')
+    parser.add_argument('--p8-rate', type=float, default=10, help='Project 8 state reports/s (sketch: 10)')
+    parser.add_argument('--trials', type=int, default=20, help='Project 8 command round trips')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help='run only these readers')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'reader':>13} {'max/s':>10} {'CPU us':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'sent':>7} {'lost':>6}")
+    for name in args.only or BENCHMARKS:
+        r = BENCHMARKS[name](args)
+        results.append(r)
+        print(f"{name:>13} {r['max_samples_per_s']:>10,.0f} {r['cpu_us_per_sample']:>8.2f} "
+              f"{r['latency_p50_ms']:>8.2f} {r['latency_p99_ms']:>8.2f} {r['latency_max_ms']:>8.2f} "
+              f"{r['sent']:>7} {r['lost']:>6}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Thread-safe, coalescing hand-off of GUI updates to the Tk main loop.
+
+Tk widgets may only be touched from the thread running mainloop(), and
+calling root.after() from a reader thread for every sample both breaks that
+rule and floods Tk's event queue when data comes in fast. With a
+TkDispatcher, worker threads only post to it (lock-protected, no Tk calls)
+and the Tk thread drains everything on one timer:
+
+    dispatcher = TkDispatcher(root).start()        # in the Tk thread
+    dispatcher.post('buzzer', update_led, state)   # from any thread
+    dispatcher.log(log_text, "Button pressed")     # from any thread
+
+post() keeps only the latest call per key, and the drain skips it when the
+arguments equal those of the last call it ran, so an LED posted 1000 times
+a second with the same state costs nothing. log() collects lines per Text
+widget; each drain inserts them with a single insert() and see(). Either
+way a drain does at most one call per key and one insert per widget, so
+widget updates per second are bounded by 1000 / interval_ms however fast
+the workers post.
+"""
+
+import collections
+import threading
+
+DRAIN_INTERVAL_MS = 50   # 20 drains per second
+MAX_PENDING_LINES = 1000 # Per widget and drain; older lines beyond this are dropped
+MAX_TEXT_LINES = 5000    # Lines kept in a Text widget, so inserts stay cheap
+
+class TkDispatcher:
+    def __init__(self, root, interval_ms=DRAIN_INTERVAL_MS, max_text_lines=MAX_TEXT_LINES):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.max_text_lines = max_text_lines
+        self._lock = threading.Lock()
+        self._calls = {}    # key -> (fn, args), latest post wins
+        self._lines = {}    # Text widget -> deque of lines
+        self._dropped = {}  # Text widget -> lines dropped since the last drain
+        self._applied = {}  # key -> args of the last call that ran
+        self._after_id = None
+        self.posted = 0
+        self.applied = 0
+        self.logged = 0
+        self.inserts = 0
+
+    def start(self):
+        """Start draining; call from the Tk thread"""
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._drain)
+        return self
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass  # Window already destroyed
+            self._after_id = None
+
+    def post(self, key, fn, *args):
+        """Run fn(*args) on the Tk thread; only the latest post per key runs"""
+        with self._lock:
+            self._calls[key] = (fn, args)
+            self.posted += 1
+
+    def log(self, widget, message):
+        """Append a line to a Text widget on the Tk thread"""
+        with self._lock:
+            lines = self._lines.get(widget)
+            if lines is None:
+                lines = self._lines[widget] = collections.deque(maxlen=MAX_PENDING_LINES)
+            elif len(lines) == MAX_PENDING_LINES:
+                self._dropped[widget] = self._dropped.get(widget, 0) + 1
+            lines.append(message)
+
+    def _drain(self):
+        with self._lock:
+            calls, self._calls = self._calls, {}
+            lines, self._lines = self._lines, {}
+            dropped, self._dropped = self._dropped, {}
+        try:
+            for key, (fn, args) in calls.items():
+                if self._applied.get(key) == args:
+                    continue  # Same state as on screen
+                self._applied[key] = args
+                fn(*args)
+                self.applied += 1
+            for widget, widget_lines in lines.items():
+                if widget in dropped:
+                    widget_lines = [f"... {dropped[widget]} lines dropped", *widget_lines]
+                self._insert(widget, widget_lines)
+        except Exception as e:
+            print(f"Error updating GUI: {e}")
+        try:
+            self._after_id = self.root.after(self.interval_ms, self._drain)
+        except Exception:
+            self._after_id = None  # Window destroyed
+
+    def _insert(self, widget, lines):
+        widget.insert('end', "".join(f"{line}\n" for line in lines))
+        if self.max_text_lines:
+            excess = int(widget.index('end-1c').split('.')[0]) - 1 - self.max_text_lines
+            if excess > 0:
+                widget.delete('1.0', f"{excess + 1}.0")
+        widget.see('end')
+        self.logged += len(lines)
+        self.inserts += 1
+
+    def stats(self):
+        return {'posted': self.posted,
+                'applied': self.applied,
+                'logged': self.logged,
+                'inserts': self.inserts}
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Round-trip latency probe for the Project 8 sketches.
+
+Both sketches answer a number N with `I received: N`, so the probe sends
+sequence numbers as commands and matches the echoes: send and receive are
+timestamped with time.perf_counter_ns(), and up to `in_flight` commands are
+outstanding at once. Latencies go into a LatencyHistogram (HDR-style
+log-linear buckets, <1% error, O(1) per record) that can be shown live and
+saved to disk.
+
+Note that the probe overwrites the LED duration on the board; the GUIs
+send the user's duration again when it finishes. Replies that take about
+1 s usually mean the sketch sat in its Serial timeout (readStringUntil /
+parseInt) waiting for the end of a command.
+
+In the GUIs (src/src.py, ptoj8/proj8.py) use the Probe button. From the
+command line, e.g. to track regressions:
+
+    python latency_probe.py --port /dev/ttyACM0 --count 1000 --in-flight 4
+    python latency_probe.py --sim --out sim.csv     # against arduino_sim
+    python latency_probe.py --show old.csv new.csv  # compare saved runs
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+SUB_BUCKET_BITS = 7   # 128 linear sub-buckets per power of two
+MAX_VALUE_BITS = 40   # ~18 minutes in ns
+PROBE_TIMEOUT = 2.0   # Seconds before an unanswered command counts as lost
+UPDATE_INTERVAL = 0.2
+
+class LatencyHistogram:
+    """Log-linear histogram of nanosecond values"""
+
+    def __init__(self):
+        size = (MAX_VALUE_BITS - SUB_BUCKET_BITS + 1) << SUB_BUCKET_BITS
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.count = 0
+        self.max = 0
+
+    @staticmethod
+    def bucket(value):
+        value = max(int(value), 0)
+        exp = value.bit_length() - 1
+        if exp < SUB_BUCKET_BITS:
+            return value
+        shift = exp - SUB_BUCKET_BITS
+        return (shift << SUB_BUCKET_BITS) + (value >> shift)
+
+    @staticmethod
+    def bounds(index):
+        """[lower, upper) of the values in bucket `index`"""
+        index = np.asarray(index, dtype=np.int64)
+        shift = np.maximum((index >> SUB_BUCKET_BITS) - 1, 0)
+        mantissa = index - (shift << SUB_BUCKET_BITS)
+        return mantissa << shift, (mantissa + 1) << shift
+
+    def record(self, value):
+        self.counts[min(self.bucket(value), len(self.counts) - 1)] += 1
+        self.count += 1
+        self.max = max(self.max, int(value))
+
+    def percentile(self, q):
+        if not self.count:
+            return float('nan')
+        rank = max(int(np.ceil(q / 100 * self.count)), 1)
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        lower, upper = self.bounds(index)
+        return min((int(lower) + int(upper) - 1) / 2, self.max)
+
+    def summary(self):
+        return {'count': self.count,
+                'p50': self.percentile(50),
+                'p99': self.percentile(99),
+                'p999': self.percentile(99.9),
+                'max': self.max}
+
+    def format(self, unit=1e6, label='ms'):
+        s = self.summary()
+        return (f"n={s['count']}  p50={s['p50'] / unit:.2f}  p99={s['p99'] / unit:.2f}  "
+                f"p99.9={s['p999'] / unit:.2f}  max={s['max'] / unit:.2f} {label}")
+
+    def save(self, path):
+        """Write the non-empty buckets as CSV (lower_ns,upper_ns,count)"""
+        index = np.flatnonzero(self.counts)
+        lower, upper = self.bounds(index)
+        rows = np.column_stack([lower, upper, self.counts[index]])
+        header = f"{self.format()}\nmax_ns={self.max}\nlower_ns,upper_ns,count"
+        np.savetxt(path, rows, fmt='%d', delimiter=',', header=header)
+
+    @classmethod
+    def load(cls, path):
+        histogram = cls()
+        rows = np.loadtxt(path, delimiter=',', dtype=np.int64, ndmin=2)
+        for lower, _, count in rows:
+            histogram.counts[histogram.bucket(lower)] += count
+        histogram.count = int(histogram.counts.sum())
+        with open(path) as f:
+            for line in f:
+                if line.startswith('# max_ns='):
+                    histogram.max = int(line.split('=')[1])
+        return histogram
+
+class LatencyProbe:
+    """Pipelined sequence-numbered round trips over an open serial port.
+
+    Feed every received line through on_lines() (from the serial reader
+    thread, so the receive timestamp is taken as early as possible); it
+    returns the lines that were not probe replies.
+    """
+
+    def __init__(self, ser, count=1000, in_flight=4, on_update=None, on_done=None):
+        self.ser = ser
+        self.count = count
+        self.in_flight = max(in_flight, 1)
+        self.on_update = on_update
+        self.on_done = on_done
+        self.histogram = LatencyHistogram()
+        self.sent = 0
+        self.lost = 0
+        self.running = False
+        self._pending = {}  # seq -> perf_counter_ns at send
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="latency-probe", daemon=True)
+
+    def start(self):
+        self.running = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self.running = False
+            self._cond.notify()
+
+    def on_lines(self, lines):
+        now = time.perf_counter_ns()
+        rest = []
+        with self._cond:
+            for line in lines:
+                if line.startswith("I received:"):
+                    sent_ns = self._pending.pop(line[11:].strip(), None)
+                    if sent_ns is not None:
+                        self.histogram.record(now - sent_ns)
+                        continue
+                rest.append(line)
+            self._cond.notify()
+        return rest
+
+    def _run(self):
+        last_update = time.monotonic()
+        with self._cond:
+            while self.running and (self.sent < self.count or self._pending):
+                while self.sent < self.count and len(self._pending) < self.in_flight:
+                    self.sent += 1
+                    self._pending[str(self.sent)] = time.perf_counter_ns()
+                    self.ser.write(f"{self.sent}\n".encode())
+                self._cond.wait(0.05)
+
+                deadline = time.perf_counter_ns() - int(PROBE_TIMEOUT * 1e9)
+                for seq, sent_ns in list(self._pending.items()):
+                    if sent_ns < deadline:
+                        del self._pending[seq]
+                        self.lost += 1
+                if self.on_update and time.monotonic() - last_update >= UPDATE_INTERVAL:
+                    last_update = time.monotonic()
+                    self.on_update(self)
+            self.running = False
+        if self.on_done:
+            self.on_done(self)
+
+    def status(self):
+        return f"{self.sent}/{self.count} sent, {self.lost} lost | {self.histogram.format()}"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', default='COM5', help='serial port of the Arduino')
+    parser.add_argument('--sim', action='store_true', help='probe a simulated sketch (arduino_sim)')
+    parser.add_argument('--count', type=int, default=1000, help='commands to send')
+    parser.add_argument('--in-flight', type=int, default=4, help='commands outstanding at once')
+    parser.add_argument('--out', default='latency.csv', help='histogram file')
+    parser.add_argument('--show', nargs='+', metavar='CSV', help='print saved histograms and exit')
+    args = parser.parse_args()
+
+    if args.show:
+        for path in args.show:
+            print(f"{path}: {LatencyHistogram.load(path).format()}")
+        return
+
+    import serial
+    from serial_events import SerialWatcher
+
+    sim = None
+    if args.sim:
+        from arduino_sim import LedControllerSim, Simulator
+        sim = Simulator([LedControllerSim()]).start(process=True)
+        args.port = sim.devices[0].port
+    ser = serial.Serial(args.port, 9600, timeout=1)
+    if not sim:
+        time.sleep(2)  # Wait for Arduino to reset
+        ser.reset_input_buffer()
+
+    done = threading.Event()
+    probe = LatencyProbe(ser, args.count, args.in_flight,
+                         on_update=lambda p: print(f"\r{p.status()}", end='', flush=True),
+                         on_done=lambda p: done.set())
+    watcher = SerialWatcher(ser, on_lines=probe.on_lines).start()
+    probe.start()
+    try:
+        done.wait()
+    except KeyboardInterrupt:
+        probe.stop()
+        done.wait()
+    finally:
+        watcher.stop()
+        ser.close()
+        if sim:
+            sim.stop()
+            sim.close()
+    print(f"\r{probe.status()}")
+    probe.histogram.save(args.out)
+    print(f"Histogram saved to {args.out}")
+
+if __name__ == '__main__':
+    main()
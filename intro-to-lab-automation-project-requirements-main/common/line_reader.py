@@ -0,0 +1,111 @@
+"""
+Bulk line reader shared by the serial host scripts.
+
+Instead of one ser.readline() (and often a time.sleep) per message, each call
+drains everything in ser.in_waiting with a single read(), appends it to one
+persistent bytearray and cuts off the complete lines. A partial line stays in
+the buffer until the rest of it arrives. Deleting from the front of a
+bytearray only moves its start pointer, so the buffer is not re-allocated.
+
+parse_int_lines() turns a block of numeric CSV lines into an (n, columns)
+array with one NumPy call, falling back to line-by-line parsing only for
+blocks that contain something else (startup messages, acknowledgements,
+lines with a different number of fields).
+NumPy is only imported by the parse functions, so scripts that just read
+lines (SerialWatcher in the Project 8 GUIs) start without it.
+"""
+
+import warnings
+
+_NOT_SEPARATOR = bytes(range(256)).translate(None, b',\n')
+
+class LineReader:
+    def __init__(self, ser, max_buffer=1 << 20):
+        self.ser = ser
+        self.max_buffer = max_buffer
+        self._buf = bytearray()
+        self.bytes_read = 0
+        self.lines_read = 0
+
+    def feed(self, data):
+        """Add raw bytes (read() does this with whatever the port returned)"""
+        self._buf += data
+        self.bytes_read += len(data)
+        if len(self._buf) > self.max_buffer:
+            # No newline for a long time: keep only the newest part
+            del self._buf[:len(self._buf) - self.max_buffer]
+
+    def read(self):
+        """Read everything waiting (or block up to ser.timeout for one byte)"""
+        data = self.ser.read(self.ser.in_waiting or 1)
+        if data:
+            self.feed(data)
+
+    def take_block(self):
+        """Remove and return all complete lines as one bytes block (b'' if none)"""
+        cut = self._buf.rfind(b'\n') + 1
+        if cut == 0:
+            return b''
+        block = bytes(self._buf[:cut])
+        del self._buf[:cut]
+        return block
+
+    def read_block(self):
+        self.read()
+        return self.take_block()
+
+    def read_lines(self):
+        """Read from the port and return the complete lines as stripped strings"""
+        block = self.read_block()
+        if not block:
+            return []
+        lines = [line.strip() for line in block.decode('utf-8', errors='replace').split('\n')]
+        lines = [line for line in lines if line]
+        self.lines_read += len(lines)
+        return lines
+
+def parse_int_lines(block, columns):
+    """Parse a block of `a,b,c,...` lines into an (n, columns) int64 array.
+
+    Returns (values, bad_lines). Lines that are not exactly `columns`
+    integers are skipped and counted in bad_lines.
+    """
+    import numpy as np
+    lines = block.count(b'\n')
+    # Every line must have exactly `columns` fields before the values are
+    # trusted: in the total value count alone a short and a long line
+    # would cancel out. Deleting all but the separators is one C pass.
+    if block.translate(None, _NOT_SEPARATOR) != (b',' * (columns - 1) + b'\n') * lines:
+        return _parse_int_lines_slow(block, columns)
+    text = block.replace(b'\r', b'').replace(b'\n', b',').strip(b',')
+    if b',,' in text:
+        return _parse_int_lines_slow(block, columns)  # An empty field
+    try:
+        with warnings.catch_warnings():
+            # Older NumPy warns and returns a partial result instead of raising
+            warnings.simplefilter('error', DeprecationWarning)
+            values = np.fromstring(text.decode('ascii'), dtype=np.int64, sep=',')
+        if len(values) == lines * columns:
+            return values.reshape(lines, columns), 0
+    except (ValueError, DeprecationWarning, UnicodeDecodeError):
+        pass
+    return _parse_int_lines_slow(block, columns)
+
+def _parse_int_lines_slow(block, columns):
+    import numpy as np
+    rows = []
+    bad = 0
+    for line in block.split(b'\n'):
+        line = line.strip()
+        if not line:
+            continue
+        parts = line.split(b',')
+        if len(parts) != columns:
+            bad += 1
+            continue
+        try:
+            rows.append([int(p) for p in parts])
+        except ValueError:
+            bad += 1
+    values = np.array(rows, dtype=np.int64).reshape(-1, columns)
+    return values, bad
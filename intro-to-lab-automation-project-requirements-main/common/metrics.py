@@ -0,0 +1,258 @@
+"""
+Hot-path counters and timers for the host scripts, shown live or exported.
+
+Most of what we need to tell where the time goes is already counted where
+it happens (bytes read, CRC errors, rows written, queue sizes). A Metrics
+registry reads those only when a snapshot is taken, so they cost nothing in
+between; what is not measured yet gets a Timer (a LatencyHistogram in ns
+plus a running total, ~1 us per record; owners with their own Timers
+register them with metrics.timer(name, timer)):
+
+    metrics = Metrics()
+    metrics.counter('serial_bytes_total', lambda: acquisition.bytes_read)
+    metrics.gauge('log_queue_depth', lambda: logger.stats()['queued'])
+    draw = metrics.timer('plot_draw_seconds')
+
+    t0 = time.perf_counter_ns(); ...; draw.since(t0)   # or draw.wrap(fn)
+
+    previous = metrics.snapshot()
+    ...
+    snapshot = metrics.snapshot(previous)   # adds rates per second
+    print(metrics.format(snapshot))
+
+A `*_seconds_total` counter is time spent in a step, so its rate is the
+fraction of one CPU that step takes. MetricsExporter rewrites a file every
+few seconds from its own thread: Prometheus text format for `.prom` (e.g.
+for node_exporter's textfile collector), JSON otherwise.
+
+ProfileCapture toggles a full profile for when the counters point at a
+step but not at the line: yappi (all threads) if it is installed, else
+cProfile (only the thread that starts it). Captures are saved as .pstats.
+"""
+
+import cProfile
+import functools
+import json
+import os
+import pstats
+import threading
+import time
+
+from latency_probe import LatencyHistogram
+
+try:
+    import yappi
+except ImportError:
+    yappi = None
+
+EXPORT_INTERVAL = 5.0  # Seconds between MetricsExporter writes
+PROFILE_TOP = 20       # Functions printed when a capture stops
+
+class Timer:
+    """Durations in ns: a histogram for percentiles, a total for the busy share"""
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.total_ns = 0
+
+    def record(self, ns):
+        self.histogram.record(ns)
+        self.total_ns += ns
+
+    def since(self, t0_ns):
+        """Record the time since t0_ns = time.perf_counter_ns()"""
+        self.record(time.perf_counter_ns() - t0_ns)
+
+    def wrap(self, fn):
+        """fn, timed on every call"""
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            t0 = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.since(t0)
+        return timed
+
+class Metrics:
+    def __init__(self, prefix=''):
+        self.prefix = prefix
+        self._metrics = {}  # name -> (type, read function or Timer)
+
+    def counter(self, name, read):
+        """A total that only grows; snapshots add its rate per second"""
+        self._metrics[name] = ('counter', read)
+
+    def gauge(self, name, read):
+        """A current value, e.g. a queue depth"""
+        self._metrics[name] = ('gauge', read)
+
+    def timer(self, name, timer=None):
+        """A new Timer, or an existing one (e.g. BufferedLogger.flush_time)"""
+        timer = timer or Timer()
+        self._metrics[name] = ('summary', timer)
+        return timer
+
+    def remove(self, name):
+        self._metrics.pop(name, None)
+
+    def snapshot(self, previous=None):
+        """Current values; with the previous snapshot, rates since then too.
+
+        Times are in seconds. A read function that fails (e.g. the port is
+        closed while reconnecting) leaves its metric out of this snapshot.
+        """
+        now = time.monotonic()
+        elapsed = now - previous['time'] if previous else 0.0
+        values = {}
+        for name, (kind, source) in list(self._metrics.items()):
+            if kind == 'summary':
+                h = source.histogram
+                entry = {'type': kind, 'count': h.count, 'sum': source.total_ns / 1e9,
+                         'p50': h.percentile(50) / 1e9, 'p99': h.percentile(99) / 1e9,
+                         'max': h.max / 1e9}
+            else:
+                try:
+                    entry = {'type': kind, 'value': source()}
+                except Exception:
+                    continue
+            old = previous['metrics'].get(name) if previous else None
+            if old and elapsed > 0:
+                if kind == 'counter':
+                    entry['rate'] = (entry['value'] - old['value']) / elapsed
+                elif kind == 'summary':
+                    entry['rate'] = (entry['count'] - old['count']) / elapsed
+                    entry['busy'] = (entry['sum'] - old['sum']) / elapsed
+            values[name] = entry
+        return {'time': now, 'wall_time': time.time(), 'metrics': values}
+
+    def format(self, snapshot):
+        """One line per metric, for a status panel or the console"""
+        lines = []
+        for name, m in snapshot['metrics'].items():
+            if m['type'] == 'summary' and not m['count']:
+                text = "-"
+            elif m['type'] == 'summary':
+                text = f"p50 {m['p50'] * 1e3:.2f} ms  p99 {m['p99'] * 1e3:.2f} ms  max {m['max'] * 1e3:.2f} ms"
+                if 'rate' in m:
+                    text += f"  {m['rate']:.1f}/s  {m['busy'] * 100:.2f}% busy"
+            elif m['type'] == 'counter' and name.endswith('_seconds_total'):
+                text = f"{m['value']:.2f} s" + (f"  {m['rate'] * 100:.2f}% busy" if 'rate' in m else "")
+            elif m['type'] == 'counter':
+                text = f"{m['value']:,}" + (f"  {m['rate']:,.1f}/s" if 'rate' in m else "")
+            else:
+                text = f"{m['value']:,}"
+            lines.append(f"{name}: {text}")
+        return "\n".join(lines)
+
+    def to_json(self, snapshot):
+        # Percentiles of an empty timer are NaN, which is not valid JSON
+        metrics = {name: {key: None if value != value else value for key, value in m.items()}
+                   for name, m in snapshot['metrics'].items()}
+        return json.dumps({'time': snapshot['wall_time'], 'metrics': metrics}, indent=1)
+
+    def to_prometheus(self, snapshot):
+        """Prometheus text exposition format; summaries get 0.5/0.99 quantiles"""
+        out = []
+        for name, m in snapshot['metrics'].items():
+            name = self.prefix + name
+            out.append(f"# TYPE {name} {m['type']}")
+            if m['type'] == 'summary':
+                out.append(f'{name}{{quantile="0.5"}} {m["p50"]:.9g}')
+                out.append(f'{name}{{quantile="0.99"}} {m["p99"]:.9g}')
+                out.append(f"{name}_sum {m['sum']:.9g}")
+                out.append(f"{name}_count {m['count']}")
+            else:
+                out.append(f"{name} {m['value']:.9g}")
+        return "\n".join(out) + "\n"
+
+    def export(self, path, snapshot=None):
+        """Write a snapshot to path (.prom: Prometheus text, else JSON), atomically"""
+        snapshot = snapshot or self.snapshot()
+        text = self.to_prometheus(snapshot) if path.endswith('.prom') else self.to_json(snapshot)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(text)
+        os.replace(tmp, path)  # Readers never see a half-written file
+
+class MetricsExporter:
+    """Rewrites a metrics file every `interval` seconds from its own thread"""
+
+    def __init__(self, metrics, path, interval=EXPORT_INTERVAL):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-export", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop and write the final values"""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self):
+        previous = None
+        while True:
+            stopping = self._stop.wait(self.interval)
+            try:
+                previous = self.metrics.snapshot(previous)
+                self.metrics.export(self.path, previous)
+            except Exception as e:
+                print(f"Error writing {self.path}: {e}")
+            if stopping:
+                return
+
+class ProfileCapture:
+    """Start/stop a profile; each capture is saved as profile_<time>.pstats"""
+
+    def __init__(self, directory='.'):
+        self.directory = directory
+        self._profile = None
+
+    @property
+    def running(self):
+        return self._profile is not None
+
+    @property
+    def tool(self):
+        return 'yappi' if yappi else 'cProfile'
+
+    def toggle(self):
+        """Start a capture, or stop the running one and return its path"""
+        if self.running:
+            return self.stop()
+        self.start()
+        return None
+
+    def start(self):
+        if self.running:
+            return
+        if yappi:
+            yappi.clear_stats()
+            yappi.set_clock_type('cpu')
+            yappi.start()
+            self._profile = yappi
+        else:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        print(f"Profiling with {self.tool}...")
+
+    def stop(self):
+        if not self.running:
+            return None
+        path = os.path.join(self.directory, time.strftime("profile_%Y%m%d_%H%M%S.pstats"))
+        if self._profile is yappi:
+            yappi.stop()
+            yappi.get_func_stats().save(path, type='pstat')
+        else:
+            self._profile.disable()
+            self._profile.dump_stats(path)
+        self._profile = None
+        pstats.Stats(path).sort_stats('cumulative').print_stats(PROFILE_TOP)
+        print(f"Profile saved to {path} (open with python -m pstats or snakeviz)")
+        return path
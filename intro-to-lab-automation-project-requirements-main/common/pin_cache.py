@@ -0,0 +1,75 @@
+"""
+Event-driven cache of pin states, instead of polling the board.
+
+Firmata already reports every change of an input pin (pymata4 calls the
+pin's callback), and the host knows what it wrote to its outputs, so there
+is no need to digital_read() every pin on a timer. PinStateCache keeps the
+last value of every pin it is told about, from both sources:
+
+    pins = PinStateCache(on_change=...)
+    board.set_pin_mode_digital_input(2, callback=pins.pymata_callback())
+    board.digital_write(4, 1); pins.update(4, 1)    # our own writes
+
+on_change(key, value, t_ns) runs only when a value actually changes, in the
+thread that saw it (pymata4's reporter thread, or the writer), with the
+perf_counter_ns() time of the change. Hand it to the GUI thread, e.g. with
+TkDispatcher.post, and pass t_ns along to measure change-to-screen latency.
+
+Keys are whatever identifies a pin: the pin number for one board, or
+(board, pin) when several boards share a cache (pymata_callback(board=...)).
+Lookups and updates are a dict access under a lock, so the cost does not
+grow with the number of pins or boards watched.
+"""
+
+import threading
+import time
+
+class PinStateCache:
+    def __init__(self, on_change=None):
+        self.on_change = on_change
+        self._values = {}  # key -> (value, perf_counter_ns of the last change)
+        self._lock = threading.Lock()
+        self.updates = 0
+        self.changes = 0
+
+    def update(self, key, value, t_ns=None):
+        """Record a pin value; returns True (and calls on_change) if it changed"""
+        t_ns = time.perf_counter_ns() if t_ns is None else t_ns
+        with self._lock:
+            self.updates += 1
+            old = self._values.get(key)
+            if old is not None and old[0] == value:
+                return False
+            self._values[key] = (value, t_ns)
+            self.changes += 1
+        if self.on_change:
+            self.on_change(key, value, t_ns)
+        return True
+
+    def pymata_callback(self, board=None):
+        """Callback for pymata4's set_pin_mode_*(..., callback=...)
+
+        pymata4 passes [pin_type, pin, value, timestamp]; the key is the pin,
+        or (board, pin) if a board is given.
+        """
+        def callback(data):
+            t_ns = time.perf_counter_ns()
+            pin, value = data[1], data[2]
+            self.update(pin if board is None else (board, pin), value, t_ns)
+        return callback
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._values.get(key)
+        return default if entry is None else entry[0]
+
+    def changed_at(self, key):
+        """perf_counter_ns() time of the last change, or None"""
+        with self._lock:
+            entry = self._values.get(key)
+        return None if entry is None else entry[1]
+
+    def snapshot(self):
+        """{key: value} of every known pin"""
+        with self._lock:
+            return {key: value for key, (value, _) in self._values.items()}
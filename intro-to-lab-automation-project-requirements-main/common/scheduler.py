@@ -0,0 +1,125 @@
+"""
+One thread for every timed callback, instead of a threading.Timer each.
+
+threading.Timer starts a new OS thread per event, which costs a thread
+start per button press and makes the firing time depend on how fast that
+thread gets scheduled. Scheduler keeps pending calls in a heap ordered by
+due time (time.perf_counter) and runs them from a single thread that
+sleeps on a Condition until the earliest one is due:
+
+    scheduler = Scheduler().start()
+    call = scheduler.call_later(0.3, turn_off_light)
+    scheduler.reschedule(call, 0.3)   # pressed again: extend, no new thread
+    scheduler.cancel(call)
+
+cancel() and reschedule() are O(log n): the old heap entry is left in place
+and skipped when it comes up. How late each call ran (due to actual start)
+goes into `lateness`, a LatencyHistogram in ns.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+from latency_probe import LatencyHistogram
+
+class ScheduledCall:
+    __slots__ = ('fn', 'args', 'due', '_entry')
+
+    def __init__(self, fn, args):
+        self.fn = fn
+        self.args = args
+        self.due = None
+        self._entry = None  # The live heap entry, None once run or cancelled
+
+    @property
+    def pending(self):
+        return self._entry is not None
+
+class Scheduler:
+    def __init__(self, name="scheduler"):
+        self._heap = []
+        self._cond = threading.Condition()
+        self._counter = itertools.count()  # Tie breaker for equal due times
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.running = False
+        self.lateness = LatencyHistogram()
+        self.calls = 0
+
+    def start(self):
+        self.running = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the thread; calls not yet due are dropped"""
+        with self._cond:
+            self.running = False
+            self._cond.notify()
+        if self._thread.is_alive() and threading.current_thread() is not self._thread:
+            self._thread.join()
+
+    def call_later(self, delay, fn, *args):
+        """Run fn(*args) on the scheduler thread after `delay` seconds"""
+        call = ScheduledCall(fn, args)
+        with self._cond:
+            self._push(call, time.perf_counter() + delay)
+        return call
+
+    def reschedule(self, call, delay):
+        """Move a pending call to `delay` seconds from now.
+
+        Returns False if it already ran (or is running) or was cancelled;
+        schedule a new call then.
+        """
+        with self._cond:
+            if call._entry is None:
+                return False
+            self._push(call, time.perf_counter() + delay)
+            return True
+
+    def cancel(self, call):
+        """Returns False if the call already ran or was cancelled"""
+        with self._cond:
+            if call._entry is None:
+                return False
+            call._entry = None
+            return True
+
+    def _push(self, call, due):
+        entry = (due, next(self._counter), call)
+        call.due = due
+        call._entry = entry
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._cond.notify()  # New earliest call: wake up sooner
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self.running:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    entry = self._heap[0]
+                    due, _, call = entry
+                    if call._entry is not entry:
+                        heapq.heappop(self._heap)  # Cancelled or rescheduled
+                        continue
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        self._cond.wait(delay)
+                        continue
+                    heapq.heappop(self._heap)
+                    call._entry = None
+                    break
+                else:
+                    return
+            # Run outside the lock, so the call can schedule more calls
+            self.lateness.record((time.perf_counter() - due) * 1e9)
+            self.calls += 1
+            try:
+                call.fn(*call.args)
+            except Exception as e:
+                print(f"Error in scheduled call {getattr(call.fn, '__name__', call.fn)}: {e}")
@@ -0,0 +1,82 @@
+"""
+Event-driven serial input for the GUI scripts.
+
+SerialWatcher runs one background thread that sleeps until the port has data
+and then hands every complete line to a callback straight away. On Linux and
+macOS it waits in a selectors loop on the port's file descriptor (plus a
+wake-up pipe used by stop()). On Windows pyserial has no file descriptor, but
+a blocking read() returns as soon as the first byte arrives, so the same
+thread just blocks in read() and stop() uses cancel_read().
+
+For PySimpleGUI the callback is usually
+
+    lambda lines: window.write_event_value('-SERIAL-', lines)
+
+so the GUI loop can block in window.read() without a timeout and handle the
+lines the moment they arrive.
+"""
+
+import os
+import selectors
+import threading
+
+from line_reader import LineReader
+
+class SerialWatcher:
+    def __init__(self, ser, on_lines, on_error=None):
+        self.ser = ser
+        self.on_lines = on_lines
+        self.on_error = on_error
+        self.reader = LineReader(ser)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="serial-watcher", daemon=True)
+        self._use_selector = os.name == 'posix' and hasattr(ser, 'fileno')
+        self._wake_r, self._wake_w = os.pipe() if self._use_selector else (None, None)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._use_selector:
+            os.write(self._wake_w, b'x')
+        else:
+            try:
+                self.ser.cancel_read()
+            except Exception:
+                pass
+        self._thread.join(timeout)
+        if self._use_selector and not self._thread.is_alive():
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+
+    def _run(self):
+        try:
+            if self._use_selector:
+                self._run_selector()
+            else:
+                self._run_blocking()
+        except Exception as e:
+            if not self._stop.is_set() and self.on_error:
+                self.on_error(e)
+
+    def _run_selector(self):
+        with selectors.DefaultSelector() as sel:
+            sel.register(self.ser.fileno(), selectors.EVENT_READ, 'serial')
+            sel.register(self._wake_r, selectors.EVENT_READ, 'wake')
+            while not self._stop.is_set():
+                for key, _ in sel.select():
+                    if key.data == 'serial':
+                        self._dispatch()
+
+    def _run_blocking(self):
+        while not self._stop.is_set():
+            self._dispatch()
+
+    def _dispatch(self):
+        lines = self.reader.read_lines()
+        if lines:
+            self.on_lines(lines)